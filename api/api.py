@@ -2,16 +2,315 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from fastapi import FastAPI, HTTPException
+import json
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from threading import Lock
+from time import perf_counter
+from typing import List, Literal
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
-from src.blueprint import BlueprintLoader, DefaultBlueprintParser
-from src.solver import ProductCalculator, SolverConfig, solve_blueprints
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
+from src.blueprint import BlueprintLoader, DefaultBlueprintParser, blueprint_key
+from src.jobs import Job, JobStatus, JobStore
+from src.metrics import CONTENT_TYPE, MetricsRegistry
+from src.optimization_service import OptimizedRobotFactory
+from src.result_cache import ResultCache
+from src.single_flight import SingleFlight
+from src.solver import (
+    CALCULATORS, ProductCalculator, SolverConfig, rank_blueprints, solve_blueprint, solve_blueprints
+)
+from src.stats import SearchStats, SolveStats
 
 app = FastAPI()
 
+# Solves run in a shared pool; identical in-flight (blueprint, horizon, resource)
+# queries are deduplicated so a burst of the same request costs one solve, and
+# finished ones are kept in an LRU cache (BLUEPRINT_RESULT_CACHE_SIZE entries, 0 = off).
+class _SolvePool(ThreadPoolExecutor):
+    """ThreadPoolExecutor reporting its size and the solves waiting for a worker to the gauges below"""
+
+    def __init__(self, max_workers):
+        super().__init__(max_workers=max_workers)
+        self.max_workers = max_workers
+
+    def submit(self, fn, /, *args, **kwargs):
+        waiting = [True]
+        waiting_lock = Lock()
+
+        def leave_queue():
+            with waiting_lock:
+                left, waiting[0] = waiting[0], False
+            if left:
+                pool_queue_depth.dec()
+
+        def run():
+            leave_queue()
+            return fn(*args, **kwargs)
+
+        pool_queue_depth.inc()
+        future = super().submit(run)
+        # A solve cancelled before it started never runs
+        future.add_done_callback(lambda _: leave_queue())
+        return future
+
+
+solve_executor = _SolvePool(max_workers=os.cpu_count() or 1)
+solve_flights = SingleFlight()
+# Longest wait of a batch stream on its solves before checking that the client is still there
+DISCONNECT_CHECK_INTERVAL = 0.25
+result_cache = ResultCache(int(os.environ.get("BLUEPRINT_RESULT_CACHE_SIZE", "1024")))
+
+# Exposed on /metrics; recording is lock-free (see src.metrics)
+metrics = MetricsRegistry()
+request_duration = metrics.histogram(
+    "http_request_duration_seconds", "Time to fully answer an HTTP request (streamed bodies included)",
+    ("method", "route", "status")
+)
+requests_in_progress = metrics.gauge("http_requests_in_progress", "HTTP requests being answered")
+blueprint_solve_duration = metrics.histogram(
+    "blueprint_solve_duration_seconds", "Search time of each solved blueprint", ("source",)
+)
+nodes_expanded = metrics.counter("solver_nodes_expanded_total", "Search nodes expanded", ("source",))
+cache_hits = metrics.counter("result_cache_hits_total", "Batch solves answered from the result cache")
+cache_misses = metrics.counter("result_cache_misses_total", "Batch solves missing from the result cache")
+cache_entries = metrics.gauge("result_cache_entries", "Solves held by the result cache")
+pool_workers = metrics.gauge("solve_pool_workers", "Worker threads of the solve pool")
+pool_busy_workers = metrics.gauge("solve_pool_busy_workers", "Solve pool workers currently searching")
+pool_queue_depth = metrics.gauge("solve_pool_queue_depth", "Solves waiting for a free solve pool worker")
+solves_in_flight = metrics.gauge("solve_flights_in_flight", "Distinct batch solves submitted and not finished")
+cache_hits.set_function(lambda: result_cache.hits)
+cache_misses.set_function(lambda: result_cache.misses)
+cache_entries.set_function(lambda: len(result_cache))
+pool_workers.set_function(lambda: solve_executor.max_workers)
+solves_in_flight.set_function(lambda: solve_flights.in_flight())
+
+
+def _record_search(source, search_stats):
+    blueprint_solve_duration.labels(source).observe(search_stats.total_time)
+    nodes_expanded.labels(source).inc(search_stats.nodes_expanded)
+
+
+# Long-running solves are submitted as jobs and polled by the client
+job_store = JobStore(on_blueprint_solved=lambda search_stats: _record_search("job", search_stats))
+
+
+class MetricsMiddleware:
+    """Records the latency of every HTTP request, labelled by route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        requests_in_progress.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            requests_in_progress.dec()
+            route = scope.get("route")
+            request_duration.labels(
+                scope["method"], route.path if route is not None else "unmatched", status[0]
+            ).observe(perf_counter() - start)
+
+
+app.add_middleware(MetricsMiddleware)
+
+
+# Largest synchronous request: each blueprint holds a pool worker until the
+# response is done, so longer analyses go through /jobs
+MAX_BATCH_BLUEPRINTS = 32
+MAX_BATCH_TIME_LIMIT = 32
+
+
+class JobRequest(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    blueprints: List[str] = Field(min_length=1)
+    time_limit: int = Field(24, ge=0, alias="timeLimit")
+    final_resource: str = Field("geode", alias="finalResource")
+    calculator: Literal["quality", "product"] = "quality"
+
+
+class BatchAnalysisRequest(JobRequest):
+    blueprints: List[str] = Field(
+        min_length=1, max_length=MAX_BATCH_BLUEPRINTS,
+        description=f"Au plus {MAX_BATCH_BLUEPRINTS} blueprints ; au-delà, utiliser POST /jobs"
+    )
+    time_limit: int = Field(
+        24, ge=0, le=MAX_BATCH_TIME_LIMIT, alias="timeLimit",
+        description=f"Au plus {MAX_BATCH_TIME_LIMIT} minutes ; au-delà, utiliser POST /jobs"
+    )
+    include_stats: bool = Field(False, alias="includeStats")
+    include_plans: bool = Field(False, alias="includePlans")
+    # Only the calculator result is needed: blueprints are left out once it is proven
+    result_only: bool = Field(False, alias="resultOnly")
+
+
+class TopBlueprintsRequest(BatchAnalysisRequest):
+    top_k: int = Field(1, ge=1, alias="topK")
+
+
+def _best_blueprint(final_resource_results, blueprint_ids):
+    """Returns the per-blueprint qualities and the id of the best one"""
+    blueprint_results = []
+    best_quality = 0
+    best_id = 0
+
+    for resource, id in zip(final_resource_results, blueprint_ids):
+        quality = resource * id
+
+        blueprint_results.append({
+            "id": str(id),
+            "quality": quality
+        })
+
+        if quality > best_quality:
+            best_quality = quality
+            best_id = id
+
+    return blueprint_results, best_id
+
+
+def _parse_batch(request: JobRequest):
+    parser = DefaultBlueprintParser()
+    blueprints = []
+    for text in request.blueprints:
+        try:
+            blueprint = parser.parse(text.strip())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Blueprint invalide : {str(e)}")
+        if request.final_resource not in blueprint.robot_costs:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Ressource finale inconnue pour ce blueprint : {request.final_resource}"
+            )
+        blueprints.append(blueprint)
+    return blueprints
+
+
+def _job_status(job: Job):
+    return {
+        "id": job.id,
+        "status": job.status.value,
+        "blueprintsDone": job.blueprints_done,
+        "blueprintsTotal": len(job.blueprints),
+        "nodesExpanded": job.nodes_expanded,
+        "error": job.error
+    }
+
+
+def _get_job(job_id: str) -> Job:
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job introuvable : {job_id}")
+    return job
+
+
+def _plan_json(plan):
+    return [{"minute": minute, "robot": robot} for minute, robot in plan]
+
+
+def _solve_with_details(blueprint, time_limit, final_resource, cancel_token=None):
+    # Stats and plans are always collected (negligible cost) so that flights can
+    # be shared between requests that do and do not ask for them
+    stats = SearchStats()
+    plan = []
+    pool_busy_workers.inc()
+    try:
+        final_resource_count = solve_blueprint(
+            blueprint, time_limit, final_resource, cancel_token=cancel_token, stats=stats, plan=plan
+        )
+    finally:
+        pool_busy_workers.dec()
+    _record_search("batch", stats)
+    return final_resource_count, stats, plan
+
+
+def _cache_result(key, future):
+    if not future.cancelled() and future.exception() is None:
+        result_cache.put(key, future.result())
+
+
+async def _stream_batch(futures, calculator, include_stats=False, include_plans=False, http_request=None,
+                        result_only=False):
+    """
+    Yields one NDJSON line per blueprint as its solve completes, then a summary line.
+    futures maps each flight future to its (key, blueprint ids). The solves are
+    awaited DISCONNECT_CHECK_INTERVAL seconds at a time; once the client has gone
+    away (checked between waits, or the stream cancelled by the server), the
+    flights it alone waited on are cancelled. With result_only, so are the
+    remaining ones as soon as the calculator result is proven.
+    """
+    results = {}
+    solve_stats = SolveStats()
+    pending = set(futures)
+    unreleased = set(futures)
+    try:
+        while pending:
+            if http_request is not None and await http_request.is_disconnected():
+                return
+            done, pending = await run_in_threadpool(
+                wait, pending, timeout=DISCONNECT_CHECK_INTERVAL, return_when=FIRST_COMPLETED
+            )
+            for future in sorted(done, key=lambda future: futures[future][1][0]):
+                key, blueprint_ids = futures[future]
+                solve_flights.release(key, future)
+                unreleased.discard(future)
+                yield _batch_lines(future.result(), blueprint_ids, results, solve_stats, include_stats, include_plans)
+                if result_only and calculator.proven_result(list(results.values()), list(results)) is not None:
+                    pending = set()
+                    break
+    finally:
+        for future in unreleased:
+            solve_flights.release(futures[future][0], future)
+
+    blueprint_ids = sorted(results)
+    final_resource_results = [results[blueprint_id] for blueprint_id in blueprint_ids]
+    _, best_id = _best_blueprint(final_resource_results, blueprint_ids)
+    summary = {
+        "bestBlueprint": str(best_id),
+        "result": calculator.calculate(final_resource_results, blueprint_ids)
+    }
+    if include_stats:
+        summary["stats"] = solve_stats.total.to_dict()
+    yield json.dumps(summary) + "\n"
+
+
+def _batch_lines(solved, blueprint_ids, results, solve_stats, include_stats, include_plans):
+    """NDJSON lines of the blueprints sharing a finished flight (recorded in results and solve_stats)"""
+    final_resource_count, search_stats, plan = solved
+    lines = []
+    for blueprint_id in blueprint_ids:
+        results[blueprint_id] = final_resource_count
+        solve_stats.blueprints[blueprint_id] = search_stats
+        line = {
+            "id": str(blueprint_id),
+            "finalResource": final_resource_count,
+            "quality": final_resource_count * blueprint_id
+        }
+        if include_stats:
+            line["stats"] = search_stats.to_dict()
+        if include_plans:
+            line["plan"] = _plan_json(plan)
+        lines.append(json.dumps(line) + "\n")
+    return "".join(lines)
+
+
 @app.get("/blueprints/analyze")
-def analyze_blueprints():
+def analyze_blueprints(stats: bool = False, plans: bool = False):
     filename = os.path.join(os.path.dirname(__file__), '..', 'data', 'diamond.txt')
     try:
         loader = BlueprintLoader(DefaultBlueprintParser())
@@ -29,24 +328,126 @@ def analyze_blueprints():
         final_resource='diamond'
     )
     
-    (final_resource_results, blueprint_ids) = solve_blueprints(config)
-    blueprint_results = []
-    best_quality = 0
-    best_id = 0
+    # Stats are always collected for the metrics, and returned on request
+    solve_stats = SolveStats()
+    solve_kwargs = {"stats": solve_stats}
+    solve_plans = None
+    if plans:
+        solve_plans = solve_kwargs["plans"] = {}
+    (final_resource_results, blueprint_ids) = solve_blueprints(config, **solve_kwargs)
+    for search_stats in solve_stats.blueprints.values():
+        _record_search("analyze", search_stats)
+    blueprint_results, best_id = _best_blueprint(final_resource_results, blueprint_ids)
 
-    for resource, id in zip(final_resource_results, blueprint_ids):
-        quality = resource * id
+    response = {
+        "bestBlueprint": str(best_id),
+        "blueprints": blueprint_results
+    }
+    if stats:
+        response["stats"] = solve_stats.to_dict()
+    if solve_plans is not None:
+        response["plans"] = {str(blueprint_id): _plan_json(plan) for blueprint_id, plan in solve_plans.items()}
+    return JSONResponse(response)
 
-        blueprint_results.append({
-            "id": str(id),
-            "quality": quality
-        })
+@app.post("/blueprints/analyze/batch")
+def analyze_blueprint_batch(request: BatchAnalysisRequest, http_request: Request):
+    blueprints = _parse_batch(request)
 
-        if quality > best_quality:
-            best_quality = quality
-            best_id = id
+    # Identical blueprints of the batch share one future
+    blueprint_ids_by_key = {}
+    blueprint_by_key = {}
+    for blueprint_id, blueprint in enumerate(blueprints, 1):
+        key = (blueprint_key(blueprint), request.time_limit, request.final_resource)
+        blueprint_ids_by_key.setdefault(key, []).append(blueprint_id)
+        blueprint_by_key.setdefault(key, blueprint)
+
+    calculator = CALCULATORS[request.calculator]()
+    # Blueprints bounded by zero need no search, and may prove the result on their own
+    bounded_by_zero = set()
+    if request.result_only:
+        bounded_by_zero = {
+            key for key, blueprint in blueprint_by_key.items()
+            if OptimizedRobotFactory(blueprint, final_resource=request.final_resource).upper_bound(request.time_limit) == 0
+        }
+        zero_ids = [blueprint_id for key in bounded_by_zero for blueprint_id in blueprint_ids_by_key[key]]
+        if calculator.proven_result([0] * len(zero_ids), zero_ids) is not None:
+            blueprint_ids_by_key = {key: blueprint_ids_by_key[key] for key in bounded_by_zero}
 
+    futures = {}
+    for key, blueprint_ids in blueprint_ids_by_key.items():
+        cached = result_cache.get(key)
+        if key in bounded_by_zero:
+            future = Future()
+            future.set_result((0, SearchStats(), []))
+        elif cached is not None:
+            future = Future()
+            future.set_result(cached)
+        else:
+            future = solve_flights.submit(
+                solve_executor, key, _solve_with_details,
+                blueprint_by_key[key], request.time_limit, request.final_resource,
+                with_token=True
+            )
+            future.add_done_callback(lambda done, key=key: _cache_result(key, done))
+        futures[future] = (key, blueprint_ids)
+
+    return StreamingResponse(
+        _stream_batch(futures, calculator, request.include_stats, request.include_plans, http_request,
+                      request.result_only),
+        media_type="application/x-ndjson"
+    )
+
+@app.post("/blueprints/best")
+def best_blueprints(request: TopBlueprintsRequest):
+    """Top-K blueprints by quality, without solving every blueprint to optimality"""
+    blueprints = _parse_batch(request)
+    solve_stats = SolveStats() if request.include_stats else None
+    ranked = rank_blueprints(blueprints, request.time_limit, request.final_resource,
+                             request.top_k, stats=solve_stats)
+
+    response = {
+        "bestBlueprint": str(ranked[0].blueprint_id) if ranked else "0",
+        "blueprints": [
+            {"id": str(entry.blueprint_id), "finalResource": entry.final_resource_count, "quality": entry.quality}
+            for entry in ranked
+        ]
+    }
+    if solve_stats is not None:
+        response["stats"] = solve_stats.to_dict()
+    return JSONResponse(response)
+
+@app.post("/jobs", status_code=202)
+def submit_job(request: JobRequest):
+    blueprints = _parse_batch(request)
+    job = job_store.submit(
+        blueprints, request.time_limit, request.final_resource,
+        CALCULATORS[request.calculator]()
+    )
+    return _job_status(job)
+
+@app.get("/jobs/{job_id}")
+def get_job_status(job_id: str):
+    return _job_status(_get_job(job_id))
+
+@app.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    job = _get_job(job_id)
+    if job.status != JobStatus.DONE:
+        raise HTTPException(status_code=409, detail=f"Job non terminé : {job.status.value}")
+
+    blueprint_results, best_id = _best_blueprint(job.final_resource_results, job.blueprint_ids)
     return JSONResponse({
         "bestBlueprint": str(best_id),
-        "blueprints": blueprint_results
+        "blueprints": blueprint_results,
+        "result": job.result,
+        "stats": job.stats.to_dict()
     })
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    _get_job(job_id)
+    return _job_status(job_store.cancel(job_id))
+
+@app.get("/metrics")
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,367 @@
+"""
+Load test of the FastAPI service.
+
+    python -m benchmarks.load_test --concurrency 8 --duration 30 --mix batch=8,best=2 --output load.json
+
+Starts the app under uvicorn on a free local port (or targets --url), drives
+it with concurrent async clients picking requests from a weighted mix, and
+reports throughput, p50/p95/p99 latency and error rate per request kind, plus
+the server's CPU time and resident memory sampled from /proc (Linux only;
+null elsewhere). Results are written as JSON so runs can be compared.
+
+The analyze kind (GET /blueprints/analyze) solves the whole bundled diamond
+file at 24 minutes, ignoring time_limit and blueprints_per_request; it is only
+sent when named in --mix.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+DEFAULT_MIX = {"batch": 8, "best": 2}
+DEFAULT_BLUEPRINT_FILE = os.path.join(DATA_DIR, 'blueprints.txt')
+PERCENTILES = (50, 95, 99)
+# Seconds between two samples of the server's CPU time and memory
+SAMPLE_INTERVAL = 0.2
+
+
+@dataclass
+class LoadTestConfig:
+    """
+    Shape of a load test
+    Args:
+        concurrency: Concurrent clients, each sending one request at a time
+        duration: Seconds of load (ignored when requests is set)
+        requests: Total requests to send instead of a fixed duration
+        mix: Relative weight of each request kind (batch, best, analyze)
+        time_limit: Horizon of the batch and best requests
+        blueprints_per_request: Blueprint lines per batch and best request
+        blueprint_file: Blueprint lines the requests are drawn from
+        timeout: Seconds before a request counts as an error
+        seed: Seed of the request choices
+    """
+    concurrency: int = 8
+    duration: float = 30.0
+    requests: Optional[int] = None
+    mix: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    time_limit: int = 16
+    blueprints_per_request: int = 3
+    blueprint_file: str = DEFAULT_BLUEPRINT_FILE
+    timeout: float = 120.0
+    seed: int = 0
+
+    def __post_init__(self):
+        unknown = set(self.mix) - set(REQUEST_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown request kinds {sorted(unknown)} (expected {', '.join(REQUEST_KINDS)})")
+
+
+def _batch_request(lines: List[str], config: LoadTestConfig) -> Tuple[str, str, Optional[Dict]]:
+    return "POST", "/blueprints/analyze/batch", {"blueprints": lines, "timeLimit": config.time_limit}
+
+
+def _best_request(lines: List[str], config: LoadTestConfig) -> Tuple[str, str, Optional[Dict]]:
+    return "POST", "/blueprints/best", {"blueprints": lines, "timeLimit": config.time_limit, "topK": 1}
+
+
+def _analyze_request(lines: List[str], config: LoadTestConfig) -> Tuple[str, str, Optional[Dict]]:
+    return "GET", "/blueprints/analyze", None
+
+
+# Request kind -> (method, path, JSON body) builder
+REQUEST_KINDS = {
+    "batch": _batch_request,
+    "best": _best_request,
+    "analyze": _analyze_request,
+}
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (None for no values)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict:
+    """Throughput, error rate and latency percentiles of one group of requests"""
+    total = len(latencies) + errors
+    summary = {
+        "requests": total,
+        "errors": errors,
+        "error_rate": errors / total if total else 0.0,
+        "throughput": total / elapsed if elapsed > 0 else None,
+        "mean_latency": sum(latencies) / len(latencies) if latencies else None,
+        "max_latency": max(latencies) if latencies else None,
+    }
+    for q in PERCENTILES:
+        summary[f"p{q}_latency"] = percentile(latencies, q)
+    return summary
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, workers: int = 1) -> subprocess.Popen:
+    """uvicorn serving api.api:app from the repository root"""
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.api:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT_DIR,
+    )
+
+
+def wait_until_ready(url: str, server: Optional[subprocess.Popen] = None, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server is not None and server.poll() is not None:
+            raise RuntimeError(f"Server exited with status {server.returncode}")
+        try:
+            if httpx.get(f"{url}/openapi.json", timeout=1.0).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"Server not ready after {timeout}s")
+
+
+class ProcessSampler:
+    """Periodic CPU time and RSS of a process and its children, from /proc"""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.rss_samples: List[int] = []
+        self.cpu_start = self._cpu_time()
+        self.cpu_end = self.cpu_start
+        self.wall_start = time.monotonic()
+        self.wall_end = self.wall_start
+
+    @staticmethod
+    def available() -> bool:
+        return os.path.exists("/proc/self/stat")
+
+    def _pids(self) -> List[int]:
+        # uvicorn --workers > 1 serves from child processes
+        pids = [self.pid]
+        try:
+            with open(f"/proc/{self.pid}/task/{self.pid}/children") as f:
+                pids += [int(pid) for pid in f.read().split()]
+        except OSError:
+            pass
+        return pids
+
+    def _cpu_time(self) -> Optional[float]:
+        if not self.available():
+            return None
+        ticks = 0
+        for pid in self._pids():
+            try:
+                with open(f"/proc/{pid}/stat") as f:
+                    # Fields after the command name; utime and stime are the 14th and 15th
+                    fields = f.read().rsplit(")", 1)[1].split()
+                ticks += int(fields[11]) + int(fields[12])
+            except (OSError, IndexError):
+                pass
+        return ticks / os.sysconf("SC_CLK_TCK")
+
+    def _rss(self) -> Optional[int]:
+        rss = 0
+        for pid in self._pids():
+            try:
+                with open(f"/proc/{pid}/status") as f:
+                    for line in f:
+                        if line.startswith("VmRSS:"):
+                            rss += int(line.split()[1]) * 1024
+            except OSError:
+                pass
+        return rss or None
+
+    def sample(self) -> None:
+        rss = self._rss()
+        if rss is not None:
+            self.rss_samples.append(rss)
+        self.cpu_end = self._cpu_time()
+        self.wall_end = time.monotonic()
+
+    def to_dict(self) -> Dict:
+        if self.cpu_start is None:
+            return {"cpu_seconds": None, "cpu_percent": None, "peak_rss_bytes": None, "mean_rss_bytes": None}
+        cpu_seconds = self.cpu_end - self.cpu_start
+        wall = self.wall_end - self.wall_start
+        return {
+            "cpu_seconds": cpu_seconds,
+            "cpu_percent": 100 * cpu_seconds / wall if wall > 0 else None,
+            "peak_rss_bytes": max(self.rss_samples, default=None),
+            "mean_rss_bytes": sum(self.rss_samples) / len(self.rss_samples) if self.rss_samples else None,
+        }
+
+
+async def _sample_periodically(sampler: ProcessSampler, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        sampler.sample()
+        try:
+            await asyncio.wait_for(stop.wait(), SAMPLE_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+    sampler.sample()
+
+
+async def _client(client: httpx.AsyncClient, config: LoadTestConfig, lines: List[str], rng: random.Random,
+                  deadline: float, budget: List[int], results: Dict[str, Tuple[List[float], List[int]]]) -> None:
+    kinds = list(config.mix)
+    weights = [config.mix[kind] for kind in kinds]
+    while time.monotonic() < deadline:
+        if config.requests is not None:
+            if budget[0] <= 0:
+                return
+            budget[0] -= 1
+        kind = rng.choices(kinds, weights)[0]
+        sample = rng.sample(lines, min(config.blueprints_per_request, len(lines)))
+        method, path, body = REQUEST_KINDS[kind](sample, config)
+        latencies, errors = results[kind]
+        start = time.perf_counter()
+        try:
+            # Streamed responses are read to the end: the latency covers the whole answer
+            response = await client.request(method, path, json=body)
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            failed = True
+        if failed:
+            errors[0] += 1
+        else:
+            latencies.append(time.perf_counter() - start)
+
+
+async def run_load(url: str, config: LoadTestConfig, server_pid: Optional[int] = None) -> Dict:
+    """Drives url with config.concurrency clients; returns the JSON report"""
+    with open(config.blueprint_file, encoding='utf-8') as f:
+        lines = [line.strip() for line in f if line.strip()]
+    rng = random.Random(config.seed)
+    results = {kind: ([], [0]) for kind in config.mix}
+    budget = [config.requests] if config.requests is not None else None
+    deadline = time.monotonic() + (config.duration if config.requests is None else float("inf"))
+
+    sampler = ProcessSampler(server_pid) if server_pid is not None and ProcessSampler.available() else None
+    stop = asyncio.Event()
+    sampling = asyncio.create_task(_sample_periodically(sampler, stop)) if sampler is not None else None
+
+    limits = httpx.Limits(max_connections=config.concurrency)
+    start = time.perf_counter()
+    async with httpx.AsyncClient(base_url=url, timeout=config.timeout, limits=limits) as client:
+        await asyncio.gather(*(
+            _client(client, config, lines, random.Random(rng.random()), deadline, budget, results)
+            for _ in range(config.concurrency)
+        ))
+    elapsed = time.perf_counter() - start
+    if sampling is not None:
+        stop.set()
+        await sampling
+
+    all_latencies = [latency for latencies, _ in results.values() for latency in latencies]
+    all_errors = sum(errors[0] for _, errors in results.values())
+    return {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "cpu_count": os.cpu_count()},
+        "config": {
+            "url": url, "concurrency": config.concurrency, "duration": config.duration,
+            "requests": config.requests, "mix": config.mix, "time_limit": config.time_limit,
+            "blueprints_per_request": config.blueprints_per_request, "seed": config.seed,
+        },
+        "elapsed": elapsed,
+        "total": summarize(all_latencies, all_errors, elapsed),
+        "by_kind": {kind: summarize(latencies, errors[0], elapsed) for kind, (latencies, errors) in results.items()},
+        "server": sampler.to_dict() if sampler is not None else None,
+    }
+
+
+def load_test(config: LoadTestConfig, url: Optional[str] = None, workers: int = 1) -> Dict:
+    """Runs a load test against url, or against a local uvicorn server started for it"""
+    if url is not None:
+        wait_until_ready(url)
+        return asyncio.run(run_load(url, config))
+
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = start_server(port, workers)
+    try:
+        wait_until_ready(url, server)
+        return asyncio.run(run_load(url, config, server.pid))
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+
+def _parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for item in value.split(','):
+        kind, _, weight = item.partition('=')
+        mix[kind.strip()] = int(weight or 1)
+    return mix
+
+
+def format_report(report: Dict) -> str:
+    def ms(seconds):
+        return "-" if seconds is None else f"{1000 * seconds:.1f}ms"
+
+    lines = []
+    for name, summary in [("total", report["total"])] + sorted(report["by_kind"].items()):
+        lines.append(
+            f"{name:8} {summary['requests']:6d} req  {summary['throughput'] or 0:7.2f} req/s  "
+            f"errors {100 * summary['error_rate']:5.1f}%  p50 {ms(summary['p50_latency'])}  "
+            f"p95 {ms(summary['p95_latency'])}  p99 {ms(summary['p99_latency'])}"
+        )
+    server = report["server"]
+    if server is not None and server["cpu_seconds"] is not None:
+        lines.append(f"server   cpu {server['cpu_seconds']:.2f}s ({server['cpu_percent']:.0f}%)  "
+                     f"peak rss {(server['peak_rss_bytes'] or 0) / 2 ** 20:.1f} MiB")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test of the blueprint API")
+    parser.add_argument("--url", default=None, help="target a running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--requests", type=int, default=None, help="total requests instead of a duration")
+    parser.add_argument("--mix", type=_parse_mix, default=dict(DEFAULT_MIX), help="KIND=WEIGHT,...")
+    parser.add_argument("--time-limit", type=int, default=16)
+    parser.add_argument("--blueprints-per-request", type=int, default=3)
+    parser.add_argument("--blueprint-file", default=DEFAULT_BLUEPRINT_FILE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="load.json")
+    args = parser.parse_args(argv)
+
+    config = LoadTestConfig(args.concurrency, args.duration, args.requests, args.mix, args.time_limit,
+                            args.blueprints_per_request, args.blueprint_file, seed=args.seed)
+    report = load_test(config, args.url, args.workers)
+    print(format_report(report))
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Scaling benchmark on generated catalogs.
+
+    python -m benchmarks.scaling_bench --sizes 1000 10000 100000 --resource-types 4 5 6 --output scaling.json
+
+Measures how parse time and memory grow with the catalog size, and how solve
+time, nodes expanded and the visited-set size grow with the chain depth and
+the horizon, on seeded catalogs from src.catalog.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import replace
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.blueprint import BlueprintLoader, DefaultBlueprintParser
+from src.catalog import CatalogSpec, RESOURCE_CHAIN, generate_blueprints, write_catalog
+from src.solver import solve_blueprint
+from src.stats import SearchStats
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_RESOURCE_TYPES = [4, 5, 6]
+DEFAULT_TIME_LIMITS = [16, 20, 24]
+
+
+def bench_parse(sizes: List[int], spec: CatalogSpec, seed: int = 0,
+                measure_memory: bool = True, log=print) -> List[Dict]:
+    """Parse time (and peak traced memory) of generated catalogs of each size"""
+    results = []
+    directory = tempfile.mkdtemp()
+    try:
+        for size in sizes:
+            filename = os.path.join(directory, f"catalog_{size}.txt")
+            write_catalog(filename, size, spec, seed)
+            loader = BlueprintLoader(DefaultBlueprintParser())
+
+            start = time.perf_counter()
+            loader.load(filename)
+            parse_time = time.perf_counter() - start
+
+            peak_memory = None
+            if measure_memory:
+                tracemalloc.start()
+                try:
+                    loader.load(filename)
+                    _, peak_memory = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+
+            results.append({
+                "size": size,
+                "resource_types": spec.resource_types,
+                "file_bytes": os.path.getsize(filename),
+                "parse_time": parse_time,
+                "lines_per_sec": size / parse_time if parse_time > 0 else None,
+                "peak_memory_bytes": peak_memory,
+            })
+            log(f"parse {size} lines: {parse_time:.3f}s")
+    finally:
+        shutil.rmtree(directory)
+    return results
+
+
+def bench_solve(resource_types: List[int], time_limits: List[int], samples: int,
+                spec: CatalogSpec, seed: int = 0, engine: str = "python", log=print) -> List[Dict]:
+    """Solve time, nodes and visited-set size per chain depth and horizon (sample averages)"""
+    results = []
+    for depth in resource_types:
+        depth_spec = replace(spec, resource_types=depth)
+        blueprints = list(generate_blueprints(samples, depth_spec, seed))
+        final_resource = RESOURCE_CHAIN[depth - 1]
+        for time_limit in time_limits:
+            wall_times, nodes, peak_seen, final_counts = [], [], [], []
+            for blueprint in blueprints:
+                stats = SearchStats()
+                start = time.perf_counter()
+                final_counts.append(solve_blueprint(blueprint, time_limit, final_resource, stats=stats, engine=engine))
+                wall_times.append(time.perf_counter() - start)
+                nodes.append(stats.nodes_expanded)
+                peak_seen.append(stats.peak_seen_size)
+            results.append({
+                "resource_types": depth,
+                "time_limit": time_limit,
+                "samples": samples,
+                "engine": engine,
+                "mean_wall_time": sum(wall_times) / samples,
+                "max_wall_time": max(wall_times),
+                "mean_nodes_expanded": sum(nodes) / samples,
+                "max_peak_seen": max(peak_seen),
+                "mean_final_resource": sum(final_counts) / samples,
+            })
+            log(f"solve {depth} types t={time_limit}: {results[-1]['mean_wall_time']:.3f}s mean, "
+                f"{results[-1]['mean_nodes_expanded']:.0f} nodes mean")
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Scaling benchmark on generated catalogs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--resource-types", type=int, nargs="+", default=DEFAULT_RESOURCE_TYPES)
+    parser.add_argument("--time-limits", type=int, nargs="+", default=DEFAULT_TIME_LIMITS)
+    parser.add_argument("--samples", type=int, default=5, help="blueprints solved per depth and horizon")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", default="python")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc parse pass")
+    parser.add_argument("--output", default="scaling.json")
+    args = parser.parse_args(argv)
+
+    spec = CatalogSpec()
+    report = {
+        "parse": bench_parse(args.sizes, spec, args.seed, measure_memory=not args.no_memory),
+        "solve": bench_solve(args.resource_types, args.time_limits, args.samples, spec, args.seed, args.engine),
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
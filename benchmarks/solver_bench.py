@@ -0,0 +1,426 @@
+"""
+Solver benchmark suite.
+
+    python -m benchmarks.solver_bench run --output bench.json
+    python -m benchmarks.solver_bench compare bench.json --baseline baseline.json --threshold 0.2
+    python -m benchmarks.solver_bench decision --time-limits 24
+    python -m benchmarks.solver_bench opening --minutes 0 6 8 10
+    python -m benchmarks.solver_bench endgame --minutes 0 3 4 5 6
+
+`run` solves every blueprint of each suite file at each horizon, recording wall
+time, nodes expanded, nodes/sec and peak traced memory, plus the wall time of a
+full solve_blueprints batch. `compare` flags metrics that grew by more than the
+threshold against a baseline run recorded on the same machine and exits with
+status 1 on regression.
+`decision` times max_final_resource against the decision-mode optimizer
+(bisection with can_reach) on the same blueprints. `calibrate` times every
+engine variant per blueprint and writes the calibration table read by
+SolverConfig(engine="auto", calibration_file=...). `opening` solves the suites
+with an opening book of each length (0 = none) to tune OPENING_MINUTES, and
+`endgame` with endgame tables of each length to tune ENDGAME_MINUTES.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.blueprint import Blueprint, BlueprintLoader, DefaultBlueprintParser
+from src.endgame import EndgameTable
+from src.opening_book import OpeningBook
+from src.optimization_service import OptimizedRobotFactory
+from src.engine_selection import CalibrationTable, available_variants, blueprint_features
+from src.solver import SolverConfig, solve_blueprint, solve_blueprints
+from src.stats import SearchStats
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+# (blueprint file, final resource)
+DEFAULT_SUITES = [
+    (os.path.join(DATA_DIR, 'blueprints.txt'), 'geode'),
+    (os.path.join(DATA_DIR, 'diamond.txt'), 'diamond'),
+]
+DEFAULT_TIME_LIMITS = [24, 32]
+
+# Metrics compared by `compare` (higher is worse)
+REGRESSION_METRICS = ("wall_time", "nodes_expanded", "peak_memory_bytes")
+
+
+def bench_blueprint(blueprint: Blueprint, time_limit: int, final_resource: str,
+                    measure_memory: bool = True) -> Dict:
+    """Solves one blueprint and returns its measurements"""
+    stats = SearchStats()
+    factory = OptimizedRobotFactory(blueprint, final_resource=final_resource)
+    start = time.perf_counter()
+    result = factory.max_final_resource(time_limit, stats=stats)
+    wall_time = time.perf_counter() - start
+    nodes_expanded = stats.nodes_expanded
+
+    # Tracing slows the search down, so memory is measured in a second pass
+    peak_memory = None
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            OptimizedRobotFactory(blueprint, final_resource=final_resource).max_final_resource(time_limit)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "result": result,
+        "wall_time": wall_time,
+        "nodes_expanded": nodes_expanded,
+        "nodes_per_sec": nodes_expanded / wall_time if wall_time > 0 else None,
+        "peak_memory_bytes": peak_memory,
+        "stats": stats.to_dict(),
+    }
+
+
+def bench_decision(blueprint: Blueprint, time_limit: int, final_resource: str) -> Dict:
+    """Times max_final_resource against max_final_resource_by_decision on one blueprint"""
+    factory = OptimizedRobotFactory(blueprint, final_resource=final_resource)
+    measurement = {"upper_bound": factory.upper_bound(time_limit)}
+    for mode, solve in (("max", factory.max_final_resource),
+                        ("decision", factory.max_final_resource_by_decision)):
+        stats = SearchStats()
+        start = time.perf_counter()
+        measurement[f"{mode}_result"] = solve(time_limit, stats=stats)
+        measurement[f"{mode}_time"] = time.perf_counter() - start
+        measurement[f"{mode}_nodes"] = stats.nodes_expanded
+    return measurement
+
+
+def run_decision_suite(suites: List[Tuple[str, str]], time_limits: List[int],
+                       max_blueprints: Optional[int] = None, log=print) -> List[Dict]:
+    loader = BlueprintLoader(DefaultBlueprintParser())
+    results = []
+    for filename, final_resource in suites:
+        for time_limit in time_limits:
+            for blueprint_id, blueprint in enumerate(loader.load(filename)[:max_blueprints], 1):
+                measurement = bench_decision(blueprint, time_limit, final_resource)
+                measurement.update({
+                    "file": os.path.basename(filename),
+                    "final_resource": final_resource,
+                    "time_limit": time_limit,
+                    "blueprint": blueprint_id,
+                })
+                results.append(measurement)
+                log(f"{measurement['file']} t={time_limit} blueprint {blueprint_id}: "
+                    f"{measurement['max_result']} (bound {measurement['upper_bound']}) "
+                    f"max {measurement['max_time']:.3f}s / {measurement['max_nodes']} nodes, "
+                    f"decision {measurement['decision_time']:.3f}s / {measurement['decision_nodes']} nodes")
+    return results
+
+
+def run_opening_suite(suites: List[Tuple[str, str]], time_limits: List[int], minutes: List[int],
+                      max_blueprints: Optional[int] = None, log=print) -> List[Dict]:
+    """Totals of solving every blueprint of the suites with a fresh opening book of each length"""
+    loader = BlueprintLoader(DefaultBlueprintParser())
+    blueprints = [(blueprint, final_resource) for filename, final_resource in suites
+                  for blueprint in loader.load(filename)[:max_blueprints]]
+    results = []
+    for opening_minutes in minutes:
+        book = OpeningBook(minutes=opening_minutes) if opening_minutes else None
+        stats = SearchStats()
+        start = time.perf_counter()
+        for time_limit in time_limits:
+            for blueprint, final_resource in blueprints:
+                search_stats = SearchStats()
+                solve_blueprint(blueprint, time_limit, final_resource, stats=search_stats, opening_book=book)
+                stats.merge(search_stats)
+        entry = {
+            "minutes": opening_minutes,
+            "wall_time": time.perf_counter() - start,
+            "nodes_expanded": stats.nodes_expanded,
+            "openings": len(book) if book is not None else 0,
+            "book_hits": book.hits if book is not None else 0,
+        }
+        results.append(entry)
+        log(f"opening {opening_minutes} minutes: {entry['wall_time']:.3f}s, {entry['nodes_expanded']} nodes, "
+            f"{entry['openings']} openings, {entry['book_hits']} reused")
+    return results
+
+
+def run_endgame_suite(suites: List[Tuple[str, str]], time_limits: List[int], minutes: List[int],
+                      max_blueprints: Optional[int] = None, log=print) -> List[Dict]:
+    """Totals of solving every blueprint of the suites with endgame tables of each length (0 = none)"""
+    loader = BlueprintLoader(DefaultBlueprintParser())
+    blueprints = [(blueprint, final_resource) for filename, final_resource in suites
+                  for blueprint in loader.load(filename)[:max_blueprints]]
+    results = []
+    for endgame_minutes in minutes:
+        stats = SearchStats()
+        table_entries = 0
+        start = time.perf_counter()
+        for blueprint, final_resource in blueprints:
+            factory = OptimizedRobotFactory(blueprint, final_resource=final_resource)
+            # One table per blueprint, shared by its horizons
+            table = EndgameTable(factory, endgame_minutes) if endgame_minutes else None
+            for time_limit in time_limits:
+                search_stats = SearchStats()
+                factory.max_final_resource(time_limit, stats=search_stats, endgame=table)
+                stats.merge(search_stats)
+            table_entries = max(table_entries, len(table) if table is not None else 0)
+        entry = {
+            "minutes": endgame_minutes,
+            "wall_time": time.perf_counter() - start,
+            "nodes_expanded": stats.nodes_expanded,
+            "peak_table_entries": table_entries,
+        }
+        results.append(entry)
+        log(f"endgame {endgame_minutes} minutes: {entry['wall_time']:.3f}s, {entry['nodes_expanded']} nodes, "
+            f"{table_entries} table entries at most")
+    return results
+
+
+def _variant_options(variant: str) -> Dict:
+    if variant == "python_capped":
+        return {"engine": "python", "cap_resources": True}
+    return {"engine": variant}
+
+
+def calibrate(suites: List[Tuple[str, str]], time_limits: List[int],
+              max_blueprints: Optional[int] = None, log=print) -> CalibrationTable:
+    """Times each available engine variant on every blueprint/horizon of the suites"""
+    loader = BlueprintLoader(DefaultBlueprintParser())
+    variants = available_variants()
+    table = CalibrationTable()
+    warmed_up = set()
+
+    for filename, final_resource in suites:
+        for time_limit in time_limits:
+            for blueprint_id, blueprint in enumerate(loader.load(filename)[:max_blueprints], 1):
+                times = {}
+                peak_seen = None
+                for variant in variants:
+                    if variant not in warmed_up:
+                        # Keep compilation and first imports out of the timings
+                        solve_blueprint(blueprint, 1, final_resource, **_variant_options(variant))
+                        warmed_up.add(variant)
+                    stats = SearchStats()
+                    start = time.perf_counter()
+                    solve_blueprint(blueprint, time_limit, final_resource, stats=stats, **_variant_options(variant))
+                    times[variant] = time.perf_counter() - start
+                    if variant == "python_capped":
+                        peak_seen = stats.peak_seen_size
+                table.entries.append({
+                    "file": os.path.basename(filename),
+                    "blueprint": blueprint_id,
+                    "features": blueprint_features(blueprint, time_limit, final_resource),
+                    "times": times,
+                    "peak_seen": peak_seen,
+                })
+                log(f"{os.path.basename(filename)} t={time_limit} blueprint {blueprint_id}: "
+                    + ", ".join(f"{variant} {seconds:.3f}s" for variant, seconds in times.items()))
+    return table
+
+
+def bench_batch(filename: str, time_limit: int, final_resource: str,
+                max_blueprints: Optional[int] = None) -> float:
+    """Wall time of a full solve_blueprints call (its progress output is discarded)"""
+    config = SolverConfig(filename=filename, time_limit=time_limit,
+                          final_resource=final_resource, max_blueprints=max_blueprints)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        solve_blueprints(config)
+    return time.perf_counter() - start
+
+
+def run_suite(suites: List[Tuple[str, str]], time_limits: List[int],
+              max_blueprints: Optional[int] = None, measure_memory: bool = True,
+              include_batch: bool = True, log=print) -> Dict:
+    loader = BlueprintLoader(DefaultBlueprintParser())
+    results = []
+    batches = []
+
+    for filename, final_resource in suites:
+        blueprints = loader.load(filename)[:max_blueprints]
+        for time_limit in time_limits:
+            for blueprint_id, blueprint in enumerate(blueprints, 1):
+                measurement = bench_blueprint(blueprint, time_limit, final_resource, measure_memory)
+                measurement.update({
+                    "file": os.path.basename(filename),
+                    "final_resource": final_resource,
+                    "time_limit": time_limit,
+                    "blueprint": blueprint_id,
+                })
+                results.append(measurement)
+                log(f"{measurement['file']} t={time_limit} blueprint {blueprint_id}: "
+                    f"{measurement['result']} in {measurement['wall_time']:.3f}s "
+                    f"({measurement['nodes_expanded']} nodes)")
+
+            if include_batch:
+                batches.append({
+                    "file": os.path.basename(filename),
+                    "final_resource": final_resource,
+                    "time_limit": time_limit,
+                    "blueprints": len(blueprints),
+                    "wall_time": bench_batch(filename, time_limit, final_resource, max_blueprints),
+                })
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "max_blueprints": max_blueprints,
+        },
+        "results": results,
+        "batches": batches,
+    }
+
+
+def _result_key(entry: Dict) -> Tuple:
+    return (entry["file"], entry["final_resource"], entry["time_limit"], entry.get("blueprint"))
+
+
+def compare_runs(baseline: Dict, current: Dict, threshold: float = 0.2,
+                 min_time: float = 0.05) -> List[str]:
+    """
+    Returns one message per regression: a metric more than `threshold` (relative)
+    above its baseline, or a changed result. Wall times under `min_time` seconds
+    in the baseline are too noisy to compare and are skipped.
+    """
+    baseline_index = {_result_key(entry): entry for entry in baseline.get("results", [])}
+    regressions = []
+
+    for entry in current.get("results", []):
+        base = baseline_index.get(_result_key(entry))
+        if base is None:
+            continue
+        label = "{}:{} t={} blueprint {}".format(*_result_key(entry))
+
+        if base["result"] != entry["result"]:
+            regressions.append(f"{label}: result changed {base['result']} -> {entry['result']}")
+
+        for metric in REGRESSION_METRICS:
+            old, new = base.get(metric), entry.get(metric)
+            if old is None or new is None or old <= 0:
+                continue
+            if metric == "wall_time" and old < min_time:
+                continue
+            if new > old * (1 + threshold):
+                regressions.append(f"{label}: {metric} {old:.6g} -> {new:.6g} (+{(new / old - 1):.0%})")
+
+    baseline_batches = {_result_key(entry): entry for entry in baseline.get("batches", [])}
+    for entry in current.get("batches", []):
+        base = baseline_batches.get(_result_key(entry))
+        if base is None or base["wall_time"] < min_time:
+            continue
+        if entry["wall_time"] > base["wall_time"] * (1 + threshold):
+            label = "{}:{} t={} batch".format(*_result_key(entry)[:3])
+            regressions.append(f"{label}: wall_time {base['wall_time']:.6g} -> {entry['wall_time']:.6g}")
+
+    return regressions
+
+
+def _parse_suite(value: str) -> Tuple[str, str]:
+    filename, _, final_resource = value.rpartition(':')
+    if not filename:
+        raise argparse.ArgumentTypeError("suite must be FILE:FINAL_RESOURCE")
+    return filename, final_resource
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Solver benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmarks and write JSON results")
+    run.add_argument("--suite", action="append", type=_parse_suite,
+                     help="FILE:FINAL_RESOURCE (repeatable, default: bundled data)")
+    run.add_argument("--time-limits", type=int, nargs="+", default=DEFAULT_TIME_LIMITS)
+    run.add_argument("--max-blueprints", type=int, default=None)
+    run.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    run.add_argument("--no-batch", action="store_true", help="skip the solve_blueprints timing")
+    run.add_argument("--output", default="bench.json")
+
+    compare = commands.add_parser("compare", help="compare a run against a baseline")
+    compare.add_argument("current")
+    # Wall times only compare on the machine that recorded them, so no baseline is shipped
+    compare.add_argument("--baseline", required=True, help="JSON results of an earlier run on this machine")
+    compare.add_argument("--threshold", type=float, default=0.2)
+    compare.add_argument("--min-time", type=float, default=0.05)
+
+    decision = commands.add_parser("decision", help="compare the maximizing and decision-mode searches")
+    decision.add_argument("--suite", action="append", type=_parse_suite,
+                          help="FILE:FINAL_RESOURCE (repeatable, default: bundled data)")
+    decision.add_argument("--time-limits", type=int, nargs="+", default=DEFAULT_TIME_LIMITS[:1])
+    decision.add_argument("--max-blueprints", type=int, default=None)
+    decision.add_argument("--output", default=None, help="also write the measurements as JSON")
+
+    calibration = commands.add_parser("calibrate", help="time every engine variant for engine=\"auto\"")
+    calibration.add_argument("--suite", action="append", type=_parse_suite,
+                             help="FILE:FINAL_RESOURCE (repeatable, default: bundled data)")
+    calibration.add_argument("--time-limits", type=int, nargs="+", default=DEFAULT_TIME_LIMITS[:1])
+    calibration.add_argument("--max-blueprints", type=int, default=None)
+    calibration.add_argument("--output", default="calibration.json")
+
+    opening = commands.add_parser("opening", help="time the search with opening books of several lengths")
+    opening.add_argument("--suite", action="append", type=_parse_suite,
+                         help="FILE:FINAL_RESOURCE (repeatable, default: bundled data)")
+    opening.add_argument("--time-limits", type=int, nargs="+", default=DEFAULT_TIME_LIMITS[:1])
+    opening.add_argument("--minutes", type=int, nargs="+", default=[0, 4, 6, 8, 10, 12])
+    opening.add_argument("--max-blueprints", type=int, default=None)
+
+    endgame = commands.add_parser("endgame", help="time the search with endgame tables of several lengths")
+    endgame.add_argument("--suite", action="append", type=_parse_suite,
+                         help="FILE:FINAL_RESOURCE (repeatable, default: bundled data)")
+    endgame.add_argument("--time-limits", type=int, nargs="+", default=DEFAULT_TIME_LIMITS[:1])
+    endgame.add_argument("--minutes", type=int, nargs="+", default=[0, 2, 3, 4, 5, 6, 8])
+    endgame.add_argument("--max-blueprints", type=int, default=None)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "opening":
+        run_opening_suite(args.suite or DEFAULT_SUITES, args.time_limits, args.minutes, args.max_blueprints)
+        return 0
+
+    if args.command == "endgame":
+        run_endgame_suite(args.suite or DEFAULT_SUITES, args.time_limits, args.minutes, args.max_blueprints)
+        return 0
+
+    if args.command == "calibrate":
+        table = calibrate(args.suite or DEFAULT_SUITES, args.time_limits, args.max_blueprints)
+        table.save(args.output)
+        print(f"Wrote {len(table.entries)} calibration entries to {args.output}")
+        return 0
+
+    if args.command == "decision":
+        results = run_decision_suite(args.suite or DEFAULT_SUITES, args.time_limits, args.max_blueprints)
+        max_time = sum(entry["max_time"] for entry in results)
+        decision_time = sum(entry["decision_time"] for entry in results)
+        print(f"Total: max {max_time:.3f}s, decision {decision_time:.3f}s")
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+        return 1 if any(entry["max_result"] != entry["decision_result"] for entry in results) else 0
+
+    if args.command == "run":
+        report = run_suite(args.suite or DEFAULT_SUITES, args.time_limits, args.max_blueprints,
+                           measure_memory=not args.no_memory, include_batch=not args.no_batch)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {len(report['results'])} measurements to {args.output}")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+    regressions = compare_runs(baseline, current, args.threshold, args.min_time)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print("No regression")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Start-up time of the command-line entry point.
+
+    python -m benchmarks.startup_bench --runs 5 --output startup.json
+
+Fills a temporary result cache with one `python -m src` run, then times fully
+cached runs against a bare interpreter start (`python -c pass`), and parses
+`-X importtime` of a cached run: total import time, modules imported and the
+slowest imports. A cached solve should not import the search engines at all;
+`search_imported` reports whether it did.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_BLUEPRINT_FILE = os.path.join(ROOT_DIR, 'data', 'blueprints.txt')
+# Modules a cached run has no reason to import
+SEARCH_MODULES = ("src.solver", "src.optimization_service", "numpy", "numba")
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """(module, self_us, cumulative_us) of each line of -X importtime output"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        imports.append({"module": module.strip(), "self_us": int(self_us), "cumulative_us": int(cumulative_us)})
+    return imports
+
+
+def _timed_run(command: List[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run(command, cwd=ROOT_DIR, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def bench_startup(blueprint_file: str = DEFAULT_BLUEPRINT_FILE, time_limit: int = 24,
+                  max_blueprints: Optional[int] = None, runs: int = 5, top: int = 10) -> Dict:
+    """Wall time of cached CLI runs against a bare interpreter, and their import profile"""
+    cache_dir = tempfile.mkdtemp()
+    try:
+        command = [sys.executable, "-m", "src", blueprint_file, "--time-limit", str(time_limit),
+                   "--cache", cache_dir]
+        if max_blueprints is not None:
+            command += ["--max-blueprints", str(max_blueprints)]
+        cold_time = _timed_run(command)
+
+        interpreter = [_timed_run([sys.executable, "-c", "pass"]) for _ in range(runs)]
+        cached = [_timed_run(command) for _ in range(runs)]
+        profile = subprocess.run([sys.executable, "-X", "importtime"] + command[1:], cwd=ROOT_DIR, check=True,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    finally:
+        shutil.rmtree(cache_dir)
+
+    imports = parse_importtime(profile.stderr)
+    modules = {entry["module"] for entry in imports}
+    return {
+        "command": " ".join(["python"] + command[1:-2]),
+        "cold_time": cold_time,
+        "interpreter_time": min(interpreter),
+        "cached_time": min(cached),
+        "cached_median_time": statistics.median(cached),
+        # Cost of the entry point itself, on top of the interpreter start
+        "cli_overhead": min(cached) - min(interpreter),
+        "modules_imported": len(imports),
+        "total_import_us": sum(entry["self_us"] for entry in imports),
+        "src_import_us": sum(entry["self_us"] for entry in imports if entry["module"].startswith("src")),
+        "search_imported": sorted(module for module in SEARCH_MODULES if module in modules),
+        "slowest_imports": sorted(imports, key=lambda entry: -entry["cumulative_us"])[:top],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Start-up time of python -m src")
+    parser.add_argument("--blueprint-file", default=DEFAULT_BLUEPRINT_FILE)
+    parser.add_argument("--time-limit", type=int, default=24)
+    parser.add_argument("--max-blueprints", type=int, default=None)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", default="startup.json")
+    args = parser.parse_args(argv)
+
+    report = bench_startup(args.blueprint_file, args.time_limit, args.max_blueprints, args.runs)
+    print(f"cold {report['cold_time']:.3f}s, cached {1000 * report['cached_time']:.1f}ms "
+          f"(interpreter {1000 * report['interpreter_time']:.1f}ms, cli {1000 * report['cli_overhead']:.1f}ms), "
+          f"{report['modules_imported']} modules imported")
+    if report["search_imported"]:
+        print(f"cached run imported {', '.join(report['search_imported'])}")
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 import os
-from src.solver import  ProductCalculator, QualityCalculator, SolverConfig, calculate_and_write_analysis
+from src.run_plan import run_plan
+from src.solver import  ProductCalculator, QualityCalculator, SolverConfig
 
     
 
@@ -9,16 +10,12 @@ if __name__ == "__main__":
     filenameDiamond = os.path.join("data", "diamond.txt")
     fileOutput = os.path.join("data", "analysis.txt")
     
-    print("=== Partie 1 : Max Géodes en 24 min ===")
     config1 = SolverConfig(
         filename=filename,
         time_limit=24,
         calculator=QualityCalculator(),
         output_file=fileOutput,
     )
-    print(f"Produit total: {calculate_and_write_analysis(config1)}")
-    
-    print("\n=== Partie 2 : Produit des Géodes sur les 3 premiers en 32 min ===")
     config2 = SolverConfig(
         filename=filename,
         time_limit=32,
@@ -26,9 +23,6 @@ if __name__ == "__main__":
         max_blueprints=3,
         output_file=fileOutput,
     )
-    print(f"Produit total: {calculate_and_write_analysis(config2)}")
-    
-    print("\n=== Partie 3 : Produit des Diamants sur les 2 blueprints en 24 min ===")
     config3 = SolverConfig(
         filename=filenameDiamond,
         time_limit=24,
@@ -36,4 +30,15 @@ if __name__ == "__main__":
         final_resource='diamond',
         output_file=fileOutput,
     )
-    print(f"Produit total: {calculate_and_write_analysis(config3)}")
\ No newline at end of file
+    
+    # The three parts share parsing, and each blueprint/horizon is solved once
+    result1, result2, result3 = run_plan([config1, config2, config3], max_workers=None)
+
+    print("=== Partie 1 : Max Géodes en 24 min ===")
+    print(f"Produit total: {result1}")
+    
+    print("\n=== Partie 2 : Produit des Géodes sur les 3 premiers en 32 min ===")
+    print(f"Produit total: {result2}")
+    
+    print("\n=== Partie 3 : Produit des Diamants sur les 2 blueprints en 24 min ===")
+    print(f"Produit total: {result3}")
\ No newline at end of file
@@ -0,0 +1,79 @@
+# === asyncio API ===
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from src.blueprint import Blueprint
+from src.cancellation import CancellationToken
+from src.solver import SolverConfig, _load_blueprints, solve_blueprint
+from src.stats import SearchStats
+
+
+def _solve_with_stats(blueprint: Blueprint, time_limit: int, final_resource: str, engine: str,
+                      cancel_token: Optional[CancellationToken] = None) -> Tuple[int, SearchStats]:
+    # Module-level so that process pools can run it; the stats travel back with the result
+    stats = SearchStats()
+    count = solve_blueprint(blueprint, time_limit, final_resource, cancel_token=cancel_token,
+                            stats=stats, engine=engine)
+    return count, stats
+
+
+async def solve_blueprints_async(
+    config: SolverConfig,
+    max_concurrency: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[Tuple[int, int, SearchStats]]:
+    """
+    Async counterpart of solve_blueprints: yields (blueprint ID, final resource
+    count, search stats) as each solve completes, in completion order.
+    Args:
+        config: Blueprints and solve parameters (filename, max_blueprints,
+            time_limit, final_resource, engine; output and checkpoint options
+            do not apply)
+        max_concurrency: Solves running at once (default: one per core); the
+            others are only submitted when a slot frees up
+        executor: Where the solves run (default: the loop's default executor).
+            With a ProcessPoolExecutor running solves cannot be interrupted and
+            finish in the background after a cancellation
+    Cancelling the consuming task, or closing the generator (e.g. with
+    contextlib.aclosing around an early break), drops the solves not started
+    yet and cancels the running ones at their next check.
+    """
+    loop = asyncio.get_running_loop()
+    limit = max_concurrency or os.cpu_count() or 1
+    if limit < 1:
+        raise ValueError("max_concurrency must be at least 1")
+    blueprints = await loop.run_in_executor(None, _load_blueprints, config)
+
+    token = CancellationToken()
+    # The token wraps an in-process Event, which worker processes cannot share
+    token_kwargs = {} if isinstance(executor, ProcessPoolExecutor) else {"cancel_token": token}
+    queued = iter(enumerate(blueprints, 1))
+    running: Dict[asyncio.Future, int] = {}
+
+    def submit_next() -> None:
+        while len(running) < limit:
+            item = next(queued, None)
+            if item is None:
+                return
+            blueprint_id, blueprint = item
+            solve = partial(_solve_with_stats, blueprint, config.time_limit, config.final_resource,
+                            config.engine, **token_kwargs)
+            running[loop.run_in_executor(executor, solve)] = blueprint_id
+
+    try:
+        submit_next()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for future in sorted(done, key=running.get):
+                blueprint_id = running.pop(future)
+                count, stats = future.result()
+                yield blueprint_id, count, stats
+            submit_next()
+    finally:
+        if running:
+            token.cancel()
+            for future in running:
+                future.cancel()
@@ -0,0 +1,160 @@
+# === Vectorized batch engine (NumPy) ===
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.blueprint import Blueprint
+from src.cancellation import CancellationToken
+from src.optimization_service import OptimizedRobotFactory
+from src.stats import SearchStats
+
+# Blueprints advanced together; bounds the size of the stacked frontier
+DEFAULT_CHUNK_SIZE = 16
+
+
+def _stack_blueprints(factories: List[OptimizedRobotFactory]) -> Tuple[np.ndarray, np.ndarray]:
+    """(costs[b, robot, resource], max_spend[b, resource]) of same-type factories"""
+    costs = np.array([factory.cost_matrix for factory in factories], dtype=np.int64)
+    max_spend = np.array([
+        [0 if i == factory.final_index else factory.max_spend[rtype]
+         for i, rtype in enumerate(factory.resource_types)]
+        for factory in factories
+    ], dtype=np.int64)
+    return costs, max_spend
+
+
+def _unique_rows(frontier: np.ndarray) -> np.ndarray:
+    """Distinct frontier rows, packed into one int64 key per row when the columns fit"""
+    widths = [int(column_max).bit_length() for column_max in frontier.max(axis=0)]
+    if sum(widths) > 63:
+        return np.unique(frontier, axis=0)
+    keys = np.zeros(len(frontier), dtype=np.int64)
+    for column, width in enumerate(widths):
+        if width:
+            keys = (keys << width) | frontier[:, column]
+    _, first = np.unique(keys, return_index=True)
+    return frontier[first]
+
+
+def _solve_chunk(factories: List[OptimizedRobotFactory], time_limit: int,
+                 cancel_token: Optional[CancellationToken],
+                 stats: Optional[List[SearchStats]]) -> List[int]:
+    """
+    Breadth-first search of every blueprint at once. A frontier row is
+    [blueprint, resources..., robots...]; each minute all rows are expanded
+    together, non-final resources are capped at what can still be spent,
+    duplicates are dropped and rows that cannot reach their own blueprint's
+    lower bound are pruned.
+    """
+    n = len(factories[0].resource_types)
+    final = factories[0].final_index
+    count = len(factories)
+    costs, max_spend = _stack_blueprints(factories)
+    res = slice(1, 1 + n)
+    rob = slice(1 + n, 1 + 2 * n)
+    final_res, final_rob = 1 + final, 1 + n + final
+
+    frontier = np.zeros((count, 1 + 2 * n), dtype=np.int64)
+    frontier[:, 0] = np.arange(count)
+    frontier[:, 1 + n] = 1
+
+    expanded = np.zeros(count, dtype=np.int64)
+    pruned_by_bound = np.zeros(count, dtype=np.int64)
+    pruned_by_seen = np.zeros(count, dtype=np.int64)
+    peak_frontier = np.ones(count, dtype=np.int64)
+
+    for time in range(time_limit):
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        ids = frontier[:, 0]
+        expanded += np.bincount(ids, minlength=count)
+        produced = frontier[:, res] + frontier[:, rob]
+
+        children = [np.column_stack((ids, produced, frontier[:, rob]))]
+        for robot in range(n):
+            cost = costs[ids, robot]
+            buildable = np.all(frontier[:, res] >= cost, axis=1)
+            if robot != final:
+                buildable &= frontier[:, 1 + n + robot] < max_spend[ids, robot]
+            if not buildable.any():
+                continue
+            child = np.column_stack((ids, produced - cost, frontier[:, rob]))[buildable]
+            child[:, 1 + n + robot] += 1
+            children.append(child)
+        frontier = np.concatenate(children)
+
+        # A non-final resource beyond max_spend per remaining minute can never be spent
+        minutes_left = time_limit - time - 1
+        caps = max_spend[frontier[:, 0]] * minutes_left
+        caps[:, final] = np.iinfo(np.int64).max
+        np.minimum(frontier[:, res], caps, out=frontier[:, res])
+
+        # Waiting from here is always achievable: it bounds each blueprint from below
+        guaranteed = frontier[:, final_res] + frontier[:, final_rob] * minutes_left
+        lower_bounds = np.zeros(count, dtype=np.int64)
+        np.maximum.at(lower_bounds, frontier[:, 0], guaranteed)
+        potential = guaranteed + (minutes_left * (minutes_left - 1)) // 2
+        keep = potential >= lower_bounds[frontier[:, 0]]
+        pruned_by_bound += np.bincount(frontier[~keep, 0], minlength=count)
+        frontier = frontier[keep]
+
+        before = np.bincount(frontier[:, 0], minlength=count)
+        frontier = _unique_rows(frontier)
+        after = np.bincount(frontier[:, 0], minlength=count)
+        pruned_by_seen += before - after
+        np.maximum(peak_frontier, after, out=peak_frontier)
+
+    results = np.zeros(count, dtype=np.int64)
+    np.maximum.at(results, frontier[:, 0], frontier[:, final_res])
+
+    if stats is not None:
+        for b, search_stats in enumerate(stats):
+            search_stats.nodes_expanded = int(expanded[b])
+            search_stats.pruned_by_bound = int(pruned_by_bound[b])
+            search_stats.pruned_by_seen = int(pruned_by_seen[b])
+            search_stats.max_stack_depth = int(peak_frontier[b])
+            search_stats.peak_seen_size = int(peak_frontier[b])
+    return [int(result) for result in results]
+
+
+def solve_batch(
+    blueprints: List[Blueprint],
+    time_limit: int = 24,
+    final_resource: str = "geode",
+    cancel_token: Optional[CancellationToken] = None,
+    stats: Optional[List[SearchStats]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> List[int]:
+    """
+    Maximum final resource of each blueprint, solving blueprints with the same
+    resource types in lockstep (same results as solve_blueprint, in order).
+    Args:
+        blueprints: Blueprints to solve
+        time_limit: Time limit in minutes
+        final_resource: Resource to maximize
+        cancel_token: Checked every minute of the search
+        stats: One SearchStats per blueprint, filled when given (the frontier
+            size stands in for the stack depth and the seen set)
+        chunk_size: Maximum number of blueprints advanced together
+    """
+    factories = [OptimizedRobotFactory(blueprint, final_resource=final_resource) for blueprint in blueprints]
+    groups: Dict[tuple, List[int]] = {}
+    for index, factory in enumerate(factories):
+        groups.setdefault(tuple(factory.resource_types), []).append(index)
+
+    results: List[int] = [0] * len(blueprints)
+    for indices in groups.values():
+        for start in range(0, len(indices), chunk_size):
+            chunk = indices[start:start + chunk_size]
+            chunk_stats = [stats[index] for index in chunk] if stats is not None else None
+            search_start = perf_counter()
+            chunk_results = _solve_chunk([factories[index] for index in chunk], time_limit,
+                                         cancel_token, chunk_stats)
+            if chunk_stats is not None:
+                elapsed = (perf_counter() - search_start) / len(chunk)
+                for search_stats in chunk_stats:
+                    search_stats.phase_times["search"] = elapsed
+            for index, result in zip(chunk, chunk_results):
+                results[index] = result
+    return results
@@ -1,7 +1,8 @@
 from dataclasses import dataclass
 from typing import Dict
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Tuple
+import hashlib
 import re
 
 @dataclass
@@ -14,13 +15,44 @@ class Blueprint:
     # str: Robot type
     robot_costs: Dict[str, RobotCost]
 
+def blueprint_key(blueprint: Blueprint) -> Tuple:
+    """Hashable identity of a blueprint's costs (robot order is significant)"""
+    return tuple(
+        (robot, tuple(sorted(cost.resources.items())))
+        for robot, cost in blueprint.robot_costs.items()
+    )
+
+def blueprint_fingerprint(blueprint: Blueprint) -> str:
+    """Stable short digest of a blueprint's costs, for on-disk records"""
+    return hashlib.sha1(repr(blueprint_key(blueprint)).encode('utf-8')).hexdigest()[:16]
+
 class BlueprintParser(ABC):
     @abstractmethod
     def parse(self, text: str) -> Blueprint:
         pass
 
 class DefaultBlueprintParser(BlueprintParser):
+    # Any "Each <robot> robot costs <n> <resource>, <n> <resource> and <n> <resource>." sentence
+    ROBOT_SENTENCE = re.compile(r"Each (\w+) robot costs ([^.]*)")
+    COST_ITEM = re.compile(r"(\d+) (\w+)")
+
     def parse(self, text: str) -> Blueprint:
+        robot_costs = self._parse_known_robots(text)
+
+        # Longer or different chains (e.g. generated catalogs) are read sentence by sentence
+        robots = [robot for robot, _ in self.ROBOT_SENTENCE.findall(text)]
+        if any(robot not in robot_costs for robot in robots):
+            robot_costs = {
+                robot: RobotCost({resource: int(amount) for amount, resource in self.COST_ITEM.findall(costs)})
+                for robot, costs in self.ROBOT_SENTENCE.findall(text)
+            }
+
+        if not robot_costs:
+            raise ValueError(f"Invalid blueprint format: {text}")
+
+        return Blueprint(robot_costs)
+
+    def _parse_known_robots(self, text: str) -> Dict[str, RobotCost]:
         robot_costs = {}
 
         patterns = {
@@ -55,11 +87,7 @@ class DefaultBlueprintParser(BlueprintParser):
                             "clay": int(match.group(2)),
                             "obsidian": int(match.group(3))
                         })
-
-        if not robot_costs:
-            raise ValueError(f"Invalid blueprint format: {text}")
-
-        return Blueprint(robot_costs)
+        return robot_costs
 
 class BlueprintLoader:
     def __init__(self, parser: BlueprintParser):
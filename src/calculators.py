@@ -0,0 +1,42 @@
+# === Result calculators ===
+# Kept apart from src.solver so that they can be used without importing the search
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+
+class ResultCalculator(ABC):
+    """Interface to calculate the final resource result (Single Responsibility)"""
+    @abstractmethod
+    def calculate(self, final_resource: List[int], blueprint_ids: List[int]) -> int:
+        pass
+
+    def proven_result(self, final_resource: List[int], blueprint_ids: List[int]) -> Optional[int]:
+        """Result implied by these blueprints alone, whatever the others give (None = not proven yet)"""
+        return None
+
+class QualityCalculator(ResultCalculator):
+    """Calculates the total quality (sum of final resource * ID)"""
+    def calculate(self, final_resource: List[int], blueprint_ids: List[int]) -> int:
+        return sum(final_resource_count * blueprint_id 
+                  for final_resource_count, blueprint_id in zip(final_resource, blueprint_ids))
+
+class ProductCalculator(ResultCalculator):
+    """Calculate the product of all final resource"""
+    def calculate(self, final_resource: List[int], _) -> int:
+        if not final_resource:
+            return 0
+        result = 1
+        for final_resource_count in final_resource:
+            if final_resource_count == 0:
+                return 0
+            result *= final_resource_count
+        return result
+
+    def proven_result(self, final_resource: List[int], _) -> Optional[int]:
+        """A zero factor makes the whole product zero"""
+        return 0 if 0 in final_resource else None
+
+CALCULATORS = {
+    "quality": QualityCalculator,
+    "product": ProductCalculator,
+}
@@ -0,0 +1,48 @@
+from threading import Event, Lock
+from typing import Callable, List
+
+
+class SolveCancelled(Exception):
+    """Raised by a search whose cancellation token has been triggered"""
+
+
+class CancellationToken:
+    """Thread-safe flag checked cooperatively by running searches"""
+
+    def __init__(self):
+        self._event = Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = Lock()
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Calls callback when the token is cancelled (right away if it already is),
+        for searches that cannot poll the token themselves. Returns a function
+        unregistering it.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove(callback)
+        callback()
+        return lambda: None
+
+    def _remove(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise SolveCancelled()
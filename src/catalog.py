@@ -0,0 +1,128 @@
+# === Synthetic blueprint catalogs ===
+"""
+Seeded generator of blueprint files in the format DefaultBlueprintParser reads.
+
+    python -m src.catalog catalog.txt --count 100000 --resource-types 6 --seed 1
+"""
+import argparse
+import random
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.blueprint import Blueprint, RobotCost
+from src.optimization_service import OptimizedRobotFactory
+
+# Resource chain, from the first robot type to the most advanced
+RESOURCE_CHAIN = ("ore", "clay", "obsidian", "geode", "diamond", "crystal", "plasma", "antimatter")
+
+
+@dataclass
+class CatalogSpec:
+    """
+    Shape of a generated catalog
+    Args:
+        resource_types: Length of the resource chain (2 to 8)
+        ore_cost: Range of the ore cost of every robot
+        chain_cost: Range of the cost in the previous resource of the chain
+        extra_cost_probability: Chance that a robot also costs an older resource (as diamond does)
+        difficulty: Range of the relaxation upper bound at difficulty_horizon that
+            generated blueprints must fall in (None = any); a higher bound means
+            more reachable final resource and usually a larger search
+        difficulty_horizon: Horizon of the difficulty bound
+        max_attempts: Samples tried per blueprint before giving up on the difficulty target
+    """
+    resource_types: int = 4
+    ore_cost: Tuple[int, int] = (2, 4)
+    chain_cost: Tuple[int, int] = (5, 20)
+    extra_cost_probability: float = 0.0
+    difficulty: Optional[Tuple[int, int]] = None
+    difficulty_horizon: int = 24
+    max_attempts: int = 1000
+
+    @property
+    def resources(self) -> Tuple[str, ...]:
+        if not 2 <= self.resource_types <= len(RESOURCE_CHAIN):
+            raise ValueError(f"resource_types must be between 2 and {len(RESOURCE_CHAIN)}")
+        return RESOURCE_CHAIN[:self.resource_types]
+
+
+def _sample_blueprint(rng: random.Random, spec: CatalogSpec) -> Blueprint:
+    resources = spec.resources
+    robot_costs = {}
+    for index, robot in enumerate(resources):
+        costs: Dict[str, int] = {"ore": rng.randint(*spec.ore_cost)}
+        if index >= 2:
+            costs[resources[index - 1]] = rng.randint(*spec.chain_cost)
+            if index >= 3 and rng.random() < spec.extra_cost_probability:
+                older = resources[rng.randint(1, index - 2)]
+                costs[older] = rng.randint(*spec.chain_cost)
+        robot_costs[robot] = RobotCost(costs)
+    return Blueprint(robot_costs)
+
+
+def generate_blueprints(count: int, spec: CatalogSpec, seed: int = 0) -> Iterator[Blueprint]:
+    """Yields count blueprints; the same seed and spec always give the same catalog"""
+    rng = random.Random(seed)
+    final_resource = spec.resources[-1]
+    for _ in range(count):
+        for _ in range(spec.max_attempts):
+            blueprint = _sample_blueprint(rng, spec)
+            if spec.difficulty is None:
+                break
+            bound = OptimizedRobotFactory(blueprint, final_resource).upper_bound(spec.difficulty_horizon)
+            if spec.difficulty[0] <= bound <= spec.difficulty[1]:
+                break
+        else:
+            raise ValueError(f"No blueprint within difficulty {spec.difficulty} after {spec.max_attempts} attempts")
+        yield blueprint
+
+
+def _format_costs(resources: Dict[str, int]) -> str:
+    items = [f"{amount} {resource}" for resource, amount in resources.items()]
+    if len(items) == 1:
+        return items[0]
+    return f"{', '.join(items[:-1])} and {items[-1]}"
+
+
+def format_blueprint(blueprint_id: int, blueprint: Blueprint) -> str:
+    sentences = [f"Each {robot} robot costs {_format_costs(cost.resources)}."
+                 for robot, cost in blueprint.robot_costs.items()]
+    return f"Blueprint {blueprint_id}: {' '.join(sentences)}"
+
+
+def write_catalog(filename: str, count: int, spec: CatalogSpec, seed: int = 0) -> None:
+    """Streams a generated catalog to filename, one blueprint per line"""
+    with open(filename, 'w', encoding='utf-8') as f:
+        for blueprint_id, blueprint in enumerate(generate_blueprints(count, spec, seed), 1):
+            f.write(format_blueprint(blueprint_id, blueprint) + "\n")
+
+
+def _parse_range(value: str) -> Tuple[int, int]:
+    low, _, high = value.partition(':')
+    return int(low), int(high or low)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic blueprint catalog")
+    parser.add_argument("output")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--resource-types", type=int, default=4)
+    parser.add_argument("--ore-cost", type=_parse_range, default=(2, 4), help="MIN:MAX")
+    parser.add_argument("--chain-cost", type=_parse_range, default=(5, 20), help="MIN:MAX")
+    parser.add_argument("--extra-cost-probability", type=float, default=0.0)
+    parser.add_argument("--difficulty", type=_parse_range, default=None,
+                        help="MIN:MAX relaxation upper bound at --difficulty-horizon")
+    parser.add_argument("--difficulty-horizon", type=int, default=24)
+    args = parser.parse_args(argv)
+
+    spec = CatalogSpec(args.resource_types, args.ore_cost, args.chain_cost, args.extra_cost_probability,
+                       args.difficulty, args.difficulty_horizon)
+    write_catalog(args.output, args.count, spec, args.seed)
+    print(f"Wrote {args.count} blueprints to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
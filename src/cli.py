@@ -0,0 +1,199 @@
+# === Command-line entry point ===
+"""
+    python -m src data/blueprints.txt --time-limit 32 --calculator product --max-blueprints 3 --jobs 3
+    cat data/blueprints.txt | python -m src - --cache ~/.cache/blueprints
+
+Prints one line per blueprint as soon as its result is known, then the
+calculator result. Lines are read as they arrive, so a blueprint is solved (or
+found in the cache) before the following ones are read; only the batch engine
+waits for the whole input. Only argparse is imported up front; the
+search modules are imported once a blueprint actually needs solving, so a fully
+cached run stays a fast start (see benchmarks/startup_bench.py).
+"""
+import argparse
+import sys
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+# src.solver.ENGINES, spelled out so that parsing the arguments does not import the solver
+ENGINE_CHOICES = ("python", "jit", "batch", "auto")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src", description="Solve a file of robot factory blueprints")
+    parser.add_argument("file", help="blueprint file, one blueprint per line (- reads standard input)")
+    parser.add_argument("-t", "--time-limit", type=int, default=24, help="horizon in minutes")
+    parser.add_argument("-r", "--final-resource", default="geode", help="resource to maximize")
+    parser.add_argument("-c", "--calculator", choices=("quality", "product"), default="quality")
+    parser.add_argument("-n", "--max-blueprints", type=int, default=None, help="only the first N blueprints")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes (0 = one per core)")
+    parser.add_argument("-e", "--engine", choices=ENGINE_CHOICES, default="python")
+    parser.add_argument("--cache", metavar="DIR", default=None,
+                        help="reuse and record results in DIR (see src.result_cache.DiskResultCache)")
+    return parser
+
+
+class InputError(Exception):
+    """Unreadable input file or invalid blueprint line"""
+
+
+def _read_lines(source: str, stdin: TextIO) -> Iterator[str]:
+    """Non-empty lines of source, read as they are consumed"""
+    if source == "-":
+        yield from (line.strip() for line in stdin if line.strip())
+        return
+    with open(source, 'r', encoding='utf-8') as f:
+        yield from (line.strip() for line in f if line.strip())
+
+
+def _parse_blueprints(lines: Iterable[str], final_resource: str) -> Iterator[Tuple[int, "Blueprint"]]:
+    """(blueprint ID, blueprint) of each line as it is read; bad input raises InputError"""
+    from src.blueprint import DefaultBlueprintParser
+    parser = DefaultBlueprintParser()
+    try:
+        for blueprint_id, line in enumerate(lines, 1):
+            blueprint = parser.parse(line)
+            if final_resource not in blueprint.robot_costs:
+                raise InputError(f"blueprint {blueprint_id} has no {final_resource} robot")
+            yield blueprint_id, blueprint
+    except (OSError, ValueError) as e:
+        raise InputError(str(e)) from e
+
+
+# Cached final resource count of a blueprint (None = to solve)
+Lookup = Callable[[int, "Blueprint"], Optional[int]]
+
+
+def _solve_pending(blueprints: Iterable[Tuple[int, "Blueprint"]], lookup: Lookup, time_limit: int,
+                   final_resource: str, engine: str, jobs: int) -> Iterator[Tuple[int, int, bool]]:
+    """
+    (blueprint ID, final resource count, whether it was cached) of each blueprint,
+    in completion order. Each blueprint is looked up, then solved, as soon as it
+    is read, except by the batch engine, which solves the whole input at once.
+    The search is imported with the first blueprint to solve.
+    """
+    if engine == "batch":
+        pending = {}
+        for blueprint_id, blueprint in blueprints:
+            cached = lookup(blueprint_id, blueprint)
+            if cached is not None:
+                yield blueprint_id, cached, True
+            else:
+                pending[blueprint_id] = blueprint
+        if pending:
+            from src.batch_engine import solve_batch
+            for blueprint_id, count in zip(pending, solve_batch(list(pending.values()), time_limit, final_resource)):
+                yield blueprint_id, count, False
+        return
+
+    if jobs == 1:
+        for blueprint_id, blueprint in blueprints:
+            cached = lookup(blueprint_id, blueprint)
+            if cached is not None:
+                yield blueprint_id, cached, True
+                continue
+            from src.solver import solve_blueprint
+            yield blueprint_id, solve_blueprint(blueprint, time_limit, final_resource, engine=engine), False
+        return
+
+    yield from _solve_in_pool(blueprints, lookup, time_limit, final_resource, engine, jobs)
+
+
+def _solve_in_pool(blueprints: Iterable[Tuple[int, "Blueprint"]], lookup: Lookup, time_limit: int,
+                   final_resource: str, engine: str, jobs: int) -> Iterator[Tuple[int, int, bool]]:
+    """_solve_pending in worker processes: a thread reads the input, so that results
+    are yielded while the next line is awaited"""
+    import threading
+    from queue import Queue
+    events: Queue = Queue()
+
+    def read() -> None:
+        try:
+            for item in blueprints:
+                events.put(("read", item))
+        except Exception as e:
+            events.put(("error", e))
+        else:
+            events.put(("end", None))
+
+    threading.Thread(target=read, daemon=True).start()
+    executor = None
+    reading = True
+    running = 0
+    try:
+        while reading or running:
+            kind, value = events.get()
+            if kind == "read":
+                blueprint_id, blueprint = value
+                cached = lookup(blueprint_id, blueprint)
+                if cached is not None:
+                    yield blueprint_id, cached, True
+                    continue
+                if executor is None:
+                    import multiprocessing
+                    from concurrent.futures import ProcessPoolExecutor
+                    from src.solver import solve_blueprint
+                    # Not forked: a child would inherit the stdin lock held by the reading thread
+                    executor = ProcessPoolExecutor(max_workers=jobs or None,
+                                                   mp_context=multiprocessing.get_context("spawn"))
+                future = executor.submit(solve_blueprint, blueprint, time_limit, final_resource, engine=engine)
+                future.add_done_callback(lambda future, blueprint_id=blueprint_id:
+                                         events.put(("solved", (blueprint_id, future))))
+                running += 1
+            elif kind == "solved":
+                running -= 1
+                blueprint_id, future = value
+                yield blueprint_id, future.result(), False
+            elif kind == "error":
+                raise value
+            else:
+                reading = False
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def main(argv: Optional[List[str]] = None, stdin: TextIO = None, stdout: TextIO = None) -> int:
+    args = build_parser().parse_args(argv)
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+
+    from src.blueprint import blueprint_fingerprint
+    from src.calculators import CALCULATORS
+
+    cache = None
+    if args.cache is not None:
+        from src.result_cache import DiskResultCache
+        cache = DiskResultCache(args.cache)
+
+    def report(blueprint_id: int, final_resource_count: int) -> None:
+        results[blueprint_id] = final_resource_count
+        stdout.write(f"Blueprint {blueprint_id}: {final_resource_count} {args.final_resource}s\n")
+        stdout.flush()
+
+    results: Dict[int, int] = {}
+    fingerprints = {}
+
+    def lookup(blueprint_id: int, blueprint: "Blueprint") -> Optional[int]:
+        if cache is None:
+            return None
+        fingerprints[blueprint_id] = blueprint_fingerprint(blueprint)
+        return cache.get(fingerprints[blueprint_id], args.time_limit, args.final_resource)
+
+    lines = islice(_read_lines(args.file, stdin), args.max_blueprints)
+    try:
+        for blueprint_id, final_resource_count, cached in _solve_pending(
+            _parse_blueprints(lines, args.final_resource), lookup,
+            args.time_limit, args.final_resource, args.engine, args.jobs
+        ):
+            if cache is not None and not cached:
+                cache.put(fingerprints[blueprint_id], args.time_limit, args.final_resource, final_resource_count)
+            report(blueprint_id, final_resource_count)
+    except InputError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    blueprint_ids = sorted(results)
+    result = CALCULATORS[args.calculator]().calculate([results[i] for i in blueprint_ids], blueprint_ids)
+    stdout.write(f"Result: {result}\n")
+    return 0
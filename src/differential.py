@@ -0,0 +1,269 @@
+# === Reference solver and differential testing ===
+"""
+Runs every engine and pruning option against a deliberately simple exhaustive
+solver on random small blueprints, and shrinks each disagreement to a
+reproducible blueprint line.
+
+    python -m src.differential --count 200 --resource-types 2 3 4 --time-limits 8 10 12 --seed 1
+"""
+import argparse
+import sys
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional
+
+from src.blueprint import Blueprint, RobotCost
+from src.catalog import CatalogSpec, RESOURCE_CHAIN, format_blueprint, generate_blueprints
+from src.opening_book import OpeningBook
+from src.optimization_service import OptimizedRobotFactory
+from src.solver import solve_blueprint
+
+# Small costs, so that short horizons still reach the final resource
+DEFAULT_SPEC = CatalogSpec(ore_cost=(1, 4), chain_cost=(1, 8), extra_cost_probability=0.3)
+DEFAULT_RESOURCE_TYPES = [2, 3, 4]
+DEFAULT_TIME_LIMITS = [8, 10, 12]
+# Shorter than the default opening and endgame, so that short horizons use both
+OPENING_MINUTES = 4
+ENDGAME_MINUTES = 3
+
+
+def reference_max_final_resource(blueprint: Blueprint, time_limit: int, final_resource: str = "geode") -> int:
+    """
+    Maximum final resource by trying every robot (or none) every minute.
+    No bound, no spending cap, no ordering: only the rules of the game and a
+    memo of (minute, resources, robots) states, so it is slow but easy to trust.
+    Meant for short horizons.
+    """
+    resource_types = list(blueprint.robot_costs)
+    final_index = resource_types.index(final_resource)
+    costs = [[blueprint.robot_costs[robot].resources.get(resource, 0) for resource in resource_types]
+             for robot in resource_types]
+
+    @lru_cache(maxsize=None)
+    def best(time: int, resources: tuple, robots: tuple) -> int:
+        if time == time_limit:
+            return resources[final_index]
+        collected = tuple(resource + robot for resource, robot in zip(resources, robots))
+        result = best(time + 1, collected, robots)
+        for robot, cost in enumerate(costs):
+            if all(have >= need for have, need in zip(resources, cost)):
+                result = max(result, best(
+                    time + 1,
+                    tuple(have - need for have, need in zip(collected, cost)),
+                    tuple(count + (i == robot) for i, count in enumerate(robots)),
+                ))
+        return result
+
+    start_robots = tuple(1 if i == 0 else 0 for i in range(len(resource_types)))
+    return best(0, tuple(0 for _ in resource_types), start_robots)
+
+
+@dataclass(frozen=True)
+class Variant:
+    """
+    An engine/option combination under test
+    Args:
+        name: Name used in reports
+        solve: (blueprint, time_limit, final_resource) -> claimed optimum
+        exact: False when the result only has to bound the optimum from above
+    """
+    name: str
+    solve: Callable[[Blueprint, int, str], int]
+    exact: bool = True
+
+    def agrees(self, expected: int, actual: int) -> bool:
+        return actual == expected if self.exact else actual >= expected
+
+
+def _seeded(blueprint: Blueprint, time_limit: int, final_resource: str) -> int:
+    # The optimum of a shorter horizon is always achievable, as max_final_resource requires
+    seed = reference_max_final_resource(blueprint, time_limit - 1, final_resource) if time_limit > 0 else 0
+    return solve_blueprint(blueprint, time_limit, final_resource, lower_bound=seed)
+
+
+def _replayed_plan(blueprint: Blueprint, time_limit: int, final_resource: str) -> int:
+    plan = []
+    solve_blueprint(blueprint, time_limit, final_resource, plan=plan)
+    return OptimizedRobotFactory(blueprint, final_resource).replay_plan(plan, time_limit)
+
+
+def _by_decision(blueprint: Blueprint, time_limit: int, final_resource: str) -> int:
+    return OptimizedRobotFactory(blueprint, final_resource).max_final_resource_by_decision(time_limit)
+
+
+def _every_resource(blueprint: Blueprint, time_limit: int, final_resource: str) -> int:
+    # One search maximizing every resource; each other target must match its own
+    # single-resource search, or the variant reports -1 for final_resource
+    factory = OptimizedRobotFactory(blueprint, final_resource)
+    results = factory.max_final_resources(factory.resource_types, time_limit)
+    for resource, result in results.items():
+        if resource != final_resource and result != solve_blueprint(blueprint, time_limit, resource):
+            return -1
+    return results[final_resource]
+
+
+def _upper_bound(blueprint: Blueprint, time_limit: int, final_resource: str) -> int:
+    return OptimizedRobotFactory(blueprint, final_resource).upper_bound(time_limit)
+
+
+def default_variants() -> List[Variant]:
+    """Every engine and pruning option available in this environment"""
+    # Shared by the variants' blueprints, so that openings are also reused across them
+    book = OpeningBook(minutes=OPENING_MINUTES)
+    variants = [
+        Variant("python", lambda bp, t, r: solve_blueprint(bp, t, r)),
+        Variant("python_capped", lambda bp, t, r: solve_blueprint(bp, t, r, cap_resources=True)),
+        Variant("python_seen_limit", lambda bp, t, r: solve_blueprint(bp, t, r, seen_limit=64)),
+        Variant("python_capped_seen_limit",
+                lambda bp, t, r: solve_blueprint(bp, t, r, cap_resources=True, seen_limit=64)),
+        Variant("python_seeded", _seeded),
+        Variant("python_opening_book", lambda bp, t, r: solve_blueprint(bp, t, r, opening_book=book)),
+        Variant("python_opening_book_capped_seen_limit",
+                lambda bp, t, r: solve_blueprint(bp, t, r, cap_resources=True, seen_limit=64, opening_book=book)),
+        Variant("python_endgame", lambda bp, t, r: solve_blueprint(bp, t, r, endgame_minutes=ENDGAME_MINUTES)),
+        Variant("python_opening_book_endgame",
+                lambda bp, t, r: solve_blueprint(bp, t, r, opening_book=book, endgame_minutes=ENDGAME_MINUTES)),
+        Variant("every_resource", _every_resource),
+        Variant("plan_replay", _replayed_plan),
+        Variant("decision", _by_decision),
+        Variant("upper_bound", _upper_bound, exact=False),
+    ]
+    # Imported lazily: numpy/numba are optional and slow to import
+    from src.jit_kernel import JIT_AVAILABLE
+    if JIT_AVAILABLE:
+        variants.append(Variant("jit", lambda bp, t, r: solve_blueprint(bp, t, r, engine="jit")))
+    try:
+        import numpy  # noqa: F401
+    except ImportError:  # pragma: no cover - depends on the environment
+        pass
+    else:
+        variants.append(Variant("batch", lambda bp, t, r: solve_blueprint(bp, t, r, engine="batch")))
+    return variants
+
+
+@dataclass
+class Mismatch:
+    """A variant disagreeing with the reference solver"""
+    variant: str
+    blueprint: Blueprint
+    time_limit: int
+    final_resource: str
+    expected: int
+    actual: int
+
+    def blueprint_line(self) -> str:
+        return format_blueprint(1, self.blueprint)
+
+    def describe(self) -> str:
+        return (f"{self.variant}: {self.actual} instead of {self.expected} {self.final_resource} "
+                f"in {self.time_limit} minutes\n  {self.blueprint_line()}")
+
+
+@dataclass
+class DifferentialReport:
+    cases: int = 0
+    mismatches: List[Mismatch] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches
+
+
+def check_blueprint(blueprint: Blueprint, time_limit: int, final_resource: str,
+                    variants: Iterable[Variant]) -> List[Mismatch]:
+    """Mismatches of each variant against the reference solver on one case"""
+    expected = reference_max_final_resource(blueprint, time_limit, final_resource)
+    mismatches = []
+    for variant in variants:
+        actual = variant.solve(blueprint, time_limit, final_resource)
+        if not variant.agrees(expected, actual):
+            mismatches.append(Mismatch(variant.name, blueprint, time_limit, final_resource, expected, actual))
+    return mismatches
+
+
+def _smaller_blueprints(blueprint: Blueprint) -> Iterable[Blueprint]:
+    """Candidates one step simpler: a cost lowered by one, or a cost dropped"""
+    for robot, cost in blueprint.robot_costs.items():
+        for resource, amount in cost.resources.items():
+            candidates = [amount - 1] if amount > 1 else []
+            if len(cost.resources) > 1:
+                candidates.append(None)
+            for candidate in candidates:
+                robot_costs = {name: RobotCost(dict(other.resources)) for name, other in blueprint.robot_costs.items()}
+                if candidate is None:
+                    del robot_costs[robot].resources[resource]
+                else:
+                    robot_costs[robot].resources[resource] = candidate
+                yield Blueprint(robot_costs)
+
+
+def minimize(mismatch: Mismatch, variant: Variant) -> Mismatch:
+    """
+    Greedily shrinks a failing case while the variant still disagrees with the
+    reference: shorter horizon first, then cheaper or fewer costs, until no
+    single step keeps it failing
+    """
+    current = mismatch
+    while True:
+        candidates = [(current.blueprint, time_limit) for time_limit in range(1, current.time_limit)]
+        candidates += [(blueprint, current.time_limit) for blueprint in _smaller_blueprints(current.blueprint)]
+        for blueprint, time_limit in candidates:
+            failures = check_blueprint(blueprint, time_limit, current.final_resource, [variant])
+            if failures:
+                current = failures[0]
+                break
+        else:
+            return current
+
+
+def run_differential(
+    count: int = 50,
+    resource_types: Iterable[int] = DEFAULT_RESOURCE_TYPES,
+    time_limits: Iterable[int] = DEFAULT_TIME_LIMITS,
+    spec: CatalogSpec = DEFAULT_SPEC,
+    seed: int = 0,
+    variants: Optional[List[Variant]] = None,
+    shrink: bool = True,
+) -> DifferentialReport:
+    """
+    Checks every variant on count generated blueprints per chain length, at each
+    horizon, maximizing the last resource of the chain. Each mismatch is
+    minimized (unless shrink is False) and reported once per variant and blueprint.
+    """
+    variants = default_variants() if variants is None else variants
+    by_name = {variant.name: variant for variant in variants}
+    report = DifferentialReport()
+    for depth in resource_types:
+        final_resource = RESOURCE_CHAIN[depth - 1]
+        for blueprint in generate_blueprints(count, replace(spec, resource_types=depth), seed):
+            failed = set()
+            for time_limit in time_limits:
+                report.cases += 1
+                pending = [variant for variant in variants if variant.name not in failed]
+                for mismatch in check_blueprint(blueprint, time_limit, final_resource, pending):
+                    failed.add(mismatch.variant)
+                    if shrink:
+                        mismatch = minimize(mismatch, by_name[mismatch.variant])
+                    report.mismatches.append(mismatch)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check every engine against the reference solver")
+    parser.add_argument("--count", type=int, default=50, help="blueprints per chain length")
+    parser.add_argument("--resource-types", type=int, nargs="+", default=DEFAULT_RESOURCE_TYPES)
+    parser.add_argument("--time-limits", type=int, nargs="+", default=DEFAULT_TIME_LIMITS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-shrink", action="store_true", help="report failing cases as generated")
+    args = parser.parse_args(argv)
+
+    report = run_differential(args.count, args.resource_types, args.time_limits, seed=args.seed,
+                              shrink=not args.no_shrink)
+    for mismatch in report.mismatches:
+        print(mismatch.describe())
+    print(f"{report.cases} cases, {len(report.mismatches)} mismatches")
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
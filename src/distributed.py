@@ -0,0 +1,335 @@
+# === Distributed coordinator/worker mode ===
+"""
+Blueprint solves handed out over TCP to worker processes, possibly on other hosts.
+
+    python -m src.distributed coordinator data/blueprints.txt --port 7100 --time-limit 32
+    python -m src.distributed worker --host coordinator-host --port 7100     # on each worker host
+
+The protocol is one JSON object per line. A worker says hello, then receives
+one task at a time and answers with its result; while it searches it sends a
+heartbeat every heartbeat_interval seconds. The coordinator gives a task back
+to the queue when its worker disconnects or stays silent for heartbeat_timeout
+seconds, and sends shutdown to every worker once the work is done. Each task
+is one blueprint at one horizon (the search itself is not split).
+"""
+import argparse
+import json
+import logging
+import queue
+import socket
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from src.blueprint import Blueprint, RobotCost
+from src.calculators import CALCULATORS, QualityCalculator
+from src.save import _write_analysis_file
+from src.solver import SolverConfig, _load_blueprints, solve_blueprint
+from src.stats import SearchStats, SolveStats
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 1.0
+HEARTBEAT_TIMEOUT = 10.0
+
+
+@dataclass
+class Task:
+    task_id: int
+    blueprint: Blueprint
+    time_limit: int
+    final_resource: str
+    engine: str = "python"
+
+    def to_message(self) -> Dict:
+        return {
+            "type": "task", "task_id": self.task_id, "time_limit": self.time_limit,
+            "final_resource": self.final_resource, "engine": self.engine,
+            # Robot order is significant, and JSON objects keep it
+            "blueprint": {robot: cost.resources for robot, cost in self.blueprint.robot_costs.items()},
+        }
+
+
+def _blueprint_from_message(costs: Dict[str, Dict[str, int]]) -> Blueprint:
+    return Blueprint({robot: RobotCost(dict(resources)) for robot, resources in costs.items()})
+
+
+class _Connection:
+    """JSON lines over a socket; sends may come from several threads"""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self._reader = sock.makefile('r', encoding='utf-8')
+        self._send_lock = threading.Lock()
+
+    def send(self, message: Dict) -> None:
+        data = (json.dumps(message) + "\n").encode('utf-8')
+        with self._send_lock:
+            self.sock.sendall(data)
+
+    def receive(self) -> Dict:
+        """Next message (ConnectionError at end of stream, socket.timeout after the socket's timeout)"""
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("connection closed")
+        return json.loads(line)
+
+    def close(self) -> None:
+        try:
+            self._reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class Coordinator:
+    """
+    Serves tasks to the workers that connect to (host, port); port 0 picks a
+    free port (see address). Use as a context manager, or call close().
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, heartbeat_timeout: float = HEARTBEAT_TIMEOUT):
+        self.heartbeat_timeout = heartbeat_timeout
+        self._server = socket.create_server((host, port))
+        # (job ID, task) of every solve call, a job per call
+        self._pending: "queue.Queue[Tuple[int, Task]]" = queue.Queue()
+        # (job ID, task_id) -> (final resource count, stats), or the error reported by the worker
+        self._results: Dict[Tuple[int, int], Tuple[int, SearchStats]] = {}
+        self._errors: Dict[Tuple[int, int], str] = {}
+        self._jobs = set()
+        self._next_job = 0
+        self._done = threading.Condition()
+        self._closed = threading.Event()
+        # Tasks sent to a worker, re-dispatches included
+        self.dispatches = 0
+        self._accept_thread = threading.Thread(target=self._accept, daemon=True)
+        self._accept_thread.start()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.getsockname()[:2]
+
+    def __enter__(self) -> "Coordinator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stops accepting workers; connected ones are sent shutdown"""
+        self._closed.set()
+        try:
+            self._server.close()
+        except OSError:
+            pass
+
+    def solve(self, tasks: List[Task], timeout: Optional[float] = None) -> Dict[int, Tuple[int, SearchStats]]:
+        """
+        (final resource count, stats) of every task by task_id, once the workers
+        solved them all. Raises RuntimeError when a worker reports a failed
+        task, TimeoutError when timeout seconds pass first. Each call is a job
+        of its own: task IDs may repeat across calls, and results arriving
+        after the call returned are dropped.
+        """
+        with self._done:
+            job = self._next_job
+            self._next_job += 1
+            self._jobs.add(job)
+        keys = {(job, task.task_id) for task in tasks}
+        for task in tasks:
+            self._pending.put((job, task))
+        with self._done:
+            try:
+                finished = self._done.wait_for(
+                    lambda: self._errors.keys() & keys or keys <= self._results.keys(), timeout
+                )
+                failed = sorted(self._errors.keys() & keys)
+                if failed:
+                    raise RuntimeError(f"Task {failed[0][1]} failed: {self._errors[failed[0]]}")
+                if not finished:
+                    raise TimeoutError(f"{len(keys - self._results.keys())} tasks unsolved after {timeout}s")
+                return {task_id: self._results[job, task_id] for _, task_id in keys}
+            finally:
+                # Tasks of a finished job still queued or running are dropped
+                self._jobs.discard(job)
+                for key in keys:
+                    self._results.pop(key, None)
+                    self._errors.pop(key, None)
+
+    def _accept(self) -> None:
+        while not self._closed.is_set():
+            try:
+                sock, address = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(_Connection(sock), address), daemon=True).start()
+
+    def _serve(self, connection: _Connection, address) -> None:
+        connection.sock.settimeout(self.heartbeat_timeout)
+        try:
+            worker = connection.receive().get("worker", f"{address[0]}:{address[1]}")
+        except (OSError, ValueError):
+            connection.close()
+            return
+        logger.info("Worker %s connected", worker)
+        try:
+            while not self._closed.is_set():
+                try:
+                    job, task = self._pending.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                with self._done:
+                    if job not in self._jobs or (job, task.task_id) in self._results:
+                        continue
+                    self.dispatches += 1
+                try:
+                    connection.send(task.to_message())
+                    reply = self._await_reply(connection)
+                except (OSError, ValueError) as e:
+                    # Dead, hung or garbled worker: someone else gets the task
+                    logger.warning("Worker %s lost with task %d (%s); re-dispatching", worker, task.task_id, e)
+                    self._pending.put((job, task))
+                    return
+                with self._done:
+                    if job not in self._jobs:
+                        continue
+                    if reply["type"] == "result":
+                        self._results.setdefault((job, task.task_id),
+                                                 (reply["result"], SearchStats(**reply["stats"])))
+                    else:
+                        self._errors[job, task.task_id] = f"{reply.get('error')} (worker {worker})"
+                    self._done.notify_all()
+            connection.send({"type": "shutdown"})
+        except OSError:
+            pass
+        finally:
+            connection.close()
+
+    def _await_reply(self, connection: _Connection) -> Dict:
+        while True:
+            message = connection.receive()
+            if message.get("type") in ("result", "error"):
+                return message
+
+
+def _heartbeat(connection: _Connection, interval: float, stop: threading.Event) -> None:
+    while not stop.wait(interval):
+        try:
+            connection.send({"type": "heartbeat"})
+        except OSError:
+            return
+
+
+def run_worker(host: str, port: int, name: Optional[str] = None,
+               heartbeat_interval: float = HEARTBEAT_INTERVAL) -> int:
+    """Solves the coordinator's tasks until it sends shutdown or goes away; returns the tasks solved"""
+    connection = _Connection(socket.create_connection((host, port)))
+    solved = 0
+    try:
+        connection.send({"type": "hello", "worker": name or f"{socket.gethostname()}:{threading.get_ident()}"})
+        while True:
+            try:
+                message = connection.receive()
+            except (OSError, ValueError):
+                return solved
+            if message["type"] == "shutdown":
+                return solved
+            if message["type"] != "task":
+                continue
+
+            stop = threading.Event()
+            beating = threading.Thread(target=_heartbeat, args=(connection, heartbeat_interval, stop), daemon=True)
+            beating.start()
+            try:
+                stats = SearchStats()
+                result = solve_blueprint(
+                    _blueprint_from_message(message["blueprint"]), message["time_limit"],
+                    message["final_resource"], stats=stats, engine=message.get("engine", "python")
+                )
+                reply = {"type": "result", "task_id": message["task_id"], "result": result,
+                         "stats": stats.to_dict()}
+            except Exception as e:
+                reply = {"type": "error", "task_id": message["task_id"], "error": str(e)}
+            finally:
+                stop.set()
+                beating.join()
+            connection.send(reply)
+            solved += 1
+    finally:
+        connection.close()
+
+
+def solve_blueprints_distributed(
+    config: SolverConfig,
+    coordinator: Coordinator,
+    stats: Optional[SolveStats] = None,
+    timeout: Optional[float] = None,
+) -> Tuple[List[int], List[int]]:
+    """solve_blueprints with every blueprint solved by the coordinator's workers"""
+    blueprints = _load_blueprints(config)
+    tasks = [Task(blueprint_id, blueprint, config.time_limit, config.final_resource, config.engine)
+             for blueprint_id, blueprint in enumerate(blueprints, 1)]
+    results = coordinator.solve(tasks, timeout)
+    blueprint_ids = [task.task_id for task in tasks]
+    if stats is not None:
+        for blueprint_id in blueprint_ids:
+            stats.blueprints[blueprint_id] = results[blueprint_id][1]
+    return [results[blueprint_id][0] for blueprint_id in blueprint_ids], blueprint_ids
+
+
+def calculate_and_write_analysis_distributed(config: SolverConfig, coordinator: Coordinator,
+                                             timeout: Optional[float] = None) -> int:
+    """calculate_and_write_analysis, solved by the coordinator's workers"""
+    if config.calculator is None:
+        config.calculator = QualityCalculator()
+    stats = SolveStats() if config.include_stats else None
+    final_resource_results, blueprint_ids = solve_blueprints_distributed(config, coordinator, stats, timeout)
+    _write_analysis_file(config.output_file, blueprint_ids, final_resource_results, stats=stats)
+    return config.calculator.calculate(final_resource_results, blueprint_ids)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Distributed blueprint solving")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    coordinator = commands.add_parser("coordinator", help="serve the blueprints of a file to workers")
+    coordinator.add_argument("file")
+    coordinator.add_argument("--host", default="0.0.0.0")
+    coordinator.add_argument("--port", type=int, default=7100)
+    coordinator.add_argument("--time-limit", type=int, default=24)
+    coordinator.add_argument("--final-resource", default="geode")
+    coordinator.add_argument("--calculator", choices=sorted(CALCULATORS), default="quality")
+    coordinator.add_argument("--max-blueprints", type=int, default=None)
+    coordinator.add_argument("--engine", default="python")
+    coordinator.add_argument("--output", default="./analysis.txt")
+    coordinator.add_argument("--heartbeat-timeout", type=float, default=HEARTBEAT_TIMEOUT)
+
+    worker = commands.add_parser("worker", help="solve a coordinator's tasks")
+    worker.add_argument("--host", default="127.0.0.1")
+    worker.add_argument("--port", type=int, default=7100)
+    worker.add_argument("--name", default=None)
+    worker.add_argument("--heartbeat-interval", type=float, default=HEARTBEAT_INTERVAL)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.command == "worker":
+        solved = run_worker(args.host, args.port, args.name, args.heartbeat_interval)
+        print(f"Solved {solved} tasks")
+        return 0
+
+    config = SolverConfig(
+        filename=args.file, time_limit=args.time_limit, calculator=CALCULATORS[args.calculator](),
+        max_blueprints=args.max_blueprints, output_file=args.output, final_resource=args.final_resource,
+        engine=args.engine
+    )
+    with Coordinator(args.host, args.port, args.heartbeat_timeout) as server:
+        print(f"Waiting for workers on {server.address[0]}:{server.address[1]}")
+        result = calculate_and_write_analysis_distributed(config, server)
+    print(f"Result: {result}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+# === Endgame tablebase ===
+"""
+Exact final resource gain of the last minutes of a search, memoized per
+blueprint. A state with m minutes left is keyed by m, its robots and its
+resources clamped to what m - 1 more builds can spend: a build in the last
+minute never pays off, so every state with the same key has the same best
+gain. The table does not depend on the horizon, so one table serves every
+time limit of a blueprint and final resource.
+"""
+from typing import Dict, Tuple
+
+from src.optimization_service import OptimizedRobotFactory
+
+# Minutes left from which the search looks the gain up instead of expanding,
+# tuned with `python -m benchmarks.solver_bench endgame`
+ENDGAME_MINUTES = 5
+# Entries kept per table; once full, new gains are computed but not stored
+MAX_ENTRIES = 200_000
+
+
+class EndgameTable:
+    """Lazily filled map of (minutes left, clamped resources, robots) to the exact remaining gain"""
+
+    def __init__(self, factory: OptimizedRobotFactory, minutes: int = ENDGAME_MINUTES,
+                 max_entries: int = MAX_ENTRIES):
+        self.factory = factory
+        self.minutes = minutes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        final = factory.final_index
+        # Most of each resource one build can spend (the final resource only pays for robots that cost it)
+        self._spend = [
+            max(cost[final] for cost in factory.cost_matrix) if i == final else factory.max_spend[rtype]
+            for i, rtype in enumerate(factory.resource_types)
+        ]
+        self._table: Dict[Tuple, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def gain(self, minutes_left: int, resources: tuple, robots: tuple) -> int:
+        """Most final resource that minutes_left more minutes can add to this state"""
+        limit = minutes_left - 1
+        key = (minutes_left, tuple(min(amount, spend * limit) for amount, spend in zip(resources, self._spend)),
+               robots)
+        gain = self._table.get(key)
+        if gain is not None:
+            self.hits += 1
+            return gain
+        self.misses += 1
+        gain = self._solve(*key)
+        if len(self._table) < self.max_entries:
+            self._table[key] = gain
+        return gain
+
+    def _solve(self, minutes_left: int, resources: tuple, robots: tuple) -> int:
+        factory = self.factory
+        final = factory.final_index
+        produced = robots[final]
+        if minutes_left == 1:
+            return produced
+        collected = tuple(amount + robot for amount, robot in zip(resources, robots))
+        best = 0
+        for choice in factory._get_build_options(resources, robots):
+            if choice is None:
+                gain = produced + self.gain(minutes_left - 1, collected, robots)
+            else:
+                built = factory.resource_types.index(choice)
+                new_robots = tuple(robot + (i == built) for i, robot in enumerate(robots))
+                gain = (produced - factory.cost_matrix[built][final]
+                        + self.gain(minutes_left - 1, factory._build_robot(choice, collected), new_robots))
+            if gain > best:
+                best = gain
+        return best
@@ -0,0 +1,148 @@
+# === Adaptive engine selection ===
+import json
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from src.blueprint import Blueprint
+from src.optimization_service import OptimizedRobotFactory
+
+logger = logging.getLogger(__name__)
+
+# Calibrated variants: an engine, possibly with a pruning rule ("python_capped"
+# is the python engine with cap_resources)
+VARIANTS = ("python", "python_capped", "jit", "batch")
+
+# Features compared between a blueprint and the calibration entries
+DISTANCE_FEATURES = ("time_limit", "upper_bound", "max_spend", "final_cost")
+
+
+@dataclass
+class EngineChoice:
+    """Engine and search options picked for one blueprint, with the reason"""
+    engine: str
+    cap_resources: bool = False
+    seen_limit: Optional[int] = None
+    reason: str = ""
+
+
+def blueprint_features(blueprint: Blueprint, time_limit: int, final_resource: str) -> Dict[str, int]:
+    """Cost features of a blueprint that drive the search effort"""
+    factory = OptimizedRobotFactory(blueprint, final_resource=final_resource)
+    return {
+        "resource_types": len(factory.resource_types),
+        "time_limit": time_limit,
+        "upper_bound": factory.upper_bound(time_limit),
+        "max_spend": sum(spend for rtype, spend in factory.max_spend.items() if rtype != factory.final_resource),
+        "final_cost": sum(factory.cost_matrix[factory.final_index]),
+    }
+
+
+def available_variants() -> List[str]:
+    """Variants whose optional dependencies are installed"""
+    from src.jit_kernel import JIT_AVAILABLE
+    variants = ["python", "python_capped"]
+    if JIT_AVAILABLE:
+        variants.append("jit")
+    try:
+        import numpy  # noqa: F401
+        variants.append("batch")
+    except ImportError:
+        pass
+    return variants
+
+
+class CalibrationTable:
+    """
+    Per-blueprint timings of each variant, written by the benchmark
+    (`python -m benchmarks.solver_bench calibrate`). Each entry holds the
+    blueprint features, the wall time of every variant and the peak seen-set size.
+    """
+
+    def __init__(self, entries: Optional[List[Dict]] = None):
+        self.entries = entries or []
+
+    @classmethod
+    def load(cls, path: str) -> "CalibrationTable":
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f)["entries"])
+
+    def save(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"entries": self.entries}, f, indent=2)
+
+    def nearest(self, features: Dict[str, int]) -> Optional[Dict]:
+        """Closest entry with the same number of resource types (relative distance)"""
+        candidates = [entry for entry in self.entries
+                      if entry["features"]["resource_types"] == features["resource_types"]]
+        if not candidates:
+            return None
+
+        def distance(entry: Dict) -> float:
+            return sum(
+                abs(entry["features"][name] - features[name]) / max(entry["features"][name], features[name], 1)
+                for name in DISTANCE_FEATURES
+            )
+        return min(candidates, key=distance)
+
+
+def _variant_choice(variant: str, reason: str) -> EngineChoice:
+    if variant == "python_capped":
+        return EngineChoice("python", cap_resources=True, reason=reason)
+    return EngineChoice(variant, reason=reason)
+
+
+def choose_engine(blueprint: Blueprint, time_limit: int, final_resource: str,
+                  table: Optional[CalibrationTable] = None,
+                  memory_budget: Optional[int] = None) -> EngineChoice:
+    """
+    Picks the engine and search options of a blueprint: the fastest available
+    variant of the nearest calibration entry, or fixed rules without one.
+    When the expected seen set exceeds memory_budget (visited states), the
+    python engine is used with its seen set limited to the budget.
+    """
+    features = blueprint_features(blueprint, time_limit, final_resource)
+    available = available_variants()
+    entry = table.nearest(features) if table is not None else None
+
+    if entry is not None:
+        timed = {variant: time for variant, time in entry["times"].items() if variant in available}
+    else:
+        timed = {}
+    if timed:
+        variant = min(timed, key=timed.get)
+        reference = entry["features"]
+        choice = _variant_choice(variant, (
+            f"calibration: nearest entry (t={reference['time_limit']}, bound {reference['upper_bound']}) "
+            f"is fastest with {variant} ({timed[variant]:.3f}s"
+            + "".join(f", {other} {time:.3f}s" for other, time in timed.items() if other != variant) + ")"
+        ))
+    elif "jit" in available:
+        choice = EngineChoice("jit", reason="no calibration entry: compiled kernel available")
+    else:
+        choice = EngineChoice("python", cap_resources=True,
+                              reason="no calibration entry and no numba: python with resource capping")
+
+    expected_seen = entry.get("peak_seen") if entry is not None else None
+    if memory_budget is not None:
+        if choice.engine != "python" and expected_seen is not None and expected_seen > memory_budget:
+            choice = EngineChoice("python", cap_resources=True, reason=(
+                f"{choice.reason}; expected {expected_seen} visited states exceed the memory budget"
+            ))
+        if choice.engine == "python":
+            choice.seen_limit = memory_budget
+            choice.reason += f"; seen set limited to {memory_budget} states"
+    return choice
+
+
+def resolve_engine(blueprint: Blueprint, time_limit: int, final_resource: str,
+                   table: Optional[CalibrationTable] = None,
+                   memory_budget: Optional[int] = None, blueprint_id: Optional[int] = None) -> EngineChoice:
+    """choose_engine, logging the choice and why"""
+    choice = choose_engine(blueprint, time_limit, final_resource, table, memory_budget)
+    logger.info(
+        "Blueprint %s: engine %s%s (%s)",
+        blueprint_id if blueprint_id is not None else "?", choice.engine,
+        " with resource capping" if choice.cap_resources else "", choice.reason
+    )
+    return choice
@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from typing import Callable, Optional, Union
+
+
+@dataclass
+class BlueprintStarted:
+    blueprint_id: int
+    total: int
+
+
+@dataclass
+class BlueprintProgress:
+    """Periodic report from inside the search (every CHECK_INTERVAL expanded nodes)"""
+    blueprint_id: int
+    nodes_expanded: int
+    elapsed: float
+    # Estimated seconds until the whole run finishes (None until a blueprint finished)
+    eta: Optional[float]
+
+
+@dataclass
+class BlueprintFinished:
+    blueprint_id: int
+    final_resource: str
+    final_resource_count: int
+    elapsed: float
+    eta: Optional[float]
+
+
+SolveEvent = Union[BlueprintStarted, BlueprintProgress, BlueprintFinished]
+EventCallback = Callable[[SolveEvent], None]
+
+
+def print_event(event: SolveEvent) -> None:
+    """Default listener: the console progress of solve_blueprints"""
+    if isinstance(event, BlueprintStarted):
+        print(f"Handle Blueprint {event.blueprint_id}...")
+    elif isinstance(event, BlueprintFinished):
+        print(f"Blueprint {event.blueprint_id}: {event.final_resource_count} {event.final_resource}s")
+
+
+class EtaEstimator:
+    """Estimates the remaining time of a run from the mean time of finished blueprints"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.finished = 0
+        self.finished_time = 0.0
+
+    def finish(self, elapsed: float) -> None:
+        self.finished += 1
+        self.finished_time += elapsed
+
+    def eta(self, current_elapsed: float = 0.0) -> Optional[float]:
+        if not self.finished:
+            return None
+        mean = self.finished_time / self.finished
+        return max(0.0, mean * (self.total - self.finished) - current_elapsed)
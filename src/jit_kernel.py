@@ -0,0 +1,216 @@
+# === JIT-compiled DFS kernel (optional) ===
+from time import perf_counter
+from typing import Callable, Optional
+
+from src.cancellation import CancellationToken, SolveCancelled
+from src.optimization_service import CHECK_INTERVAL, OptimizedRobotFactory
+from src.stats import SearchStats
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - depends on the environment
+    njit = None
+
+JIT_AVAILABLE = np is not None and njit is not None
+
+# Initial visited-table capacity (power of two, doubled at half load)
+INITIAL_CAPACITY = 1 << 16
+
+
+def _state_hash(state):
+    h = 0
+    for k in range(state.shape[0]):
+        h = ((h * 31) + state[k]) & 0x7FFFFFFF
+    return h ^ (h >> 16)
+
+
+def _insert(keys, used, state, capacity):
+    """Inserts state in the open-addressing table; False when it was already there"""
+    width = state.shape[0]
+    slot = _state_hash(state) & (capacity - 1)
+    while used[slot]:
+        equal = True
+        for k in range(width):
+            if keys[slot, k] != state[k]:
+                equal = False
+                break
+        if equal:
+            return False
+        slot = (slot + 1) & (capacity - 1)
+    used[slot] = True
+    for k in range(width):
+        keys[slot, k] = state[k]
+    return True
+
+
+def _grow(keys, used, capacity):
+    new_capacity = capacity * 2
+    new_keys = np.zeros((new_capacity, keys.shape[1]), dtype=np.int64)
+    new_used = np.zeros(new_capacity, dtype=np.bool_)
+    for slot in range(capacity):
+        if used[slot]:
+            _insert(new_keys, new_used, keys[slot], new_capacity)
+    return new_keys, new_used, new_capacity
+
+
+def _search_kernel(costs, max_spend, final_index, time_limit, lower_bound, initial_capacity, cancel_flag):
+    """
+    Same search as OptimizedRobotFactory.max_final_resource (same option order,
+    bound and visited-state pruning) over int64 rows [time, resources..., robots...].
+    Every CHECK_INTERVAL expanded nodes, stops early once cancel_flag[0] is set.
+    Returns (best, nodes, pruned_by_bound, pruned_by_seen, max_depth, seen_size).
+    """
+    check_mask = CHECK_INTERVAL - 1
+    n = costs.shape[0]
+    width = 2 * n + 1
+    # Each expansion pops one state and pushes at most n + 1, once per minute
+    stack = np.zeros((time_limit * n + 2, width), dtype=np.int64)
+    stack[0, 1 + n] = 1
+    top = 1
+
+    capacity = initial_capacity
+    keys = np.zeros((capacity, width), dtype=np.int64)
+    used = np.zeros(capacity, dtype=np.bool_)
+    seen_size = 0
+
+    state = np.zeros(width, dtype=np.int64)
+    best = lower_bound
+    nodes = 0
+    pruned_by_bound = 0
+    pruned_by_seen = 0
+    max_depth = 1
+
+    while top > 0:
+        top -= 1
+        for k in range(width):
+            state[k] = stack[top, k]
+        time = state[0]
+
+        if time == time_limit:
+            if state[1 + final_index] > best:
+                best = state[1 + final_index]
+            continue
+
+        minutes_left = time_limit - time
+        potential = (state[1 + final_index] + state[1 + n + final_index] * minutes_left
+                     + (minutes_left * (minutes_left - 1)) // 2)
+        if potential <= best:
+            pruned_by_bound += 1
+            continue
+
+        if not _insert(keys, used, state, capacity):
+            pruned_by_seen += 1
+            continue
+        seen_size += 1
+        if seen_size * 2 > capacity:
+            keys, used, capacity = _grow(keys, used, capacity)
+
+        nodes += 1
+        if not nodes & check_mask and cancel_flag[0]:
+            break
+
+        for i in range(n):
+            if i != final_index and state[1 + n + i] >= max_spend[i]:
+                continue
+            affordable = True
+            for j in range(n):
+                if state[1 + j] < costs[i, j]:
+                    affordable = False
+                    break
+            if not affordable:
+                continue
+            stack[top, 0] = time + 1
+            for j in range(n):
+                stack[top, 1 + j] = state[1 + j] + state[1 + n + j] - costs[i, j]
+                stack[top, 1 + n + j] = state[1 + n + j]
+            stack[top, 1 + n + i] += 1
+            top += 1
+
+        stack[top, 0] = time + 1
+        for j in range(n):
+            stack[top, 1 + j] = state[1 + j] + state[1 + n + j]
+            stack[top, 1 + n + j] = state[1 + n + j]
+        top += 1
+
+        if top > max_depth:
+            max_depth = top
+
+    return best, nodes, pruned_by_bound, pruned_by_seen, max_depth, seen_size
+
+
+if JIT_AVAILABLE:
+    _state_hash = njit(cache=True)(_state_hash)
+    _insert = njit(cache=True)(_insert)
+    _grow = njit(cache=True)(_grow)
+    # Without the GIL, threads beside a solve (e.g. worker heartbeats) keep running
+    _compiled_kernel = njit(cache=True, nogil=True)(_search_kernel)
+else:
+    _compiled_kernel = None
+
+
+def compile_factory(factory: OptimizedRobotFactory):
+    """(costs, max_spend) int64 arrays of a factory; the final resource is never capped"""
+    n = len(factory.resource_types)
+    costs = np.array(factory.cost_matrix, dtype=np.int64).reshape(n, n)
+    max_spend = np.array(
+        [0 if i == factory.final_index else factory.max_spend[rtype]
+         for i, rtype in enumerate(factory.resource_types)],
+        dtype=np.int64,
+    )
+    return costs, max_spend
+
+
+def jit_max_final_resource(
+    factory: OptimizedRobotFactory,
+    time_limit: int = 24,
+    cancel_token: Optional[CancellationToken] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+    stats: Optional[SearchStats] = None,
+    lower_bound: int = 0,
+) -> int:
+    """
+    max_final_resource run by the compiled kernel, falling back to the Python
+    engine when numba (or numpy) is not installed. The result and the search
+    counters are identical to the Python engine's.
+    Cancelling the token stops the compiled search within CHECK_INTERVAL nodes
+    (it polls a flag the token sets); on_progress is called once at the end.
+    """
+    if not JIT_AVAILABLE:
+        return factory.max_final_resource(
+            time_limit, cancel_token=cancel_token, on_progress=on_progress, stats=stats,
+            lower_bound=lower_bound
+        )
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled()
+
+    setup_start = perf_counter()
+    costs, max_spend = compile_factory(factory)
+    cancel_flag = np.zeros(1, dtype=np.uint8)
+    unregister = cancel_token.on_cancel(lambda: cancel_flag.fill(1)) if cancel_token is not None else None
+    search_start = perf_counter()
+    try:
+        best, nodes, pruned_by_bound, pruned_by_seen, max_depth, seen_size = _compiled_kernel(
+            costs, max_spend, factory.final_index, time_limit, lower_bound, INITIAL_CAPACITY, cancel_flag
+        )
+    finally:
+        if unregister is not None:
+            unregister()
+    if cancel_flag[0]:
+        raise SolveCancelled()
+
+    if stats is not None:
+        stats.nodes_expanded = int(nodes)
+        stats.pruned_by_bound = int(pruned_by_bound)
+        stats.pruned_by_seen = int(pruned_by_seen)
+        stats.max_stack_depth = int(max_depth)
+        stats.peak_seen_size = int(seen_size)
+        stats.phase_times["setup"] = search_start - setup_start
+        stats.phase_times["search"] = perf_counter() - search_start
+    if on_progress is not None:
+        on_progress(int(nodes))
+    return int(best)
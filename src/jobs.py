@@ -0,0 +1,136 @@
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from threading import Lock
+from typing import Callable, List, Optional
+
+from src.blueprint import Blueprint
+from src.cancellation import CancellationToken, SolveCancelled
+from src.solver import ResultCalculator, solve_blueprint
+from src.stats import SearchStats, SolveStats
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    @property
+    def finished(self) -> bool:
+        return self in (JobStatus.DONE, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+@dataclass
+class Job:
+    """A batch solve submitted to the JobStore, with its progress and results"""
+    id: str
+    blueprints: List[Blueprint]
+    time_limit: int
+    final_resource: str
+    calculator: ResultCalculator
+    status: JobStatus = JobStatus.PENDING
+    blueprints_done: int = 0
+    nodes_expanded: int = 0
+    final_resource_results: List[int] = field(default_factory=list)
+    result: Optional[int] = None
+    error: Optional[str] = None
+    stats: SolveStats = field(default_factory=SolveStats)
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    token: CancellationToken = field(default_factory=CancellationToken, repr=False)
+
+    @property
+    def blueprint_ids(self) -> List[int]:
+        return list(range(1, len(self.final_resource_results) + 1))
+
+
+class JobStore:
+    """
+    Local job store backed by a worker pool.
+    Finished jobs stay retrievable until more than max_finished of them exist,
+    at which point the oldest finished ones are evicted.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_finished: int = 1000,
+                 on_blueprint_solved: Optional[Callable[[SearchStats], None]] = None):
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.max_finished = max_finished
+        # Called from the worker thread with the stats of each solved blueprint
+        self.on_blueprint_solved = on_blueprint_solved
+
+    def submit(self, blueprints: List[Blueprint], time_limit: int,
+               final_resource: str, calculator: ResultCalculator) -> Job:
+        job = Job(uuid.uuid4().hex, blueprints, time_limit, final_resource, calculator)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict_finished()
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Request cancellation; a running search stops at its next check"""
+        job = self.get(job_id)
+        if job is not None and not job.status.finished:
+            job.token.cancel()
+            if job.status == JobStatus.PENDING:
+                self._finish(job, JobStatus.CANCELLED)
+        return job
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.token.cancel()
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job: Job) -> None:
+        if job.token.cancelled:
+            return
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        try:
+            for blueprint_id, blueprint in enumerate(job.blueprints, 1):
+                nodes_before = job.nodes_expanded
+                search_stats = SearchStats()
+
+                def on_progress(nodes: int) -> None:
+                    job.nodes_expanded = nodes_before + nodes
+
+                final_resource_count = solve_blueprint(
+                    blueprint, job.time_limit, job.final_resource,
+                    cancel_token=job.token, on_progress=on_progress, stats=search_stats
+                )
+                job.token.raise_if_cancelled()
+                if self.on_blueprint_solved is not None:
+                    self.on_blueprint_solved(search_stats)
+                job.stats.blueprints[blueprint_id] = search_stats
+                job.final_resource_results.append(final_resource_count)
+                job.blueprints_done += 1
+            job.result = job.calculator.calculate(job.final_resource_results, job.blueprint_ids)
+            self._finish(job, JobStatus.DONE)
+        except SolveCancelled:
+            self._finish(job, JobStatus.CANCELLED)
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, JobStatus.FAILED)
+
+    def _finish(self, job: Job, status: JobStatus) -> None:
+        job.finished_at = time.time()
+        job.status = status
+
+    def _evict_finished(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.status.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
@@ -0,0 +1,169 @@
+# === Opening book ===
+"""
+The first minutes of a search only depend on a few costs: in the opening, the
+expensive robots are never affordable and most max_spend caps are never
+reached. The opening book expands every plan of the first `minutes` minutes
+once, and keeps the deduplicated frontier of states at that minute together
+with what it depended on. Another blueprint reuses the frontier when it makes
+the same decisions during those minutes (see Opening.matches).
+Books persist as JSON lines in directory/openings.jsonl.
+"""
+import json
+import os
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from src.optimization_service import OptimizedRobotFactory
+
+# Minutes expanded by the book, tuned with `python -m benchmarks.solver_bench opening`
+OPENING_MINUTES = 8
+
+# (resources, robots) at the end of the opening
+FrontierState = Tuple[Tuple[int, ...], Tuple[int, ...]]
+
+
+def _caps(factory: OptimizedRobotFactory) -> List[Optional[int]]:
+    """max_spend per resource, None for uncapped"""
+    return [None if factory.max_spend[rtype] == float('inf') else factory.max_spend[rtype]
+            for rtype in factory.resource_types]
+
+
+@dataclass
+class Opening:
+    """Frontier of a blueprint's opening, and the bounds it was expanded within"""
+    resource_types: List[str]
+    minutes: int
+    # cost_matrix[robot][resource] and caps of the expanded blueprint
+    costs: List[List[int]]
+    caps: List[Optional[int]]
+    # Largest resource amounts and robot counts of the states where a build was decided
+    peak_resources: List[int]
+    peak_robots: List[int]
+    frontier: List[FrontierState]
+
+    def _reachable(self, cost: List[int]) -> bool:
+        return all(amount <= peak for amount, peak in zip(cost, self.peak_resources))
+
+    def matches(self, factory: OptimizedRobotFactory) -> bool:
+        """
+        Whether factory's opening expands to the same frontier: every robot costs
+        the same, or is unaffordable with the peak resources under both costs,
+        and every cap is the same, or above the peak robot count under both.
+        """
+        if factory.resource_types != self.resource_types:
+            return False
+        for cost, own_cost in zip(factory.cost_matrix, self.costs):
+            if list(cost) != own_cost and (self._reachable(cost) or self._reachable(own_cost)):
+                return False
+        for cap, own_cap, peak in zip(_caps(factory), self.caps, self.peak_robots):
+            if cap != own_cap and not ((cap is None or cap > peak) and (own_cap is None or own_cap > peak)):
+                return False
+        return True
+
+    def to_dict(self) -> Dict:
+        return {
+            "resource_types": self.resource_types, "minutes": self.minutes, "costs": self.costs, "caps": self.caps,
+            "peak_resources": self.peak_resources, "peak_robots": self.peak_robots,
+            "frontier": [[list(resources), list(robots)] for resources, robots in self.frontier],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Opening":
+        return cls(
+            data["resource_types"], int(data["minutes"]), data["costs"], data["caps"],
+            data["peak_resources"], data["peak_robots"],
+            [(tuple(resources), tuple(robots)) for resources, robots in data["frontier"]],
+        )
+
+
+def expand_opening(factory: OptimizedRobotFactory, minutes: int = OPENING_MINUTES) -> Opening:
+    """Every distinct state reachable after minutes, with the build options of the search"""
+    n = len(factory.resource_types)
+    initial = factory._initial_state()
+    states = {(initial.resources, initial.robots)}
+    peak_resources = [0] * n
+    peak_robots = [0] * n
+    for _ in range(minutes):
+        next_states = set()
+        for resources, robots in states:
+            for i in range(n):
+                peak_resources[i] = max(peak_resources[i], resources[i])
+                peak_robots[i] = max(peak_robots[i], robots[i])
+            collected = tuple(resource + robot for resource, robot in zip(resources, robots))
+            for choice in factory._get_build_options(resources, robots):
+                if choice is None:
+                    next_states.add((collected, robots))
+                    continue
+                built = factory.resource_types.index(choice)
+                new_robots = tuple(robot + (i == built) for i, robot in enumerate(robots))
+                next_states.add((factory._build_robot(choice, collected), new_robots))
+        states = next_states
+    return Opening(
+        list(factory.resource_types), minutes, [list(cost) for cost in factory.cost_matrix], _caps(factory),
+        peak_resources, peak_robots, sorted(states),
+    )
+
+
+class OpeningBook:
+    """
+    Openings shared by the blueprints that make the same early decisions,
+    kept in memory and, with a directory, persisted across runs (loaded on
+    first use, new openings appended; a torn last line is skipped).
+    Lookups count hits and misses. Safe to share between threads.
+    """
+    VERSION = 1
+    FILENAME = "openings.jsonl"
+
+    def __init__(self, directory: Optional[str] = None, minutes: int = OPENING_MINUTES):
+        self.path = os.path.join(directory, self.FILENAME) if directory is not None else None
+        self.minutes = minutes
+        self.hits = 0
+        self.misses = 0
+        self._openings: Optional[List[Opening]] = None
+        self._torn = False
+        self._lock = Lock()
+
+    def _load(self) -> List[Opening]:
+        if self._openings is None:
+            self._openings = []
+            if self.path is not None and os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                self._torn = bool(content) and not content.endswith("\n")
+                for line in content.splitlines():
+                    try:
+                        entry = json.loads(line)
+                        if entry["version"] == self.VERSION:
+                            self._openings.append(Opening.from_dict(entry["opening"]))
+                    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                        continue
+        return self._openings
+
+    def lookup(self, factory: OptimizedRobotFactory) -> Optional[Opening]:
+        with self._lock:
+            for opening in self._load():
+                if opening.minutes == self.minutes and opening.matches(factory):
+                    self.hits += 1
+                    return opening
+            self.misses += 1
+            return None
+
+    def opening(self, factory: OptimizedRobotFactory) -> Opening:
+        """The opening of factory's blueprint, expanded and recorded when no book matches"""
+        opening = self.lookup(factory)
+        if opening is not None:
+            return opening
+        opening = expand_opening(factory, self.minutes)
+        with self._lock:
+            self._load().append(opening)
+            if self.path is not None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(("\n" if self._torn else "")
+                            + json.dumps({"version": self.VERSION, "opening": opening.to_dict()}) + "\n")
+                self._torn = False
+        return opening
+
+    def __len__(self) -> int:
+        return len(self._load())
@@ -1,6 +1,20 @@
 # === Dynamic DFS  ===
 from collections import deque, namedtuple
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 from src.blueprint import Blueprint
+from src.cancellation import CancellationToken, SolveCancelled
+from src.stats import SearchStats
+
+if TYPE_CHECKING:
+    # src.endgame builds on this module
+    from src.endgame import EndgameTable
+
+# Expanded nodes between two cancellation/progress checks (power of two)
+CHECK_INTERVAL = 1 << 12
+
+# (minute, robot type) of each robot built, in order
+BuildPlan = List[Tuple[int, str]]
 
 
 class OptimizedRobotFactory:
@@ -10,15 +24,24 @@ class OptimizedRobotFactory:
         self.final_resource = final_resource or self.resource_types[-1]
         self.final_index = self.resource_types.index(self.final_resource)
         self.max_spend = self._max_resource_needed_per_turn()
+        self.cost_matrix = self._compile_costs()
         self.State = namedtuple("State", "time resources robots")
 
-    def _max_resource_needed_per_turn(self):
+    def _compile_costs(self) -> tuple:
+        """Integer cost matrix: cost_matrix[robot][resource], in resource_types order"""
+        return tuple(
+            tuple(self.blueprint.robot_costs[robot].resources.get(resource, 0) for resource in self.resource_types)
+            for robot in self.resource_types
+        )
+
+    def _max_resource_needed_per_turn(self, final_resources: Optional[List[str]] = None):
+        final_resources = final_resources or [self.final_resource]
         max_spend = {rtype: 0 for rtype in self.resource_types}
-        max_spend[self.final_resource] = float('inf')
         for robot_cost in self.blueprint.robot_costs.values():
             for rtype, amount in robot_cost.resources.items():
-                if rtype != self.final_resource:
-                    max_spend[rtype] = max(max_spend[rtype], amount)
+                max_spend[rtype] = max(max_spend[rtype], amount)
+        for rtype in final_resources:
+            max_spend[rtype] = float('inf')
         return max_spend
 
     def _can_build_robot(self, robot_type: str, resources: tuple) -> bool:
@@ -38,28 +61,108 @@ class OptimizedRobotFactory:
             tuple([1 if i == 0 else 0 for i in range(len(self.resource_types))])
         )
 
-    def _get_build_options(self, resources, robots) -> list:
+    def _get_build_options(self, resources, robots, max_spend: Optional[dict] = None) -> list:
         """ Return a list of robot types that can be built """
+        max_spend = max_spend or self.max_spend
         options = []
         for i, rtype in enumerate(self.resource_types):
-            if rtype != self.final_resource and robots[i] >= self.max_spend[rtype]:
+            if robots[i] >= max_spend[rtype]:
                 continue
             if self._can_build_robot(rtype, resources):
                 options.append(rtype)
         options.append(None)
         return options
 
-    def max_final_resource(self, time_limit: int = 24) -> int:
+    def upper_bound(self, time_limit: int = 24) -> int:
+        """
+        Cheap upper bound on max_final_resource: a relaxation in which every robot
+        type pays from its own copy of the resources and all affordable types are
+        built each minute. Each type is then built at least as early as in any real
+        plan, so the final resource produced can only be overestimated.
+        """
+        n = len(self.resource_types)
+        costs = self.cost_matrix
+        pools = [[0] * n for _ in range(n)]
+        robots = [1 if i == 0 else 0 for i in range(n)]
+        produced = 0
+
+        for _ in range(time_limit):
+            affordable = [all(pool[j] >= cost[j] for j in range(n)) for pool, cost in zip(pools, costs)]
+            produced += robots[self.final_index]
+            for pool in pools:
+                for j in range(n):
+                    pool[j] += robots[j]
+            for i in range(n):
+                if affordable[i]:
+                    for j in range(n):
+                        pools[i][j] -= costs[i][j]
+                    robots[i] += 1
+        return produced
+
+    def max_final_resource(
+        self,
+        time_limit: int = 24,
+        cancel_token: Optional[CancellationToken] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+        stats: Optional[SearchStats] = None,
+        lower_bound: int = 0,
+        plan: Optional[BuildPlan] = None,
+        cap_resources: bool = False,
+        seen_limit: Optional[int] = None,
+        start_states: Optional[List[tuple]] = None,
+        endgame: Optional["EndgameTable"] = None,
+    ) -> int:
+        """
+        Depth-first search of the maximum final resource reachable in time_limit.
+        Every CHECK_INTERVAL expanded nodes the cancellation token is checked
+        (raising SolveCancelled) and on_progress receives the expanded node count.
+        When stats is given, it is filled with the search counters.
+        lower_bound seeds the incumbent: it must be achievable (e.g. the optimum
+        of a shorter horizon), and branches that cannot beat it are pruned.
+        When plan is given, it is filled with an optimal build order. The DFS
+        only keeps the robots of the current path (one entry per minute), copied
+        whenever a leaf improves the incumbent; this needs lower_bound == 0.
+        Two exact options trade speed for memory: cap_resources clamps each
+        non-final resource to what the remaining minutes can still spend (more
+        states merge in the seen set), and seen_limit stops recording visited
+        states once the set holds that many.
+        start_states replaces the initial state with (time, resources, robots)
+        states that together cover every plan, such as an opening book frontier
+        (see src.opening_book); plans are only rebuilt from the initial state.
+        With an endgame table (src.endgame) of this factory, states with at most
+        endgame.minutes left are looked up instead of expanded (not with plan).
+        """
+        if plan is not None and lower_bound > 0:
+            raise ValueError("plan reconstruction needs an unseeded search (lower_bound=0)")
+        if plan is not None and start_states is not None:
+            raise ValueError("plan reconstruction needs the search to start from the initial state")
+        if plan is not None and endgame is not None:
+            raise ValueError("plan reconstruction needs every minute to be expanded (no endgame table)")
+        endgame_minutes = endgame.minutes if endgame is not None else 0
+        setup_start = perf_counter() if stats is not None else 0.0
         start = self._initial_state()
         seen = set()
-        best_result = 0
-        stack = deque([start])
+        best_result = lower_bound
+        stack = deque([start] if start_states is None else start_states)
+        nodes = 0
+        pruned_by_bound = 0
+        pruned_by_seen = 0
+        max_depth = 1
+        track_stats = stats is not None
+        check_mask = CHECK_INTERVAL - 1
+        # The last expanded state of each minute is an ancestor of the popped one
+        path = [None] * (time_limit + 1) if plan is not None else None
+        best_path = None
+        search_start = perf_counter() if stats is not None else 0.0
 
         while stack:
             time, resources, robots = stack.pop()
 
             if time == time_limit:
-                best_result = max(best_result, resources[self.final_index])
+                if resources[self.final_index] > best_result:
+                    best_result = resources[self.final_index]
+                    if path is not None:
+                        best_path = path[:time] + [robots]
                 continue
             # Pruning: estimate the best possible outcome from this state
             minutes_left = time_limit - time
@@ -69,13 +172,36 @@ class OptimizedRobotFactory:
             # Max possible using current robots and potential future ones
             potential = current + current_robots * minutes_left + (minutes_left * (minutes_left - 1)) // 2
             if potential <= best_result:
+                if track_stats:
+                    pruned_by_bound += 1
+                continue
+            if minutes_left <= endgame_minutes:
+                result = current + endgame.gain(minutes_left, resources, robots)
+                if result > best_result:
+                    best_result = result
                 continue
 
             visited_states = (time, resources, robots)
             if visited_states in seen:
+                if track_stats:
+                    pruned_by_seen += 1
                 continue
-            seen.add(visited_states)
+            if seen_limit is None or len(seen) < seen_limit:
+                seen.add(visited_states)
+            if path is not None:
+                path[time] = robots
 
+            nodes += 1
+            if not nodes & check_mask:
+                if cancel_token is not None and cancel_token.cancelled:
+                    raise SolveCancelled()
+                if on_progress is not None:
+                    on_progress(nodes)
+
+            if cap_resources:
+                # A robot per minute at most, so at most max_spend per remaining minute
+                caps = [(i, self.max_spend[rtype] * (minutes_left - 1))
+                        for i, rtype in enumerate(self.resource_types) if i != self.final_index]
             for choice in self._get_build_options(resources, robots):
                 new_resources = list(resources)
                 for i in range(len(self.resource_types)):
@@ -85,7 +211,218 @@ class OptimizedRobotFactory:
                 if choice:
                     new_resources = list(self._build_robot(choice, tuple(new_resources)))
                     new_robots[self.resource_types.index(choice)] += 1
+                if cap_resources:
+                    for i, cap in caps:
+                        if new_resources[i] > cap:
+                            new_resources[i] = cap
 
                 stack.append(self.State(time + 1, tuple(new_resources), tuple(new_robots)))
 
-        return best_result
\ No newline at end of file
+            if track_stats and len(stack) > max_depth:
+                max_depth = len(stack)
+
+        if stats is not None:
+            stats.nodes_expanded = nodes
+            stats.pruned_by_bound = pruned_by_bound
+            stats.pruned_by_seen = pruned_by_seen
+            stats.max_stack_depth = max_depth
+            stats.peak_seen_size = len(seen)
+            stats.phase_times["setup"] = search_start - setup_start
+            stats.phase_times["search"] = perf_counter() - search_start
+        if on_progress is not None:
+            on_progress(nodes)
+        if plan is not None:
+            plan[:] = self._plan_from_path(best_path) if best_path is not None else []
+        return best_result
+
+    def max_final_resources(
+        self,
+        final_resources: List[str],
+        time_limit: int = 24,
+        cancel_token: Optional[CancellationToken] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+        stats: Optional[SearchStats] = None,
+    ) -> Dict[str, int]:
+        """
+        max_final_resource of several final resources, found by a single search.
+        Each resource keeps its own incumbent; a branch is only pruned when its
+        bound cannot beat any of them. Robots of every listed resource are never
+        capped by max_spend, since each may be the one maximized.
+        """
+        if not final_resources:
+            raise ValueError("at least one final resource is needed")
+        targets = [self.resource_types.index(resource) for resource in dict.fromkeys(final_resources)]
+        max_spend = self._max_resource_needed_per_turn(final_resources)
+        setup_start = perf_counter() if stats is not None else 0.0
+        seen = set()
+        best = {index: 0 for index in targets}
+        stack = deque([self._initial_state()])
+        nodes = 0
+        pruned_by_bound = 0
+        pruned_by_seen = 0
+        max_depth = 1
+        track_stats = stats is not None
+        check_mask = CHECK_INTERVAL - 1
+        search_start = perf_counter() if stats is not None else 0.0
+
+        while stack:
+            time, resources, robots = stack.pop()
+
+            if time == time_limit:
+                for index in targets:
+                    if resources[index] > best[index]:
+                        best[index] = resources[index]
+                continue
+            minutes_left = time_limit - time
+            bonus = (minutes_left * (minutes_left - 1)) // 2
+            if all(resources[index] + robots[index] * minutes_left + bonus <= best[index] for index in targets):
+                if track_stats:
+                    pruned_by_bound += 1
+                continue
+
+            visited_states = (time, resources, robots)
+            if visited_states in seen:
+                if track_stats:
+                    pruned_by_seen += 1
+                continue
+            seen.add(visited_states)
+
+            nodes += 1
+            if not nodes & check_mask:
+                if cancel_token is not None and cancel_token.cancelled:
+                    raise SolveCancelled()
+                if on_progress is not None:
+                    on_progress(nodes)
+
+            for choice in self._get_build_options(resources, robots, max_spend):
+                new_resources = tuple(resource + robot for resource, robot in zip(resources, robots))
+                new_robots = list(robots)
+                if choice:
+                    new_resources = self._build_robot(choice, new_resources)
+                    new_robots[self.resource_types.index(choice)] += 1
+                stack.append(self.State(time + 1, new_resources, tuple(new_robots)))
+
+            if track_stats and len(stack) > max_depth:
+                max_depth = len(stack)
+
+        if stats is not None:
+            stats.nodes_expanded = nodes
+            stats.pruned_by_bound = pruned_by_bound
+            stats.pruned_by_seen = pruned_by_seen
+            stats.max_stack_depth = max_depth
+            stats.peak_seen_size = len(seen)
+            stats.phase_times["setup"] = search_start - setup_start
+            stats.phase_times["search"] = perf_counter() - search_start
+        if on_progress is not None:
+            on_progress(nodes)
+        return {self.resource_types[index]: best[index] for index in targets}
+
+    def _plan_from_path(self, path: list) -> BuildPlan:
+        """Robots built each minute, from the robot counts along a path"""
+        plan = []
+        for minute in range(1, len(path)):
+            for i, (before, after) in enumerate(zip(path[minute - 1], path[minute])):
+                if after > before:
+                    plan.append((minute, self.resource_types[i]))
+        return plan
+
+    def replay_plan(self, plan: BuildPlan, time_limit: int = 24) -> int:
+        """Final resource produced by following plan (ValueError if a robot is unaffordable)"""
+        resources = tuple([0] * len(self.resource_types))
+        robots = self._initial_state().robots
+        builds = dict(plan)
+        for minute in range(1, time_limit + 1):
+            choice = builds.get(minute)
+            if choice is not None and not self._can_build_robot(choice, resources):
+                raise ValueError(f"Cannot build a {choice} robot in minute {minute}")
+            resources = tuple(resource + robot for resource, robot in zip(resources, robots))
+            if choice is not None:
+                resources = self._build_robot(choice, resources)
+                robots = tuple(robot + (i == self.resource_types.index(choice)) for i, robot in enumerate(robots))
+        return resources[self.final_index]
+
+    def can_reach(
+        self,
+        target: int,
+        time_limit: int = 24,
+        cancel_token: Optional[CancellationToken] = None,
+        stats: Optional[SearchStats] = None,
+    ) -> bool:
+        """
+        Whether some plan ends with at least target final resource. Branches whose
+        bound is below target are pruned, and the search stops at the first state
+        that reaches it by just waiting (the witness). Building options are tried
+        final robot first.
+        """
+        search_start = perf_counter() if stats is not None else 0.0
+        seen = set()
+        stack = deque([self._initial_state()])
+        nodes = 0
+        pruned_by_bound = 0
+        pruned_by_seen = 0
+        track_stats = stats is not None
+        check_mask = CHECK_INTERVAL - 1
+        reached = target <= 0
+
+        while stack and not reached:
+            time, resources, robots = stack.pop()
+            minutes_left = time_limit - time
+            current = resources[self.final_index]
+            current_robots = robots[self.final_index]
+
+            if current + current_robots * minutes_left >= target:
+                reached = True
+                break
+            if time == time_limit:
+                continue
+            potential = current + current_robots * minutes_left + (minutes_left * (minutes_left - 1)) // 2
+            if potential < target:
+                if track_stats:
+                    pruned_by_bound += 1
+                continue
+
+            if (time, resources, robots) in seen:
+                if track_stats:
+                    pruned_by_seen += 1
+                continue
+            seen.add((time, resources, robots))
+
+            nodes += 1
+            if not nodes & check_mask and cancel_token is not None and cancel_token.cancelled:
+                raise SolveCancelled()
+
+            # Pushed in reverse so that the final robot is popped first and waiting last
+            for choice in reversed(self._get_build_options(resources, robots)):
+                new_resources = tuple(resource + robot for resource, robot in zip(resources, robots))
+                new_robots = list(robots)
+                if choice:
+                    new_resources = self._build_robot(choice, new_resources)
+                    new_robots[self.resource_types.index(choice)] += 1
+                stack.append(self.State(time + 1, new_resources, tuple(new_robots)))
+
+        if stats is not None:
+            stats.nodes_expanded += nodes
+            stats.pruned_by_bound += pruned_by_bound
+            stats.pruned_by_seen += pruned_by_seen
+            stats.peak_seen_size = max(stats.peak_seen_size, len(seen))
+            stats.phase_times["decision"] = stats.phase_times.get("decision", 0.0) + perf_counter() - search_start
+        return reached
+
+    def max_final_resource_by_decision(
+        self,
+        time_limit: int = 24,
+        cancel_token: Optional[CancellationToken] = None,
+        stats: Optional[SearchStats] = None,
+    ) -> int:
+        """
+        Same optimum as max_final_resource, found by bisecting [0, upper_bound]
+        with can_reach queries
+        """
+        low, high = 0, self.upper_bound(time_limit)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.can_reach(middle, time_limit, cancel_token=cancel_token, stats=stats):
+                low = middle
+            else:
+                high = middle - 1
+        return low
@@ -0,0 +1,96 @@
+import cProfile
+import os
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable, Optional, Tuple
+
+
+@dataclass
+class ProfileConfig:
+    """
+    Opt-in per-blueprint profiling (see SolverConfig.profile)
+    Args:
+        cprofile: Dump a cProfile .prof file per profiled blueprint
+        tracemalloc: Write the peak memory and top allocation sites per profiled blueprint
+        every: Profile only every Nth blueprint (1 = all)
+        threshold: Only profile blueprints whose solve takes longer (in seconds);
+            these are solved once untraced, then re-solved under the profilers
+        top_allocations: Number of allocation sites written
+        output_dir: Directory of the profile files (default: next to the analysis output)
+    """
+    cprofile: bool = True
+    tracemalloc: bool = False
+    every: int = 1
+    threshold: Optional[float] = None
+    top_allocations: int = 10
+    output_dir: Optional[str] = None
+
+
+def profile_paths(output_file: str, blueprint_id: int, output_dir: Optional[str] = None) -> Tuple[str, str]:
+    """Paths of the cProfile dump and the allocation report of a blueprint"""
+    directory = output_dir if output_dir is not None else os.path.dirname(output_file)
+    stem = os.path.splitext(os.path.basename(output_file))[0]
+    base = os.path.join(directory, f"{stem}_blueprint{blueprint_id}")
+    return f"{base}.prof", f"{base}_alloc.txt"
+
+
+@contextmanager
+def profiled(config: ProfileConfig, prof_path: str, alloc_path: str):
+    """Runs the enclosed block under the profilers enabled in config"""
+    profiler = cProfile.Profile() if config.cprofile else None
+    # Leave an already running trace (e.g. a benchmark's) untouched
+    start_tracing = config.tracemalloc and not tracemalloc.is_tracing()
+    if start_tracing:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(prof_path)
+        if config.tracemalloc and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if start_tracing:
+                tracemalloc.stop()
+            _write_allocations(alloc_path, snapshot, peak, config.top_allocations)
+
+
+def _write_allocations(alloc_path: str, snapshot: tracemalloc.Snapshot, peak: int, top: int) -> None:
+    with open(alloc_path, 'w', encoding='utf-8') as f:
+        f.write(f"Peak traced memory: {peak} bytes\n")
+        f.write(f"Top {top} allocation sites:\n")
+        for stat in snapshot.statistics('lineno')[:top]:
+            f.write(f"{stat}\n")
+
+
+class BlueprintProfiler:
+    """Applies a ProfileConfig to the successive blueprint solves of a run"""
+
+    def __init__(self, config: ProfileConfig, output_file: str):
+        self.config = config
+        self.output_file = output_file
+
+    def should_profile(self, blueprint_id: int) -> bool:
+        return (blueprint_id - 1) % max(1, self.config.every) == 0
+
+    def run(self, blueprint_id: int, solve: Callable[[], int]) -> int:
+        if not self.should_profile(blueprint_id):
+            return solve()
+
+        prof_path, alloc_path = profile_paths(self.output_file, blueprint_id, self.config.output_dir)
+        if self.config.threshold is None:
+            with profiled(self.config, prof_path, alloc_path):
+                return solve()
+
+        start = perf_counter()
+        result = solve()
+        if perf_counter() - start > self.config.threshold:
+            with profiled(self.config, prof_path, alloc_path):
+                solve()
+        return result
@@ -0,0 +1,97 @@
+import json
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional
+
+
+class ResultCache:
+    """
+    Bounded LRU map of finished solves, shared between threads.
+    Lookups count hits and misses; max_entries=0 disables the cache (every
+    lookup is then a miss and nothing is stored).
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskResultCache:
+    """
+    Final resource counts persisted across runs, as JSON lines in
+    directory/results.jsonl keyed by blueprint fingerprint, horizon and final
+    resource. Loaded on first use; new results are appended (a torn last line
+    is skipped on the next load).
+    """
+    FILENAME = "results.jsonl"
+
+    def __init__(self, directory: str):
+        self.path = os.path.join(directory, self.FILENAME)
+        self._entries: Optional[Dict[str, int]] = None
+        # A torn last line must not swallow the next record
+        self._torn = False
+
+    @staticmethod
+    def _key(fingerprint: str, time_limit: int, final_resource: str) -> str:
+        return f"{fingerprint}:{time_limit}:{final_resource}"
+
+    def _load(self) -> Dict[str, int]:
+        if self._entries is None:
+            self._entries = {}
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                self._torn = bool(content) and not content.endswith("\n")
+                for line in content.splitlines():
+                    try:
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = int(entry["result"])
+                    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                        continue
+        return self._entries
+
+    def get(self, fingerprint: str, time_limit: int, final_resource: str) -> Optional[int]:
+        return self._load().get(self._key(fingerprint, time_limit, final_resource))
+
+    def put(self, fingerprint: str, time_limit: int, final_resource: str, result: int) -> None:
+        key = self._key(fingerprint, time_limit, final_resource)
+        entries = self._load()
+        if entries.get(key) == result:
+            return
+        entries[key] = result
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(("\n" if self._torn else "") + json.dumps({"key": key, "result": result}) + "\n")
+        self._torn = False
@@ -0,0 +1,112 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Optional, Tuple
+
+from src.blueprint import Blueprint, BlueprintLoader, DefaultBlueprintParser, blueprint_key
+from src.save import _write_analysis_file
+from src.solver import QualityCalculator, SolverConfig, calculate_and_write_analysis, solve_blueprint
+
+# (blueprint key, final resource)
+ChainKey = Tuple[tuple, str]
+
+# SolverConfig options the shared chains do not apply (they only run the default
+# python search and write the plain analysis file)
+_UNCHAINED_OPTIONS = (
+    "include_stats", "include_plans", "profile", "checkpoint", "resume", "engine", "calibration_file",
+    "memory_budget", "final_resources", "opening_book", "endgame_minutes", "result_only",
+)
+
+
+@dataclass
+class _Chain:
+    """Every horizon requested for one blueprint and final resource"""
+    blueprint: Blueprint
+    final_resource: str
+    time_limits: List[int] = field(default_factory=list)
+
+
+def _solve_chain(blueprint: Blueprint, final_resource: str, time_limits: List[int]) -> List[int]:
+    """Solves increasing horizons, each seeded with the previous optimum (which it can never be below)"""
+    results = []
+    lower_bound = 0
+    for time_limit in time_limits:
+        lower_bound = solve_blueprint(blueprint, time_limit, final_resource, lower_bound=lower_bound)
+        results.append(lower_bound)
+    return results
+
+
+def _chainable(config: SolverConfig) -> bool:
+    """Whether config leaves every option the chains do not apply at its default"""
+    defaults = {option.name: option.default for option in fields(SolverConfig)}
+    return all(getattr(config, name) == defaults[name] for name in _UNCHAINED_OPTIONS)
+
+
+def plan_chains(configs: List[SolverConfig]) -> Tuple[Dict[str, List[Blueprint]], Dict[ChainKey, _Chain]]:
+    """Parses each distinct file once and groups the requested solves by blueprint and final resource"""
+    loader = BlueprintLoader(DefaultBlueprintParser())
+    parsed: Dict[str, List[Blueprint]] = {}
+    chains: Dict[ChainKey, _Chain] = {}
+
+    for config in configs:
+        if config.filename not in parsed:
+            parsed[config.filename] = loader.load(config.filename)
+        for blueprint in parsed[config.filename][:config.max_blueprints]:
+            key = (blueprint_key(blueprint), config.final_resource)
+            chain = chains.setdefault(key, _Chain(blueprint, config.final_resource))
+            if config.time_limit not in chain.time_limits:
+                chain.time_limits.append(config.time_limit)
+
+    for chain in chains.values():
+        chain.time_limits.sort()
+    return parsed, chains
+
+
+def run_plan(configs: List[SolverConfig], max_workers: Optional[int] = 1) -> List[int]:
+    """
+    Runs several solver configurations as one plan and returns the calculator
+    result of each config. Every distinct blueprint/final resource/horizon is
+    solved at most once, across all configs and files; the horizons of a blueprint
+    are solved in increasing order, each seeded with the previous optimum.
+    Each config still gets its own analysis output. A config setting any other
+    option (engine, stats, plans, checkpoint...) is not shared: it runs on its
+    own through calculate_and_write_analysis, in this process.
+    Args:
+        configs: Configurations to run
+        max_workers: Worker processes for the shared solves (1 = in this process, None = one per core)
+    """
+    parsed, chains = plan_chains([config for config in configs if _chainable(config)])
+
+    solved: Dict[Tuple[tuple, str, int], int] = {}
+    if max_workers == 1:
+        for key, chain in chains.items():
+            for time_limit, result in zip(chain.time_limits, _solve_chain(chain.blueprint, chain.final_resource, chain.time_limits)):
+                solved[(*key, time_limit)] = result
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # Longest horizons first so that the slowest chains do not start last
+            ordered = sorted(chains.items(), key=lambda item: -item[1].time_limits[-1])
+            futures = {
+                executor.submit(_solve_chain, chain.blueprint, chain.final_resource, chain.time_limits): (key, chain)
+                for key, chain in ordered
+            }
+            for future in as_completed(futures):
+                key, chain = futures[future]
+                for time_limit, result in zip(chain.time_limits, future.result()):
+                    solved[(*key, time_limit)] = result
+
+    results = []
+    for config in configs:
+        if not _chainable(config):
+            results.append(calculate_and_write_analysis(config))
+            continue
+        if config.calculator is None:
+            config.calculator = QualityCalculator()
+        blueprints = parsed[config.filename][:config.max_blueprints]
+        blueprint_ids = list(range(1, len(blueprints) + 1))
+        final_resource_results = [
+            solved[(blueprint_key(blueprint), config.final_resource, config.time_limit)]
+            for blueprint in blueprints
+        ]
+        _write_analysis_file(config.output_file, blueprint_ids, final_resource_results)
+        results.append(config.calculator.calculate(final_resource_results, blueprint_ids))
+    return results
@@ -1,7 +1,25 @@
-from typing import List
+import json
+import os
+from typing import Dict, List, Optional, Tuple
 
-def _write_analysis_file(output_file: str, blueprint_ids: List[int], final_resource_results: List[int]) -> None:
-    """Writes the analysis file with the qualities of the blueprints"""
+from src.optimization_service import BuildPlan
+from src.stats import SearchStats, SolveStats
+
+def _format_search_stats(stats: SearchStats) -> str:
+    return (f"{stats.nodes_expanded} nodes, {stats.pruned_by_bound} pruned by bound, "
+            f"{stats.pruned_by_seen} pruned by seen, max depth {stats.max_stack_depth}, "
+            f"peak seen {stats.peak_seen_size}, {stats.total_time:.3f}s")
+
+def format_plan(plan: BuildPlan) -> str:
+    return ", ".join(f"minute {minute} {robot}" for minute, robot in plan) or "no robot needed"
+
+def _write_analysis_file(output_file: str, blueprint_ids: List[int], final_resource_results: List[int],
+                         stats: Optional[SolveStats] = None, plans: Optional[Dict[int, BuildPlan]] = None,
+                         resource_table: Optional[Dict[str, List[int]]] = None) -> None:
+    """
+    Writes the analysis file with the qualities of the blueprints (and search
+    statistics / build plans / the maxima of several final resources when given)
+    """
     with open(output_file, 'w', encoding='utf-8') as f:
         qualities = []
         for resource, id in zip(final_resource_results, blueprint_ids):
@@ -13,4 +31,114 @@ def _write_analysis_file(output_file: str, blueprint_ids: List[int], final_resou
         if qualities:
             best_index = qualities.index(max(qualities))
             best_blueprint_id = blueprint_ids[best_index]
-            f.write(f"\nBest blueprint is the blueprint {best_blueprint_id}.\n")
\ No newline at end of file
+            f.write(f"\nBest blueprint is the blueprint {best_blueprint_id}.\n")
+
+        if resource_table:
+            f.write("\nFinal resources:\n")
+            for index, blueprint_id in enumerate(blueprint_ids):
+                counts = ", ".join(f"{results[index]} {resource}" for resource, results in resource_table.items())
+                f.write(f"Blueprint {blueprint_id}: {counts}\n")
+
+        if stats is not None and stats.blueprints:
+            f.write("\nSearch statistics:\n")
+            for blueprint_id, search_stats in stats.blueprints.items():
+                f.write(f"Blueprint {blueprint_id}: {_format_search_stats(search_stats)}\n")
+            f.write(f"Total: {_format_search_stats(stats.total)}\n")
+
+        if plans:
+            f.write("\nBuild plans:\n")
+            for blueprint_id, plan in plans.items():
+                f.write(f"Blueprint {blueprint_id}: {format_plan(plan)}\n")
+
+def checkpoint_path(output_file: str) -> str:
+    return f"{output_file}.partial"
+
+class AnalysisCheckpoint:
+    """
+    Append-only JSON-lines record of the blueprints solved so far, written next
+    to the analysis output so that an interrupted run can resume. The first line
+    holds the run parameters; each following line one solved blueprint, keyed by
+    its ID and cost fingerprint, with its build plan when the run collects
+    plans. Each record is flushed and fsynced.
+    """
+    VERSION = 1
+
+    def __init__(self, path: str, time_limit: int, final_resource: str):
+        self.path = path
+        self.header = {"version": self.VERSION, "time_limit": time_limit, "final_resource": final_resource}
+        self._entries: Dict[int, Tuple[str, int, Optional[BuildPlan]]] = {}
+        self._file = None
+
+    def open(self, resume: bool = False) -> None:
+        """Starts a new checkpoint, or keeps the matching records of an existing one"""
+        self._entries = self._read() if resume else {}
+        # Rewrite the valid records so that appends never follow a torn last line
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(self.header) + "\n")
+            for blueprint_id, (fingerprint, result, plan) in self._entries.items():
+                f.write(json.dumps(self._record(blueprint_id, fingerprint, result, plan)) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    @staticmethod
+    def _record(blueprint_id: int, fingerprint: str, result: int, plan: Optional[BuildPlan]) -> Dict:
+        record = {"id": blueprint_id, "fingerprint": fingerprint, "result": result}
+        if plan is not None:
+            record["plan"] = [[minute, robot] for minute, robot in plan]
+        return record
+
+    def lookup(self, blueprint_id: int, fingerprint: str) -> Optional[int]:
+        entry = self._entries.get(blueprint_id)
+        if entry is None or entry[0] != fingerprint:
+            return None
+        return entry[1]
+
+    def lookup_plan(self, blueprint_id: int, fingerprint: str) -> Optional[BuildPlan]:
+        """The build plan recorded with the blueprint's result (None when recorded without one)"""
+        entry = self._entries.get(blueprint_id)
+        if entry is None or entry[0] != fingerprint:
+            return None
+        return entry[2]
+
+    def record(self, blueprint_id: int, fingerprint: str, result: int, plan: Optional[BuildPlan] = None) -> None:
+        self._entries[blueprint_id] = (fingerprint, result, plan)
+        self._file.write(json.dumps(self._record(blueprint_id, fingerprint, result, plan)) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self) -> None:
+        """Removes the checkpoint once the analysis file is complete"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _read(self) -> Dict[int, Tuple[str, int, Optional[BuildPlan]]]:
+        if not os.path.exists(self.path):
+            return {}
+        entries = {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        try:
+            if not lines or json.loads(lines[0]) != self.header:
+                return {}
+        except json.JSONDecodeError:
+            return {}
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+                plan = entry.get("plan")
+                if plan is not None:
+                    plan = [(int(minute), robot) for minute, robot in plan]
+                entries[int(entry["id"])] = (entry["fingerprint"], int(entry["result"]), plan)
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                # Torn write of the record in progress when the run stopped
+                continue
+        return entries
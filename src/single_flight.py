@@ -0,0 +1,64 @@
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Dict, Hashable
+
+from src.cancellation import CancellationToken
+
+
+@dataclass
+class _Flight:
+    future: Future
+    token: CancellationToken
+    waiters: int = 1
+
+
+class SingleFlight:
+    """Deduplicates identical in-flight calls: concurrent submissions with the
+    same key share a single execution and its future.
+
+    Each submit should be paired with a release once the caller no longer needs
+    the result; a flight abandoned by all of its callers is cancelled."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def submit(self, executor: Executor, key: Hashable, fn: Callable, *args,
+               with_token: bool = False, **kwargs) -> Future:
+        """Return the in-flight future for key, or schedule fn on the executor.
+        With with_token, fn receives the flight's cancel_token keyword argument."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                return flight.future
+            token = CancellationToken()
+            if with_token:
+                kwargs["cancel_token"] = token
+            flight = _Flight(executor.submit(fn, *args, **kwargs), token)
+            self._flights[key] = flight
+        flight.future.add_done_callback(lambda _: self._forget(key, flight))
+        return flight.future
+
+    def release(self, key: Hashable, future: Future) -> None:
+        """Drop one caller's interest in future; the last one out cancels an unfinished flight"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None or flight.future is not future:
+                return
+            flight.waiters -= 1
+            if flight.waiters > 0:
+                return
+            del self._flights[key]
+        if not flight.future.cancel():
+            flight.token.cancel()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
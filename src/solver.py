@@ -1,33 +1,25 @@
-from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Optional
-
-from src.blueprint import BlueprintLoader, DefaultBlueprintParser
-from src.optimization_service import OptimizedRobotFactory
-from src.save import _write_analysis_file
-
-
-class ResultCalculator(ABC):
-    """Interface to calculate the final resource result (Single Responsibility)"""
-    @abstractmethod
-    def calculate(self, final_resource: List[int], blueprint_ids: List[int]) -> int:
-        pass
-
-class QualityCalculator(ResultCalculator):
-    """Calculates the total quality (sum of final resource * ID)"""
-    def calculate(self, final_resource: List[int], blueprint_ids: List[int]) -> int:
-        return sum(final_resource_count * blueprint_id 
-                  for final_resource_count, blueprint_id in zip(final_resource, blueprint_ids))
-
-class ProductCalculator(ResultCalculator):
-    """Calculate the product of all final resource"""
-    def calculate(self, final_resource: List[int], _) -> int:
-        if not final_resource:
-            return 0
-        result = 1
-        for final_resource_count in final_resource:
-            result *= final_resource_count
-        return result
+from functools import partial
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.blueprint import Blueprint, BlueprintLoader, DefaultBlueprintParser, blueprint_fingerprint
+from src.calculators import CALCULATORS, ProductCalculator, QualityCalculator, ResultCalculator
+from src.cancellation import CancellationToken
+from src.events import (
+    BlueprintFinished, BlueprintProgress, BlueprintStarted, EtaEstimator, EventCallback, print_event
+)
+from src.endgame import EndgameTable
+from src.opening_book import OpeningBook
+from src.optimization_service import BuildPlan, OptimizedRobotFactory
+from src.profiling import BlueprintProfiler, ProfileConfig
+from src.save import AnalysisCheckpoint, _write_analysis_file, checkpoint_path
+from src.stats import SearchStats, SolveStats
+
+# Search engines: the pure-Python DFS, its JIT-compiled kernel (src.jit_kernel),
+# the NumPy engine solving a run's blueprints in lockstep (src.batch_engine),
+# or a per-blueprint choice among them (src.engine_selection)
+ENGINES = ("python", "jit", "batch", "auto")
     
 @dataclass
 class SolverConfig:
@@ -38,8 +30,120 @@ class SolverConfig:
     max_blueprints: Optional[int] = None
     output_file: str = "./analysis.txt"
     final_resource: str = "geode"
+    include_stats: bool = False
+    include_plans: bool = False
+    profile: Optional[ProfileConfig] = None
+    checkpoint: bool = False
+    resume: bool = False
+    engine: str = "python"
+    calibration_file: Optional[str] = None
+    memory_budget: Optional[int] = None
+    # Other resources maximized by the same search as final_resource (python engine only)
+    final_resources: Optional[List[str]] = None
+    # Directory of the opening book shared by the run's blueprints (python engine)
+    opening_book: Optional[str] = None
+    # Minutes left from which the python engine looks up an endgame table (None = off)
+    endgame_minutes: Optional[int] = None
+    # Only the calculator result is needed: solving stops once it is proven (see solve_blueprints)
+    result_only: bool = False
 
-def solve_blueprints(config: SolverConfig) -> int:
+@dataclass
+class RankedBlueprint:
+    blueprint_id: int
+    final_resource_count: int
+    quality: int
+
+def solve_blueprint(
+    blueprint: Blueprint,
+    time_limit: int = 24,
+    final_resource: str = "geode",
+    cancel_token: Optional[CancellationToken] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+    stats: Optional[SearchStats] = None,
+    lower_bound: int = 0,
+    engine: str = "python",
+    plan: Optional[BuildPlan] = None,
+    cap_resources: bool = False,
+    seen_limit: Optional[int] = None,
+    opening_book: Optional[OpeningBook] = None,
+    endgame_minutes: Optional[int] = None,
+) -> int:
+    """
+    Maximum amount of final resource a single blueprint can produce.
+    When plan is given, it is filled with an optimal build order (this always
+    uses the python engine). cap_resources and seen_limit only apply to the
+    python engine; "auto" picks the engine and both options (see src.engine_selection).
+    The python engine starts from the opening_book frontier when one is given
+    (except for plans and horizons within the opening), and looks the last
+    endgame_minutes minutes up in an endgame table (except for plans).
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r} (expected one of {', '.join(ENGINES)})")
+    if engine == "auto":
+        from src.engine_selection import resolve_engine
+        choice = resolve_engine(blueprint, time_limit, final_resource)
+        engine, cap_resources, seen_limit = choice.engine, choice.cap_resources, choice.seen_limit
+    factory = OptimizedRobotFactory(blueprint, final_resource=final_resource)
+    search = factory.max_final_resource
+    if cap_resources or seen_limit is not None:
+        search = partial(factory.max_final_resource, cap_resources=cap_resources, seen_limit=seen_limit)
+    if plan is not None:
+        search = partial(search, plan=plan)
+    elif engine == "python":
+        if opening_book is not None and time_limit > opening_book.minutes:
+            opening = opening_book.opening(factory)
+            search = partial(search, start_states=[
+                (opening.minutes, resources, robots) for resources, robots in opening.frontier
+            ])
+        if endgame_minutes:
+            search = partial(search, endgame=EndgameTable(factory, endgame_minutes))
+    elif engine == "jit":
+        # Imported lazily: numpy/numba are optional and slow to import
+        from src.jit_kernel import jit_max_final_resource
+        search = partial(jit_max_final_resource, factory)
+    elif engine == "batch":
+        return _solve_batched([blueprint], time_limit, final_resource, cancel_token,
+                              [stats] if stats is not None else None)[0]
+    return search(
+        time_limit, cancel_token=cancel_token, on_progress=on_progress, stats=stats,
+        lower_bound=lower_bound
+    )
+
+def solve_blueprint_resources(
+    blueprint: Blueprint,
+    time_limit: int = 24,
+    final_resources: Tuple[str, ...] = ("geode",),
+    cancel_token: Optional[CancellationToken] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+    stats: Optional[SearchStats] = None,
+) -> Dict[str, int]:
+    """Maximum amount of each final resource a single blueprint can produce, from a single search"""
+    factory = OptimizedRobotFactory(blueprint)
+    return factory.max_final_resources(
+        list(final_resources), time_limit, cancel_token=cancel_token, on_progress=on_progress, stats=stats
+    )
+
+def _solve_batched(blueprints: List[Blueprint], time_limit: int, final_resource: str,
+                   cancel_token: Optional[CancellationToken] = None,
+                   stats: Optional[List[SearchStats]] = None) -> List[int]:
+    from src.batch_engine import solve_batch
+    return solve_batch(blueprints, time_limit, final_resource, cancel_token=cancel_token, stats=stats)
+
+def _load_blueprints(config: SolverConfig) -> List[Blueprint]:
+    blueprints = BlueprintLoader(DefaultBlueprintParser()).load(config.filename)
+    if config.max_blueprints is not None:
+        blueprints = blueprints[:config.max_blueprints]
+    return blueprints
+
+def solve_blueprints(
+    config: SolverConfig,
+    stats: Optional[SolveStats] = None,
+    on_event: Optional[EventCallback] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    checkpoint: Optional[AnalysisCheckpoint] = None,
+    plans: Optional[Dict[int, BuildPlan]] = None,
+    resource_table: Optional[Dict[str, List[int]]] = None,
+) -> int:
     """
     Resolve blueprints according to the provided calculation strategy
     Args:
@@ -48,41 +152,248 @@ def solve_blueprints(config: SolverConfig) -> int:
         calculator: Calculation strategy for the result (default: QualityCalculator)
         max_blueprints: Maximum number of blueprints to process (None = all)
         output_file: Output file for the analysis
+        profile: Per-blueprint profiling, dumped next to the output file (None = off)
+        engine: Search engine: "python", "jit" (falls back to python without numba),
+            "batch" (all blueprints at once; progress events and profiling are skipped)
+            or "auto" (chosen per blueprint from calibration_file, and logged)
+        memory_budget: With "auto", maximum visited states kept by the python engine
+        opening_book: Directory where the openings of the blueprints are shared
+            across blueprints and runs (see src.opening_book; python engine)
+        endgame_minutes: Minutes left from which the python engine looks the
+            gain up in a table per blueprint (see src.endgame)
+        final_resources: Other resources maximized along with final_resource, by
+            one search per blueprint (python engine, without checkpoint or plans)
+        result_only: Blueprints are visited by increasing upper bound (those bounded
+            by zero are not searched) and the others are left out as soon as the
+            calculator result is proven, e.g. by a zero ProductCalculator factor
+        stats: Filled with the search statistics of each blueprint when given
+        on_event: Receives BlueprintStarted/BlueprintProgress/BlueprintFinished
+            events (default: console output)
+        cancel_token: Checked by the search; cancelling it raises SolveCancelled
+        checkpoint: Blueprints it already holds are not solved again, and every
+            newly solved blueprint is recorded in it
+        plans: Filled with an optimal build plan per blueprint ID when given (plans
+            are recorded in the checkpoint; a blueprint recorded without one is
+            solved again)
+        resource_table: Filled with the results of final_resource and of each of
+            config.final_resources, by resource, in blueprint ID order
     Returns:
-        tuple of final resource results and blueprint IDs
+        tuple of final resource results and blueprint IDs (in ID order; with
+        result_only, only the blueprints visited before the result was proven)
     """
     if config.calculator is None:
         config.calculator = QualityCalculator()
     
-    loader = BlueprintLoader(DefaultBlueprintParser())
-    blueprints = loader.load(config.filename)
-    
-    if config.max_blueprints is not None:
-        blueprints = blueprints[:config.max_blueprints]
+    targets = None
+    if config.final_resources:
+        if config.engine != "python" or checkpoint is not None or plans is not None:
+            raise ValueError("final_resources needs the python engine, without checkpoint or plans")
+        targets = tuple(dict.fromkeys([config.final_resource, *config.final_resources]))
+    if resource_table is not None:
+        resource_table.clear()
+        resource_table.update({resource: [] for resource in targets or [config.final_resource]})
+
+    blueprints = _load_blueprints(config)
+
+    profiler = BlueprintProfiler(config.profile, config.output_file) if config.profile else None
+    on_event = on_event or print_event
+    estimator = EtaEstimator(len(blueprints))
 
     final_resource_results = []
     blueprint_ids = []
     blueprint_qualities = []
+
+    opening_options = {}
+    if config.opening_book is not None:
+        opening_options["opening_book"] = OpeningBook(config.opening_book)
+    if config.endgame_minutes:
+        opening_options["endgame_minutes"] = config.endgame_minutes
+
+    calibration = None
+    if config.engine == "auto":
+        from src.engine_selection import CalibrationTable, resolve_engine
+        if config.calibration_file is not None:
+            calibration = CalibrationTable.load(config.calibration_file)
+
+    order = list(enumerate(blueprints, 1))
+    bounds = {}
+    if config.result_only:
+        bounds = {
+            i: OptimizedRobotFactory(blueprint, final_resource=config.final_resource).upper_bound(config.time_limit)
+            for i, blueprint in order
+        }
+        order.sort(key=lambda item: bounds[item[0]])
+
+    # The batch engine solves every pending blueprint up front, in lockstep
+    batched = {}
+    if config.engine == "batch" and plans is None:
+        pending = {
+            i: blueprint for i, blueprint in enumerate(blueprints, 1)
+            if bounds.get(i) != 0
+            and (checkpoint is None or checkpoint.lookup(i, blueprint_fingerprint(blueprint)) is None)
+        }
+        batch_stats = {i: SearchStats() for i in pending} if stats is not None else None
+        batched = dict(zip(pending, _solve_batched(
+            list(pending.values()), config.time_limit, config.final_resource, cancel_token,
+            list(batch_stats.values()) if batch_stats is not None else None
+        )))
     
-    for i, blueprint in enumerate(blueprints, 1):
-        print(f"Handle Blueprint {i}...")
+    for i, blueprint in order:
+        if config.result_only and config.calculator.proven_result(final_resource_results, blueprint_ids) is not None:
+            break
+        on_event(BlueprintStarted(i, len(blueprints)))
+        started = perf_counter()
+
+        def on_progress(nodes: int) -> None:
+            elapsed = perf_counter() - started
+            on_event(BlueprintProgress(i, nodes, elapsed, estimator.eta(elapsed)))
         
-        factory = OptimizedRobotFactory(blueprint, final_resource=config.final_resource)
-        max_geodes = factory.max_final_resource(config.time_limit)
+        fingerprint = blueprint_fingerprint(blueprint) if checkpoint is not None else None
+        max_geodes = checkpoint.lookup(i, fingerprint) if checkpoint is not None else None
+        if max_geodes is not None and plans is not None:
+            plans[i] = checkpoint.lookup_plan(i, fingerprint)
+            if plans[i] is None:
+                del plans[i]
+                max_geodes = None
+        if max_geodes is None and targets is None and bounds.get(i) == 0:
+            max_geodes = 0
+            if stats is not None:
+                stats.blueprints[i] = SearchStats()
+            if checkpoint is not None:
+                checkpoint.record(i, fingerprint, max_geodes, [] if plans is not None else None)
+            if plans is not None:
+                plans[i] = []
+        elif i in batched:
+            max_geodes = batched[i]
+            if stats is not None:
+                stats.blueprints[i] = batch_stats[i]
+            if checkpoint is not None:
+                checkpoint.record(i, fingerprint, max_geodes)
+        elif targets is not None:
+            search_stats = SearchStats() if stats is not None else None
+            solve = lambda: solve_blueprint_resources(
+                blueprint, config.time_limit, targets,
+                cancel_token=cancel_token, on_progress=on_progress, stats=search_stats
+            )
+            counts = profiler.run(i, solve) if profiler else solve()
+            if stats is not None:
+                stats.blueprints[i] = search_stats
+            max_geodes = counts[config.final_resource]
+        elif max_geodes is None:
+            search_stats = SearchStats() if stats is not None else None
+            plan = [] if plans is not None else None
+            engine_options = {"engine": config.engine}
+            if config.engine == "auto":
+                choice = resolve_engine(blueprint, config.time_limit, config.final_resource,
+                                        calibration, config.memory_budget, blueprint_id=i)
+                engine_options = {"engine": choice.engine, "cap_resources": choice.cap_resources,
+                                  "seen_limit": choice.seen_limit}
+            solve = lambda: solve_blueprint(
+                blueprint, config.time_limit, config.final_resource,
+                cancel_token=cancel_token, on_progress=on_progress, stats=search_stats,
+                plan=plan, **engine_options, **opening_options
+            )
+            max_geodes = profiler.run(i, solve) if profiler else solve()
+            if stats is not None:
+                stats.blueprints[i] = search_stats
+            if plans is not None:
+                plans[i] = plan
+            if checkpoint is not None:
+                checkpoint.record(i, fingerprint, max_geodes, plan)
         
         final_resource_results.append(max_geodes)
         blueprint_ids.append(i)
+        if resource_table is not None:
+            for resource, results in resource_table.items():
+                results.append(counts[resource] if targets is not None else max_geodes)
         
         quality = max_geodes * i
         blueprint_qualities.append(quality)
-        
-        print(f"Blueprint {i}: {max_geodes} {config.final_resource}s")
+
+        elapsed = perf_counter() - started
+        estimator.finish(elapsed)
+        on_event(BlueprintFinished(i, config.final_resource, max_geodes, elapsed, estimator.eta()))
     
+    if config.result_only:
+        positions = sorted(range(len(blueprint_ids)), key=blueprint_ids.__getitem__)
+        final_resource_results = [final_resource_results[k] for k in positions]
+        blueprint_ids = [blueprint_ids[k] for k in positions]
+        for results in (resource_table or {}).values():
+            results[:] = [results[k] for k in positions]
     return (final_resource_results, blueprint_ids)
 
 def calculate_and_write_analysis(config: SolverConfig) -> int:
-    final_resource_results, blueprint_ids = solve_blueprints(config)
-    _write_analysis_file(config.output_file, blueprint_ids, final_resource_results)
+    """
+    Solves the blueprints, writes the analysis file and returns the calculator result.
+    With config.checkpoint (or config.resume) each solved blueprint is durably
+    recorded as it completes; config.resume skips the blueprints an interrupted run
+    with the same time limit and final resource already solved.
+    """
+    solve_kwargs = {}
+    write_kwargs = {}
+    if config.include_stats:
+        stats = SolveStats()
+        solve_kwargs["stats"] = write_kwargs["stats"] = stats
+    if config.include_plans:
+        solve_kwargs["plans"] = write_kwargs["plans"] = {}
+    if config.final_resources:
+        solve_kwargs["resource_table"] = write_kwargs["resource_table"] = {}
+
+    checkpoint = None
+    if config.checkpoint or config.resume:
+        checkpoint = AnalysisCheckpoint(checkpoint_path(config.output_file), config.time_limit, config.final_resource)
+        checkpoint.open(resume=config.resume)
+        solve_kwargs["checkpoint"] = checkpoint
+
+    try:
+        final_resource_results, blueprint_ids = solve_blueprints(config, **solve_kwargs)
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+    _write_analysis_file(config.output_file, blueprint_ids, final_resource_results, **write_kwargs)
+    if checkpoint is not None:
+        checkpoint.discard()
     
     result = config.calculator.calculate(final_resource_results, blueprint_ids)
-    return result
\ No newline at end of file
+    return result
+
+def rank_blueprints(blueprints: List[Blueprint], time_limit: int = 24, final_resource: str = "geode",
+                    top_k: int = 1, stats: Optional[SolveStats] = None) -> List[RankedBlueprint]:
+    """
+    The top_k blueprints by quality (final resource * ID), best first; ties go to
+    the lower ID, as for the "Best blueprint" of the analysis file.
+    Blueprints are visited by decreasing upper bound * ID. Those whose bound cannot
+    rank above the current K-th best are skipped; the others are solved with an
+    incumbent that prunes every branch unable to enter the top K.
+    """
+    candidates = []
+    for blueprint_id, blueprint in enumerate(blueprints, 1):
+        factory = OptimizedRobotFactory(blueprint, final_resource=final_resource)
+        candidates.append((factory.upper_bound(time_limit) * blueprint_id, blueprint_id, factory))
+    candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+
+    def rank_key(quality: int, blueprint_id: int) -> Tuple[int, int]:
+        return (-quality, blueprint_id)
+
+    top: List[RankedBlueprint] = []
+    for bound_quality, blueprint_id, factory in candidates:
+        lower_bound = 0
+        if len(top) == top_k:
+            kth = top[-1]
+            if rank_key(bound_quality, blueprint_id) >= rank_key(kth.quality, kth.blueprint_id):
+                continue
+            # Smallest quality that would rank above the K-th best
+            needed = kth.quality if blueprint_id < kth.blueprint_id else kth.quality + 1
+            lower_bound = max(0, -(-needed // blueprint_id) - 1)
+
+        search_stats = SearchStats() if stats is not None else None
+        count = factory.max_final_resource(time_limit, stats=search_stats, lower_bound=lower_bound)
+        if stats is not None:
+            stats.blueprints[blueprint_id] = search_stats
+        # Returning the seed itself only proves the optimum is not above it
+        if lower_bound and count == lower_bound:
+            continue
+        top.append(RankedBlueprint(blueprint_id, count, count * blueprint_id))
+        top.sort(key=lambda ranked: rank_key(ranked.quality, ranked.blueprint_id))
+        del top[top_k:]
+    return top
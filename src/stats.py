@@ -0,0 +1,51 @@
+from dataclasses import asdict, dataclass, field
+from typing import Dict
+
+
+@dataclass
+class SearchStats:
+    """Counters collected by a single blueprint search"""
+    nodes_expanded: int = 0
+    pruned_by_bound: int = 0
+    pruned_by_seen: int = 0
+    max_stack_depth: int = 0
+    peak_seen_size: int = 0
+    # str: Phase name, float: Seconds
+    phase_times: Dict[str, float] = field(default_factory=dict)
+
+    def merge(self, other: "SearchStats") -> None:
+        """Accumulates another search into this one (sizes keep their maximum)"""
+        self.nodes_expanded += other.nodes_expanded
+        self.pruned_by_bound += other.pruned_by_bound
+        self.pruned_by_seen += other.pruned_by_seen
+        self.max_stack_depth = max(self.max_stack_depth, other.max_stack_depth)
+        self.peak_seen_size = max(self.peak_seen_size, other.peak_seen_size)
+        for phase, seconds in other.phase_times.items():
+            self.phase_times[phase] = self.phase_times.get(phase, 0.0) + seconds
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.phase_times.values())
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class SolveStats:
+    """Per-blueprint search statistics of a solve_blueprints run"""
+    # int: Blueprint ID
+    blueprints: Dict[int, SearchStats] = field(default_factory=dict)
+
+    @property
+    def total(self) -> SearchStats:
+        total = SearchStats()
+        for stats in self.blueprints.values():
+            total.merge(stats)
+        return total
+
+    def to_dict(self) -> Dict:
+        return {
+            "blueprints": {str(blueprint_id): stats.to_dict() for blueprint_id, stats in self.blueprints.items()},
+            "total": self.total.to_dict(),
+        }
@@ -0,0 +1,149 @@
+# === Cost-sensitivity sweeps ===
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.blueprint import Blueprint, RobotCost
+from src.optimization_service import OptimizedRobotFactory
+from src.solver import solve_blueprint
+
+# (robot type, resource) of a swept cost
+CostAxis = Tuple[str, str]
+# Index of a variant in the sweep grid, one position per axis
+GridIndex = Tuple[int, ...]
+
+
+@dataclass
+class SweepRow:
+    costs: Tuple[int, ...]
+    final_resource_count: int
+    # False when implied by neighbouring variants without a search
+    solved: bool
+
+
+@dataclass
+class SweepResult:
+    """Optimum of every cost variant of a sweep, in grid order"""
+    axes: List[CostAxis]
+    final_resource: str
+    time_limit: int
+    rows: List[SweepRow] = field(default_factory=list)
+
+    @property
+    def solves(self) -> int:
+        return sum(row.solved for row in self.rows)
+
+    def to_table(self) -> str:
+        header = [f"{robot}.{resource}" for robot, resource in self.axes] + [self.final_resource, "solved"]
+        lines = [header] + [
+            [str(cost) for cost in row.costs] + [str(row.final_resource_count), "yes" if row.solved else "no"]
+            for row in self.rows
+        ]
+        widths = [max(len(line[column]) for line in lines) for column in range(len(header))]
+        return "\n".join(
+            "  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip() for line in lines
+        ) + "\n"
+
+
+def with_costs(blueprint: Blueprint, costs: Dict[CostAxis, int]) -> Blueprint:
+    """Copy of blueprint with some robot costs replaced"""
+    robot_costs = {robot: RobotCost(dict(cost.resources)) for robot, cost in blueprint.robot_costs.items()}
+    for (robot, resource), amount in costs.items():
+        robot_costs[robot].resources[resource] = amount
+    return Blueprint(robot_costs)
+
+
+def _solve_variant(blueprint: Blueprint, time_limit: int, final_resource: str, lower_bound: int) -> int:
+    return solve_blueprint(blueprint, time_limit, final_resource, lower_bound=lower_bound)
+
+
+def _dominates(a: GridIndex, b: GridIndex) -> bool:
+    """Every cost of a is at least the matching cost of b"""
+    return all(x >= y for x, y in zip(a, b))
+
+
+def sweep_costs(
+    blueprint: Blueprint,
+    ranges: Dict[CostAxis, Iterable[int]],
+    time_limit: int = 24,
+    final_resource: str = "geode",
+    max_workers: Optional[int] = 1,
+) -> SweepResult:
+    """
+    Optimum of every combination of the given cost values.
+    A cost increase can never raise the optimum, so each box of the grid is
+    resolved from its cheapest and most expensive corners: equal corners settle
+    the whole box, otherwise it is split in two. Every search is seeded with the
+    best optimum of the more expensive variants already known, and is skipped
+    when that matches the cheaper variants' (or the relaxation's) upper bound.
+    Args:
+        blueprint: Reference blueprint
+        ranges: Values of each swept (robot type, resource) cost
+        time_limit: Time limit in minutes
+        final_resource: Resource to maximize
+        max_workers: Worker processes per wave of searches (1 = in this process, None = one per core)
+    """
+    axes = list(ranges)
+    values = [sorted(set(ranges[axis])) for axis in axes]
+    for (robot, resource), axis_values in zip(axes, values):
+        if robot not in blueprint.robot_costs or resource not in blueprint.robot_costs:
+            raise ValueError(f"Unknown cost {robot}.{resource}")
+        if not axis_values or axis_values[0] < 0:
+            raise ValueError(f"Cost values of {robot}.{resource} must be non-negative and non-empty")
+
+    def variant(index: GridIndex) -> Blueprint:
+        return with_costs(blueprint, {axis: values[a][i] for a, (axis, i) in enumerate(zip(axes, index))})
+
+    known: Dict[GridIndex, int] = {}
+    solved = set()
+    boxes = [(tuple(0 for _ in axes), tuple(len(axis_values) - 1 for axis_values in values))]
+
+    executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers != 1 else None
+    try:
+        while boxes:
+            corners = {corner for box in boxes for corner in box if corner not in known}
+            searches = {}
+            for corner in corners:
+                lower = max((result for index, result in known.items() if _dominates(index, corner)), default=0)
+                upper = min((result for index, result in known.items() if _dominates(corner, index)),
+                            default=OptimizedRobotFactory(variant(corner), final_resource).upper_bound(time_limit))
+                if lower >= upper:
+                    known[corner] = lower
+                else:
+                    searches[corner] = lower
+
+            if executor is None:
+                results = {corner: _solve_variant(variant(corner), time_limit, final_resource, lower)
+                           for corner, lower in searches.items()}
+            else:
+                futures = {corner: executor.submit(_solve_variant, variant(corner), time_limit, final_resource, lower)
+                           for corner, lower in searches.items()}
+                results = {corner: future.result() for corner, future in futures.items()}
+            known.update(results)
+            solved.update(results)
+
+            next_boxes = []
+            for low, high in boxes:
+                if known[low] == known[high]:
+                    for index in itertools.product(*(range(l, h + 1) for l, h in zip(low, high))):
+                        known.setdefault(index, known[low])
+                    continue
+                # Split the widest axis; unit boxes are fully resolved by their corners
+                axis = max(range(len(axes)), key=lambda a: high[a] - low[a])
+                if high[axis] - low[axis] <= 1 and sum(h - l for l, h in zip(low, high)) <= 1:
+                    continue
+                middle = (low[axis] + high[axis]) // 2
+                next_boxes.append((low, high[:axis] + (middle,) + high[axis + 1:]))
+                next_boxes.append((low[:axis] + (middle + 1,) + low[axis + 1:], high))
+            boxes = next_boxes
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    result = SweepResult(axes, final_resource, time_limit)
+    for index in itertools.product(*(range(len(axis_values)) for axis_values in values)):
+        result.rows.append(SweepRow(
+            tuple(values[a][i] for a, i in enumerate(index)), known[index], index in solved
+        ))
+    return result
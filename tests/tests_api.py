@@ -11,9 +11,10 @@ import json
 # Imports nécessaires ajoutés
 from src.solver import ProductCalculator
 from src.blueprint import DefaultBlueprintParser
+from src.stats import SearchStats
 
 # Import your FastAPI app
-from api.api import app
+from api.api import app, result_cache
 
 
 class TestBlueprintAnalyzerAPI(unittest.TestCase):
@@ -190,6 +191,25 @@ class TestBlueprintAnalyzerAPI(unittest.TestCase):
         self.assertEqual(config_arg.final_resource, "diamond")
         self.assertIsInstance(config_arg.calculator, ProductCalculator)
         
+    @patch('api.api.solve_blueprints')
+    @patch('api.api.BlueprintLoader')
+    def test_analyze_blueprints_with_stats(self, mock_loader_class, mock_solve):
+        """Test that ?stats=true returns the collected search statistics"""
+        mock_loader = Mock()
+        mock_loader.load.return_value = [Mock()]
+        mock_loader_class.return_value = mock_loader
+
+        def solve(config, stats=None):
+            stats.blueprints[1] = SearchStats(nodes_expanded=42)
+            return ([5], [1])
+        mock_solve.side_effect = solve
+
+        response = self.client.get(self.endpoint, params={"stats": "true"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["stats"]["blueprints"]["1"]["nodes_expanded"], 42)
+        self.assertEqual(response.json()["stats"]["total"]["nodes_expanded"], 42)
+
     @patch('api.api.solve_blueprints')
     @patch('api.api.BlueprintLoader')
     def test_analyze_blueprints_identical_qualities(self, mock_loader_class, mock_solve):
@@ -351,6 +371,346 @@ class TestAPIErrorHandling(unittest.TestCase):
         self.assertEqual(response.status_code, 405)
 
 
+class TestBatchAnalysisAPI(unittest.TestCase):
+    """Tests for the streaming batch analysis endpoint"""
+
+    def setUp(self):
+        """Setup for batch endpoint tests"""
+        self.client = TestClient(app)
+        self.endpoint = "/blueprints/analyze/batch"
+        # Solves (mocked or not) must not leak between tests through the result cache
+        result_cache.clear()
+        self.blueprint_a = (
+            "Blueprint 1: Each ore robot costs 4 ore. Each clay robot costs 2 ore. "
+            "Each obsidian robot costs 3 ore and 14 clay. Each geode robot costs 2 ore and 7 obsidian."
+        )
+        self.blueprint_b = (
+            "Blueprint 2: Each ore robot costs 2 ore. Each clay robot costs 3 ore. "
+            "Each obsidian robot costs 3 ore and 8 clay. Each geode robot costs 3 ore and 12 obsidian."
+        )
+
+    def _lines(self, response):
+        return [json.loads(line) for line in response.text.splitlines() if line]
+
+    @patch('api.api.solve_blueprint')
+    def test_batch_streams_one_line_per_blueprint(self, mock_solve):
+        """Test that each blueprint yields an NDJSON line followed by a summary"""
+        mock_solve.side_effect = lambda blueprint, time_limit, final_resource, **kwargs: \
+            9 if blueprint.robot_costs["ore"].resources["ore"] == 4 else 12
+
+        response = self.client.post(self.endpoint, json={
+            "blueprints": [self.blueprint_a, self.blueprint_b],
+            "timeLimit": 24,
+            "finalResource": "geode",
+            "calculator": "quality"
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("application/x-ndjson", response.headers["content-type"])
+
+        lines = self._lines(response)
+        self.assertEqual(len(lines), 3)
+        per_blueprint = sorted(lines[:2], key=lambda line: line["id"])
+        self.assertEqual(per_blueprint, [
+            {"id": "1", "finalResource": 9, "quality": 9},
+            {"id": "2", "finalResource": 12, "quality": 24}
+        ])
+        self.assertEqual(lines[2], {"bestBlueprint": "2", "result": 33})
+
+    @patch('api.api.solve_blueprint')
+    def test_batch_deduplicates_identical_blueprints(self, mock_solve):
+        """Test that identical blueprints of a batch share one solve"""
+        mock_solve.return_value = 3
+
+        response = self.client.post(self.endpoint, json={
+            "blueprints": [self.blueprint_a, self.blueprint_a, self.blueprint_a],
+            "time_limit": 10,
+            "calculator": "product"
+        })
+
+        self.assertEqual(response.status_code, 200)
+        lines = self._lines(response)
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(lines[-1]["result"], 27)
+        mock_solve.assert_called_once()
+
+    def test_batch_includes_stats_on_request(self):
+        """Test that search statistics are streamed when requested"""
+        response = self.client.post(self.endpoint, json={
+            "blueprints": [self.blueprint_a],
+            "timeLimit": 10,
+            "includeStats": True
+        })
+        lines = self._lines(response)
+        self.assertGreater(lines[0]["stats"]["nodes_expanded"], 0)
+        self.assertEqual(lines[-1]["stats"]["nodes_expanded"], lines[0]["stats"]["nodes_expanded"])
+
+    def test_batch_includes_plans_on_request(self):
+        """Test that each line carries an optimal build plan when requested"""
+        cheap_blueprint = (
+            "Blueprint 1: Each ore robot costs 2 ore. Each clay robot costs 2 ore. "
+            "Each obsidian robot costs 3 ore and 4 clay. Each geode robot costs 2 ore and 3 obsidian."
+        )
+        response = self.client.post(self.endpoint, json={
+            "blueprints": [cheap_blueprint],
+            "timeLimit": 14,
+            "includePlans": True
+        })
+        lines = self._lines(response)
+        plan = lines[0]["plan"]
+        self.assertTrue(plan)
+        self.assertEqual(set(plan[0]), {"minute", "robot"})
+        self.assertNotIn("plan", lines[-1])
+
+    def test_client_disconnect_frees_the_solve_pool(self):
+        """Test that an HTTP client going away mid-solve cancels the solve and frees its pool worker"""
+        import socket
+        import threading
+        import time
+        import httpx
+        import uvicorn
+        from api.api import pool_busy_workers, solve_flights
+
+        def endless_solve(blueprint, time_limit, final_resource, cancel_token=None, **kwargs):
+            # Only cancellation ends it (within the test's lifetime)
+            deadline = time.monotonic() + 30
+            while not cancel_token.cancelled and time.monotonic() < deadline:
+                time.sleep(0.01)
+            return 0
+
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        host, port = sock.getsockname()
+        server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+        thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+        with patch('api.api.solve_blueprint', side_effect=endless_solve):
+            thread.start()
+            try:
+                deadline = time.monotonic() + 10
+                while not server.started and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                with self.assertRaises(httpx.ReadTimeout):
+                    with httpx.stream("POST", f"http://{host}:{port}{self.endpoint}", timeout=1.0,
+                                      json={"blueprints": [self.blueprint_a], "timeLimit": 32}) as response:
+                        response.read()
+
+                deadline = time.monotonic() + 5
+                while pool_busy_workers.labels().get() and time.monotonic() < deadline:
+                    time.sleep(0.05)
+                self.assertEqual(pool_busy_workers.labels().get(), 0)
+                self.assertEqual(solve_flights.in_flight(), 0)
+            finally:
+                server.should_exit = True
+                thread.join(10)
+        self.assertFalse(thread.is_alive())
+        sock.close()
+
+    @patch('api.api.solve_blueprint')
+    def test_result_only_product_skips_search_after_zero_factor(self, mock_solve):
+        """Test that a product factor bounded by zero answers without searching the other blueprints"""
+        mock_solve.return_value = 5
+
+        response = self.client.post(self.endpoint, json={
+            "blueprints": [self.blueprint_a, self.blueprint_b],
+            "timeLimit": 17,
+            "calculator": "product",
+            "resultOnly": True
+        })
+
+        self.assertEqual(response.status_code, 200)
+        mock_solve.assert_not_called()
+        lines = self._lines(response)
+        self.assertEqual(lines[0], {"id": "1", "finalResource": 0, "quality": 0})
+        self.assertEqual(lines[-1]["result"], 0)
+        self.assertEqual(len(lines), 2)
+
+    @patch('api.api.solve_blueprint')
+    def test_result_only_stops_streaming_once_proven(self, mock_solve):
+        """Test that no line follows the zero factor that proves a product"""
+        mock_solve.return_value = 0
+
+        response = self.client.post(self.endpoint, json={
+            "blueprints": [self.blueprint_b, self.blueprint_b.replace("costs 2 ore", "costs 3 ore")],
+            "timeLimit": 24,
+            "calculator": "product",
+            "resultOnly": True
+        })
+
+        lines = self._lines(response)
+        self.assertEqual(lines[-1]["result"], 0)
+        self.assertEqual(len(lines), 2)
+
+    def test_best_blueprints_endpoint(self):
+        """Test the top-K endpoint"""
+        response = self.client.post("/blueprints/best", json={
+            "blueprints": [self.blueprint_a, self.blueprint_b],
+            "timeLimit": 12,
+            "topK": 2
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertLessEqual(len(data["blueprints"]), 2)
+        self.assertEqual(data["bestBlueprint"], data["blueprints"][0]["id"])
+
+    def test_batch_invalid_blueprint(self):
+        """Test that an unparsable blueprint is rejected before solving"""
+        response = self.client.post(self.endpoint, json={"blueprints": ["not a blueprint"]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Blueprint invalide", response.json()["detail"])
+
+    def test_batch_unknown_final_resource(self):
+        """Test that a final resource missing from a blueprint is rejected"""
+        response = self.client.post(self.endpoint, json={
+            "blueprints": [self.blueprint_a],
+            "finalResource": "diamond"
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_unknown_calculator(self):
+        """Test that only known calculators are accepted"""
+        response = self.client.post(self.endpoint, json={
+            "blueprints": [self.blueprint_a],
+            "calculator": "median"
+        })
+        self.assertEqual(response.status_code, 422)
+
+    def test_batch_rejects_work_for_jobs(self):
+        """Test that horizons and batches too large for a synchronous request are left to /jobs"""
+        too_long = self.client.post(self.endpoint, json={"blueprints": [self.blueprint_a], "timeLimit": 33})
+        self.assertEqual(too_long.status_code, 422)
+        self.assertIn("/jobs", self.client.get("/openapi.json").text)
+
+        too_many = self.client.post("/blueprints/best", json={"blueprints": [self.blueprint_a] * 33})
+        self.assertEqual(too_many.status_code, 422)
+
+    def test_batch_real_solve(self):
+        """Test the endpoint end-to-end on a short horizon"""
+        response = self.client.post(self.endpoint, json={
+            "blueprints": [self.blueprint_a],
+            "timeLimit": 12
+        })
+        self.assertEqual(response.status_code, 200)
+        lines = self._lines(response)
+        self.assertEqual(lines[0]["id"], "1")
+        self.assertIsInstance(lines[0]["finalResource"], int)
+
+    @patch('api.api.solve_blueprint')
+    def test_repeated_batch_uses_result_cache(self, mock_solve):
+        """Test that a solved query is answered from the cache the next time"""
+        mock_solve.return_value = 4
+        request = {"blueprints": [self.blueprint_a], "timeLimit": 10}
+
+        first = self._lines(self.client.post(self.endpoint, json=request))
+        second = self._lines(self.client.post(self.endpoint, json=request))
+
+        self.assertEqual(first, second)
+        mock_solve.assert_called_once()
+        self.assertEqual((result_cache.hits, result_cache.misses), (1, 1))
+
+    def test_metrics_endpoint(self):
+        """Test that /metrics exposes request, solve, cache and pool metrics"""
+        self.client.post(self.endpoint, json={"blueprints": [self.blueprint_a], "timeLimit": 8})
+        self.client.post(self.endpoint, json={"blueprints": [self.blueprint_a], "timeLimit": 8})
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("text/plain", response.headers["content-type"])
+        samples = {}
+        for line in response.text.splitlines():
+            if line and not line.startswith("#"):
+                name, value = line.rsplit(" ", 1)
+                samples[name] = float(value)
+
+        route = 'method="POST",route="/blueprints/analyze/batch",status="200"'
+        self.assertGreaterEqual(samples[f"http_request_duration_seconds_count{{{route}}}"], 2)
+        self.assertGreaterEqual(samples['blueprint_solve_duration_seconds_count{source="batch"}'], 1)
+        self.assertGreater(samples['solver_nodes_expanded_total{source="batch"}'], 0)
+        self.assertEqual(samples["result_cache_hits_total"], 1)
+        self.assertEqual(samples["result_cache_misses_total"], 1)
+        self.assertGreaterEqual(samples["solve_pool_workers"], 1)
+        self.assertEqual(samples["solve_pool_busy_workers"], 0)
+        self.assertIn("solve_pool_queue_depth", samples)
+
+    def test_pool_queue_depth(self):
+        """Test that the queue depth counts submitted solves until they start or are cancelled"""
+        import threading
+        from api.api import pool_queue_depth, pool_workers, solve_executor
+
+        release = threading.Event()
+        started = threading.Semaphore(0)
+
+        def blocker():
+            started.release()
+            release.wait(10)
+
+        blockers = [solve_executor.submit(blocker) for _ in range(int(pool_workers.labels().get()))]
+        for _ in blockers:
+            self.assertTrue(started.acquire(timeout=10))
+        queued = [solve_executor.submit(lambda: None) for _ in range(2)]
+        self.assertEqual(pool_queue_depth.labels().get(), 2)
+        self.assertTrue(queued[0].cancel())
+        self.assertEqual(pool_queue_depth.labels().get(), 1)
+        release.set()
+        for future in blockers + queued[1:]:
+            future.result(10)
+        self.assertEqual(pool_queue_depth.labels().get(), 0)
+
+
+class TestJobAPI(unittest.TestCase):
+    """Tests for the asynchronous job endpoints"""
+
+    def setUp(self):
+        """Setup for job endpoint tests"""
+        self.client = TestClient(app)
+        self.blueprint = (
+            "Blueprint 1: Each ore robot costs 4 ore. Each clay robot costs 2 ore. "
+            "Each obsidian robot costs 3 ore and 14 clay. Each geode robot costs 2 ore and 7 obsidian."
+        )
+
+    def _wait_for_status(self, job_id, timeout=10.0):
+        import time
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            status = self.client.get(f"/jobs/{job_id}").json()
+            if status["status"] not in ("pending", "running"):
+                return status
+            time.sleep(0.01)
+        self.fail("job did not finish in time")
+
+    def test_submit_poll_and_fetch_result(self):
+        """Test the submit/status/result workflow"""
+        response = self.client.post("/jobs", json={"blueprints": [self.blueprint], "timeLimit": 12})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["id"]
+
+        status = self._wait_for_status(job_id)
+        self.assertEqual(status["status"], "done")
+        self.assertEqual(status["blueprintsDone"], 1)
+        self.assertEqual(status["blueprintsTotal"], 1)
+
+        result = self.client.get(f"/jobs/{job_id}/result")
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(len(result.json()["blueprints"]), 1)
+        self.assertIn("result", result.json())
+
+    def test_cancel_running_job(self):
+        """Test that a cancelled job reports its state and has no result"""
+        job_id = self.client.post("/jobs", json={"blueprints": [self.blueprint], "timeLimit": 40}).json()["id"]
+
+        response = self.client.delete(f"/jobs/{job_id}")
+        self.assertEqual(response.status_code, 200)
+
+        status = self._wait_for_status(job_id)
+        self.assertEqual(status["status"], "cancelled")
+        self.assertEqual(self.client.get(f"/jobs/{job_id}/result").status_code, 409)
+
+    def test_unknown_job(self):
+        """Test that unknown job ids return 404"""
+        self.assertEqual(self.client.get("/jobs/missing").status_code, 404)
+        self.assertEqual(self.client.get("/jobs/missing/result").status_code, 404)
+        self.assertEqual(self.client.delete("/jobs/missing").status_code, 404)
+
+
 class TestAPIIntegration(unittest.TestCase):
     """Integration tests for the API"""
     
@@ -0,0 +1,146 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import aclosing
+from unittest.mock import patch
+
+from src.async_solver import solve_blueprints_async
+from src.blueprint import BlueprintLoader, DefaultBlueprintParser
+from src.cancellation import SolveCancelled
+from src.solver import SolverConfig, solve_blueprint
+
+
+class TestSolveBlueprintsAsync(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.blueprint_file = os.path.join(self.test_dir, "blueprints.txt")
+        with open(self.blueprint_file, 'w', encoding='utf-8') as f:
+            for ore_cost in (4, 2, 3, 2):
+                f.write(f"Blueprint: Each ore robot costs {ore_cost} ore. Each clay robot costs 2 ore. "
+                        "Each obsidian robot costs 3 ore and 4 clay. Each geode robot costs 2 ore and 3 obsidian.\n")
+        self.config = SolverConfig(filename=self.blueprint_file, time_limit=14)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _collect(self, **kwargs):
+        async def collect():
+            return [item async for item in solve_blueprints_async(self.config, **kwargs)]
+        return asyncio.run(collect())
+
+    def test_yields_every_blueprint(self):
+        """Test that each blueprint is yielded once with its optimum and stats"""
+        results = self._collect(max_concurrency=2)
+
+        expected = [solve_blueprint(blueprint, 14)
+                    for blueprint in BlueprintLoader(DefaultBlueprintParser()).load(self.blueprint_file)]
+        self.assertEqual(sorted(blueprint_id for blueprint_id, _, _ in results), [1, 2, 3, 4])
+        for blueprint_id, count, stats in results:
+            self.assertEqual(count, expected[blueprint_id - 1])
+            self.assertGreater(stats.nodes_expanded, 0)
+
+    def test_results_stream_as_completed(self):
+        """Test that a fast solve is yielded before a slow one submitted earlier"""
+        def solve(blueprint, time_limit, final_resource, **kwargs):
+            if blueprint.robot_costs["ore"].resources["ore"] == 4:
+                time.sleep(0.3)
+            return 1
+
+        with patch('src.async_solver.solve_blueprint', side_effect=solve):
+            results = self._collect(max_concurrency=4)
+        self.assertEqual(results[-1][0], 1)
+
+    def test_bounded_concurrency(self):
+        """Test that no more than max_concurrency solves run at once"""
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def solve(*args, **kwargs):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return 0
+
+        with patch('src.async_solver.solve_blueprint', side_effect=solve), \
+                ThreadPoolExecutor(max_workers=8) as executor:
+            results = self._collect(max_concurrency=2, executor=executor)
+        self.assertEqual(len(results), 4)
+        self.assertEqual(peak[0], 2)
+
+    def test_task_cancellation_stops_solves(self):
+        """Test that cancelling the consumer cancels the running search and skips the queued ones"""
+        started = []
+        stopped = threading.Event()
+
+        def solve(blueprint, time_limit, final_resource, cancel_token=None, **kwargs):
+            started.append(blueprint)
+            while not cancel_token.cancelled:
+                time.sleep(0.01)
+            stopped.set()
+            raise SolveCancelled()
+
+        async def consume():
+            async for _ in solve_blueprints_async(self.config, max_concurrency=1):
+                pass
+
+        async def run():
+            task = asyncio.create_task(consume())
+            while not started:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with patch('src.async_solver.solve_blueprint', side_effect=solve):
+            asyncio.run(run())
+            self.assertTrue(stopped.wait(5))
+        self.assertEqual(len(started), 1)
+
+    def test_closing_early_cancels_remaining(self):
+        """Test that leaving the loop inside aclosing cancels the solves still running"""
+        started = threading.Event()
+        cancelled = threading.Event()
+
+        def solve(blueprint, time_limit, final_resource, cancel_token=None, **kwargs):
+            if blueprint.robot_costs["ore"].resources["ore"] == 4:
+                # Finish once the second solve is running, so that there is one to cancel
+                started.wait(5)
+                return 7
+            started.set()
+            while not cancel_token.cancelled:
+                time.sleep(0.01)
+            cancelled.set()
+            raise SolveCancelled()
+
+        async def first():
+            async with aclosing(solve_blueprints_async(self.config, max_concurrency=2)) as results:
+                async for item in results:
+                    return item
+
+        with patch('src.async_solver.solve_blueprint', side_effect=solve):
+            self.assertEqual(asyncio.run(first())[:2], (1, 7))
+            self.assertTrue(cancelled.wait(5))
+
+    def test_process_pool(self):
+        """Test that solves can run in worker processes"""
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = self._collect(executor=executor)
+        self.assertEqual(sorted(blueprint_id for blueprint_id, _, _ in results), [1, 2, 3, 4])
+        self.assertTrue(all(stats.nodes_expanded > 0 for _, _, stats in results))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
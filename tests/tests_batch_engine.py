@@ -0,0 +1,104 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from src.blueprint import Blueprint, RobotCost
+from src.cancellation import CancellationToken, SolveCancelled
+from src.solver import QualityCalculator, SolverConfig, solve_blueprint, solve_blueprints
+from src.stats import SearchStats, SolveStats
+
+
+def _blueprint(ore_cost, clay_cost, obsidian_costs, geode_costs, diamond_costs=None):
+    costs = {
+        "ore": RobotCost({"ore": ore_cost}),
+        "clay": RobotCost({"ore": clay_cost}),
+        "obsidian": RobotCost(dict(zip(("ore", "clay"), obsidian_costs))),
+        "geode": RobotCost(dict(zip(("ore", "obsidian"), geode_costs))),
+    }
+    if diamond_costs is not None:
+        costs["diamond"] = RobotCost(dict(zip(("geode", "clay", "obsidian"), diamond_costs)))
+    return Blueprint(costs)
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestSolveBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.blueprints = [
+            _blueprint(2, 2, (3, 4), (2, 3)),
+            _blueprint(4, 2, (3, 14), (2, 7)),
+            _blueprint(3, 2, (2, 5), (3, 4)),
+            _blueprint(2, 3, (2, 3), (2, 2)),
+            _blueprint(2, 2, (2, 3), (2, 2), (1, 2, 1)),
+        ]
+
+    def test_matches_python_engine(self):
+        """Test that lockstep solving gives each blueprint's exact result, in order"""
+        from src.batch_engine import solve_batch
+        for time_limit in (0, 1, 10, 15):
+            expected = [solve_blueprint(blueprint, time_limit) for blueprint in self.blueprints]
+            self.assertEqual(solve_batch(self.blueprints, time_limit), expected)
+
+    def test_chunks_and_final_resource(self):
+        """Test that chunking and another final resource do not change the results"""
+        from src.batch_engine import solve_batch
+        expected = [solve_blueprint(blueprint, 12, "obsidian") for blueprint in self.blueprints]
+        self.assertEqual(solve_batch(self.blueprints, 12, "obsidian", chunk_size=2), expected)
+
+    def test_fills_stats(self):
+        """Test that each blueprint gets its own search counters"""
+        from src.batch_engine import solve_batch
+        stats = [SearchStats() for _ in self.blueprints]
+        solve_batch(self.blueprints, 12, stats=stats)
+        for search_stats in stats:
+            self.assertGreater(search_stats.nodes_expanded, 0)
+            self.assertGreater(search_stats.peak_seen_size, 0)
+            self.assertIn("search", search_stats.phase_times)
+
+    def test_cancelled(self):
+        """Test that a cancelled token stops the batch"""
+        from src.batch_engine import solve_batch
+        token = CancellationToken()
+        token.cancel()
+        with self.assertRaises(SolveCancelled):
+            solve_batch(self.blueprints, 12, cancel_token=token)
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestBatchEngineOption(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.blueprint_file = os.path.join(self.test_dir, "blueprints.txt")
+        with open(self.blueprint_file, 'w', encoding='utf-8') as f:
+            for ore_cost in (4, 2, 3):
+                f.write(f"Blueprint: Each ore robot costs {ore_cost} ore. Each clay robot costs 2 ore. "
+                        "Each obsidian robot costs 3 ore and 4 clay. Each geode robot costs 2 ore and 3 obsidian.\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_solve_blueprints_with_batch_engine(self):
+        """Test that the batch engine returns the same results as solve_blueprints"""
+        python = SolverConfig(filename=self.blueprint_file, time_limit=14, calculator=QualityCalculator())
+        batch = SolverConfig(filename=self.blueprint_file, time_limit=14, calculator=QualityCalculator(),
+                             engine="batch")
+        stats = SolveStats()
+        with patch('builtins.print'):
+            expected = solve_blueprints(python)
+            self.assertEqual(solve_blueprints(batch, stats=stats), expected)
+        self.assertEqual(sorted(stats.blueprints), [1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
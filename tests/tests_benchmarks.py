@@ -0,0 +1,187 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from benchmarks.solver_bench import (
+    compare_runs, main, run_decision_suite, run_endgame_suite, run_opening_suite, run_suite
+)
+
+
+class TestSolverBenchmark(unittest.TestCase):
+    """Tests for the solver benchmark suite"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.blueprint_file = os.path.join(self.test_dir, "blueprints.txt")
+        with open(self.blueprint_file, 'w', encoding='utf-8') as f:
+            f.write("Blueprint 1: Each ore robot costs 4 ore. Each clay robot costs 2 ore. "
+                    "Each obsidian robot costs 3 ore and 14 clay. Each geode robot costs 2 ore and 7 obsidian.\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _entry(self, **overrides):
+        entry = {"file": "blueprints.txt", "final_resource": "geode", "time_limit": 24, "blueprint": 1,
+                 "result": 9, "wall_time": 1.0, "nodes_expanded": 1000, "peak_memory_bytes": 5000}
+        entry.update(overrides)
+        return entry
+
+    def test_run_suite_records_metrics(self):
+        """Test that each blueprint/horizon gets a full measurement"""
+        report = run_suite([(self.blueprint_file, "geode")], [8, 10], log=lambda _: None)
+
+        self.assertEqual(len(report["results"]), 2)
+        self.assertEqual(len(report["batches"]), 2)
+        for entry in report["results"]:
+            self.assertGreater(entry["nodes_expanded"], 0)
+            self.assertGreater(entry["peak_memory_bytes"], 0)
+            self.assertIsNotNone(entry["nodes_per_sec"])
+        json.dumps(report)
+
+    def test_compare_flags_slowdown(self):
+        """Test that metrics above the threshold are reported"""
+        baseline = {"results": [self._entry()]}
+        current = {"results": [self._entry(wall_time=1.5, nodes_expanded=1100)]}
+
+        regressions = compare_runs(baseline, current, threshold=0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("wall_time", regressions[0])
+
+    def test_compare_flags_changed_result(self):
+        """Test that a different optimum is always a regression"""
+        regressions = compare_runs({"results": [self._entry()]}, {"results": [self._entry(result=8)]})
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("result changed", regressions[0])
+
+    def test_compare_ignores_noise_and_improvements(self):
+        """Test that tiny baselines and speedups are not flagged"""
+        baseline = {"results": [self._entry(wall_time=0.001)]}
+        current = {"results": [self._entry(wall_time=0.01, nodes_expanded=500)]}
+        self.assertEqual(compare_runs(baseline, current), [])
+
+    def test_compare_command_exit_status(self):
+        """Test the compare command line"""
+        baseline_file = os.path.join(self.test_dir, "baseline.json")
+        current_file = os.path.join(self.test_dir, "current.json")
+        with open(baseline_file, 'w', encoding='utf-8') as f:
+            json.dump({"results": [self._entry()]}, f)
+        with open(current_file, 'w', encoding='utf-8') as f:
+            json.dump({"results": [self._entry(nodes_expanded=5000)]}, f)
+
+        self.assertEqual(main(["compare", current_file, "--baseline", baseline_file]), 1)
+        self.assertEqual(main(["compare", baseline_file, "--baseline", baseline_file]), 0)
+        # No baseline is shipped: it has to be recorded on the machine comparing
+        with self.assertRaises(SystemExit), patch('sys.stderr'):
+            main(["compare", current_file])
+
+    def test_decision_suite_agrees_with_max(self):
+        """Test that both search modes are timed and find the same optimum"""
+        results = run_decision_suite([(self.blueprint_file, "geode")], [18], log=lambda _: None)
+        self.assertEqual(len(results), 1)
+        entry = results[0]
+        self.assertEqual(entry["decision_result"], entry["max_result"])
+        self.assertGreaterEqual(entry["upper_bound"], entry["max_result"])
+        self.assertGreater(entry["max_nodes"], 0)
+
+    def test_opening_suite(self):
+        """Test that each opening length is measured, with the same optimum"""
+        results = run_opening_suite([(self.blueprint_file, "geode")], [18], [0, 6], log=lambda _: None)
+        self.assertEqual([entry["minutes"] for entry in results], [0, 6])
+        self.assertEqual((results[0]["openings"], results[1]["openings"]), (0, 1))
+        self.assertGreater(results[1]["nodes_expanded"], 0)
+
+    def test_endgame_suite(self):
+        """Test that each endgame length is measured and looks nodes up"""
+        results = run_endgame_suite([(self.blueprint_file, "geode")], [18], [0, 4], log=lambda _: None)
+        self.assertEqual([entry["minutes"] for entry in results], [0, 4])
+        self.assertLess(results[1]["nodes_expanded"], results[0]["nodes_expanded"])
+        self.assertGreater(results[1]["peak_table_entries"], 0)
+
+    def test_scaling_benchmark(self):
+        """Test that the scaling benchmark measures parsing and solving"""
+        from benchmarks.scaling_bench import bench_parse, bench_solve
+        from src.catalog import CatalogSpec
+
+        parse = bench_parse([10, 100], CatalogSpec(), log=lambda _: None)
+        self.assertEqual([entry["size"] for entry in parse], [10, 100])
+        self.assertGreater(parse[1]["peak_memory_bytes"], 0)
+
+        solve = bench_solve([4, 6], [10], 2, CatalogSpec(), log=lambda _: None)
+        self.assertEqual([(entry["resource_types"], entry["time_limit"]) for entry in solve], [(4, 10), (6, 10)])
+        self.assertGreater(solve[0]["mean_nodes_expanded"], 0)
+
+
+class TestStartupBenchmark(unittest.TestCase):
+    """Tests for the command-line start-up benchmark"""
+
+    def test_parse_importtime(self):
+        """Test the parsing of -X importtime output"""
+        from benchmarks.startup_bench import parse_importtime
+
+        stderr = ("import time: self [us] | cumulative | imported package\n"
+                  "import time:       120 |        120 |   _io\n"
+                  "import time:      2633 |       5529 | src.cli\n")
+        self.assertEqual(parse_importtime(stderr), [
+            {"module": "_io", "self_us": 120, "cumulative_us": 120},
+            {"module": "src.cli", "self_us": 2633, "cumulative_us": 5529},
+        ])
+
+    def test_cached_start(self):
+        """Test that a cached run is measured and does not import the search"""
+        from benchmarks.startup_bench import bench_startup
+
+        report = bench_startup(time_limit=8, max_blueprints=2, runs=1)
+        self.assertEqual(report["search_imported"], [])
+        self.assertGreater(report["modules_imported"], 0)
+        self.assertGreater(report["cached_time"], 0)
+        json.dumps(report)
+
+
+class TestLoadTest(unittest.TestCase):
+    """Tests for the API load-testing harness"""
+
+    def test_percentiles(self):
+        """Test the nearest-rank percentiles of the latency summary"""
+        from benchmarks.load_test import percentile, summarize
+
+        latencies = [i / 100 for i in range(1, 101)]
+        self.assertEqual(percentile(latencies, 50), 0.5)
+        self.assertEqual(percentile(latencies, 99), 0.99)
+        self.assertIsNone(percentile([], 95))
+
+        summary = summarize(latencies, errors=25, elapsed=5.0)
+        self.assertEqual(summary["requests"], 125)
+        self.assertEqual(summary["throughput"], 25.0)
+        self.assertEqual(summary["error_rate"], 0.2)
+        self.assertEqual(summary["p95_latency"], 0.95)
+
+    def test_unknown_request_kind(self):
+        """Test that the request mix only accepts known request kinds"""
+        from benchmarks.load_test import LoadTestConfig
+
+        with self.assertRaises(ValueError):
+            LoadTestConfig(mix={"batch": 1, "upload": 2})
+
+    def test_load_test_against_local_server(self):
+        """Test a short run against a uvicorn server started for it"""
+        from benchmarks.load_test import LoadTestConfig, load_test
+
+        report = load_test(LoadTestConfig(concurrency=2, requests=6, mix={"batch": 1, "best": 1}, time_limit=8))
+
+        self.assertEqual(report["total"]["requests"], 6)
+        self.assertEqual(report["total"]["errors"], 0)
+        self.assertEqual(sum(summary["requests"] for summary in report["by_kind"].values()), 6)
+        self.assertIsNotNone(report["total"]["p99_latency"])
+        if report["server"]["cpu_seconds"] is not None:
+            self.assertGreater(report["server"]["peak_rss_bytes"], 0)
+        json.dumps(report)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
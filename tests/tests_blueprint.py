@@ -301,6 +301,30 @@ Blueprint 2: Each ore robot costs 2 ore. Each clay robot costs 3 ore. Each obsid
                 for resource, quantity in cost.resources.items():
                     self.assertGreater(quantity, 0, f"{robot_type} robot {resource} cost should be positive")
 
+    def test_parse_longer_chain(self):
+        """Test que les chaînes de plus de cinq ressources sont lues phrase par phrase"""
+        text = ("Blueprint 1: Each ore robot costs 4 ore. Each clay robot costs 2 ore. "
+                "Each obsidian robot costs 3 ore and 14 clay. Each geode robot costs 2 ore and 7 obsidian. "
+                "Each diamond robot costs 1 geode, 8 clay and 7 obsidian. "
+                "Each crystal robot costs 2 ore, 5 diamond and 3 geode.")
+
+        blueprint = DefaultBlueprintParser().parse(text)
+
+        self.assertEqual(list(blueprint.robot_costs),
+                         ["ore", "clay", "obsidian", "geode", "diamond", "crystal"])
+        self.assertEqual(blueprint.robot_costs["diamond"].resources, {"geode": 1, "clay": 8, "obsidian": 7})
+        self.assertEqual(blueprint.robot_costs["crystal"].resources, {"ore": 2, "diamond": 5, "geode": 3})
+
+    def test_parse_unusual_costs_keep_sentence_order(self):
+        """Test qu'un coût hors des motifs connus garde l'ordre des robots"""
+        text = ("Blueprint 1: Each ore robot costs 4 ore. Each clay robot costs 2 ore. "
+                "Each obsidian robot costs 3 ore and 14 clay. Each geode robot costs 2 ore, 7 obsidian and 3 clay.")
+
+        blueprint = DefaultBlueprintParser().parse(text)
+
+        self.assertEqual(list(blueprint.robot_costs), ["ore", "clay", "obsidian", "geode"])
+        self.assertEqual(blueprint.robot_costs["geode"].resources, {"ore": 2, "obsidian": 7, "clay": 3})
+
 
 if __name__ == '__main__':
     # Configuration pour des tests plus verbeux
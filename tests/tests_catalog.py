@@ -0,0 +1,82 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import shutil
+import tempfile
+import unittest
+
+from src.blueprint import BlueprintLoader, DefaultBlueprintParser, blueprint_key
+from src.catalog import CatalogSpec, format_blueprint, generate_blueprints, main, write_catalog
+from src.optimization_service import OptimizedRobotFactory
+
+
+class TestCatalogGenerator(unittest.TestCase):
+    """Tests for the synthetic catalog generator"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_same_seed_same_catalog(self):
+        """Test that a seed fully determines the catalog"""
+        spec = CatalogSpec(resource_types=6, extra_cost_probability=0.5)
+        first = [blueprint_key(blueprint) for blueprint in generate_blueprints(20, spec, seed=7)]
+        second = [blueprint_key(blueprint) for blueprint in generate_blueprints(20, spec, seed=7)]
+        other = [blueprint_key(blueprint) for blueprint in generate_blueprints(20, spec, seed=8)]
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+
+    def test_written_catalog_parses_back(self):
+        """Test that generated files of every chain depth are read back identically"""
+        for resource_types in (4, 5, 6, 8):
+            with self.subTest(resource_types=resource_types):
+                spec = CatalogSpec(resource_types=resource_types, extra_cost_probability=0.5)
+                filename = os.path.join(self.test_dir, f"catalog_{resource_types}.txt")
+                write_catalog(filename, 25, spec, seed=resource_types)
+
+                loaded = BlueprintLoader(DefaultBlueprintParser()).load(filename)
+                generated = list(generate_blueprints(25, spec, seed=resource_types))
+                self.assertEqual([blueprint_key(b) for b in loaded], [blueprint_key(b) for b in generated])
+                self.assertEqual(len(loaded[0].robot_costs), resource_types)
+
+    def test_cost_ranges(self):
+        """Test that sampled costs stay within the spec"""
+        spec = CatalogSpec(ore_cost=(3, 3), chain_cost=(6, 9))
+        for blueprint in generate_blueprints(50, spec):
+            for robot, cost in blueprint.robot_costs.items():
+                self.assertEqual(cost.resources["ore"], 3)
+                for resource, amount in cost.resources.items():
+                    if resource != "ore":
+                        self.assertTrue(6 <= amount <= 9)
+
+    def test_difficulty_target(self):
+        """Test that every blueprint meets the difficulty target"""
+        spec = CatalogSpec(difficulty=(10, 20), difficulty_horizon=24)
+        for blueprint in generate_blueprints(20, spec):
+            bound = OptimizedRobotFactory(blueprint, "geode").upper_bound(24)
+            self.assertTrue(10 <= bound <= 20)
+
+        with self.assertRaises(ValueError):
+            list(generate_blueprints(1, CatalogSpec(difficulty=(10000, 20000), max_attempts=10)))
+
+    def test_format_blueprint(self):
+        """Test the generated line format"""
+        blueprint = next(generate_blueprints(1, CatalogSpec(ore_cost=(4, 4), chain_cost=(7, 7))))
+        self.assertEqual(
+            format_blueprint(3, blueprint),
+            "Blueprint 3: Each ore robot costs 4 ore. Each clay robot costs 4 ore. "
+            "Each obsidian robot costs 4 ore and 7 clay. Each geode robot costs 4 ore and 7 obsidian."
+        )
+
+    def test_command_line(self):
+        """Test the catalog command line"""
+        filename = os.path.join(self.test_dir, "cli.txt")
+        self.assertEqual(main([filename, "--count", "5", "--resource-types", "5", "--seed", "2"]), 0)
+        self.assertEqual(len(BlueprintLoader(DefaultBlueprintParser()).load(filename)), 5)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
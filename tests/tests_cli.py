@@ -0,0 +1,153 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from src.cli import ENGINE_CHOICES, main
+from src.result_cache import DiskResultCache
+from src.solver import ENGINES
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestCommandLine(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.test_dir, "cache")
+        self.blueprint_file = os.path.join(self.test_dir, "blueprints.txt")
+        self.lines = [
+            "Blueprint 1: Each ore robot costs 4 ore. Each clay robot costs 2 ore. "
+            "Each obsidian robot costs 3 ore and 14 clay. Each geode robot costs 2 ore and 7 obsidian.",
+            "Blueprint 2: Each ore robot costs 2 ore. Each clay robot costs 2 ore. "
+            "Each obsidian robot costs 3 ore and 4 clay. Each geode robot costs 2 ore and 3 obsidian.",
+        ]
+        with open(self.blueprint_file, 'w', encoding='utf-8') as f:
+            f.write("\n".join(self.lines) + "\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _run(self, argv, stdin=""):
+        stdout = io.StringIO()
+        status = main(argv, stdin=io.StringIO(stdin), stdout=stdout)
+        return status, stdout.getvalue().splitlines()
+
+    def test_solves_file(self):
+        """Test one line per blueprint followed by the calculator result"""
+        status, lines = self._run([self.blueprint_file, "-t", "14"])
+        self.assertEqual(status, 0)
+        self.assertEqual(lines, ["Blueprint 1: 0 geodes", "Blueprint 2: 3 geodes", "Result: 6"])
+
+    def test_reads_standard_input(self):
+        """Test that - reads the blueprints from standard input"""
+        status, lines = self._run(["-", "-t", "14", "-c", "product", "-n", "1"], stdin="\n".join(self.lines))
+        self.assertEqual(status, 0)
+        self.assertEqual(lines, ["Blueprint 1: 0 geodes", "Result: 0"])
+
+    def test_parallel_jobs_and_engines(self):
+        """Test that worker processes and other engines give the same results"""
+        _, sequential = self._run([self.blueprint_file, "-t", "14"])
+        _, parallel = self._run([self.blueprint_file, "-t", "14", "-j", "2"])
+        _, batch = self._run([self.blueprint_file, "-t", "14", "-e", "batch"])
+        self.assertEqual(sorted(parallel), sorted(sequential))
+        self.assertEqual(batch, sequential)
+
+    def test_cache_skips_solved_blueprints(self):
+        """Test that a second run with the same cache solves nothing"""
+        _, first = self._run([self.blueprint_file, "-t", "14", "--cache", self.cache_dir])
+        with patch('src.solver.solve_blueprint') as mock_solve:
+            _, second = self._run([self.blueprint_file, "-t", "14", "--cache", self.cache_dir])
+        mock_solve.assert_not_called()
+        self.assertEqual(second, first)
+        self.assertEqual(DiskResultCache(self.cache_dir).get("missing", 14, "geode"), None)
+
+    def test_cached_run_does_not_import_the_search(self):
+        """Test that a fully cached run never imports the solver modules"""
+        self._run([self.blueprint_file, "-t", "12", "--cache", self.cache_dir])
+        script = ("import sys; from src.cli import main; main(sys.argv[1:]); "
+                  "print(sorted(m for m in ('src.solver', 'src.optimization_service') if m in sys.modules))")
+        output = subprocess.run([sys.executable, "-c", script, self.blueprint_file, "-t", "12", "--cache", self.cache_dir],
+                                cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.splitlines()[-1], "[]")
+
+    def test_invalid_input(self):
+        """Test that unreadable files and unknown final resources exit with status 2"""
+        with patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            self.assertEqual(self._run([os.path.join(self.test_dir, "missing.txt")])[0], 2)
+            self.assertEqual(self._run([self.blueprint_file, "-r", "diamond"])[0], 2)
+        self.assertIn("no diamond robot", stderr.getvalue())
+
+    def test_results_stream_with_standard_input(self):
+        """Test that each blueprint is reported before the next line of standard input is read"""
+        stdout = io.StringIO()
+        seen_before_line = []
+
+        def stdin():
+            for line in self.lines:
+                seen_before_line.append(stdout.getvalue().count("Blueprint"))
+                yield line + "\n"
+
+        self.assertEqual(main(["-", "-t", "14"], stdin=stdin(), stdout=stdout), 0)
+        self.assertEqual(seen_before_line, [0, 1])
+        self.assertEqual(stdout.getvalue().splitlines()[-1], "Result: 6")
+
+    def test_results_stream_from_worker_processes(self):
+        """Test that worker processes report each line of a pipe while the next one is awaited"""
+        process = subprocess.Popen([sys.executable, "-m", "src", "-", "-t", "14", "-j", "2"], cwd=ROOT_DIR,
+                                   stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        output = queue.Queue()
+        threading.Thread(target=lambda: [output.put(line) for line in process.stdout], daemon=True).start()
+        try:
+            for blueprint_id, line in enumerate(self.lines, 1):
+                process.stdin.write(line + "\n")
+                process.stdin.flush()
+                self.assertTrue(output.get(timeout=60).startswith(f"Blueprint {blueprint_id}: "))
+            process.stdin.close()
+            self.assertEqual(output.get(timeout=60), "Result: 6\n")
+            self.assertEqual(process.wait(60), 0)
+        finally:
+            process.kill()
+
+    def test_engine_choices_match_solver(self):
+        """Test that the CLI offers exactly the solver's engines"""
+        self.assertEqual(ENGINE_CHOICES, ENGINES)
+
+
+class TestDiskResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_results_persist(self):
+        """Test that results are read back by a new cache on the same directory"""
+        DiskResultCache(self.test_dir).put("abc", 24, "geode", 9)
+        cache = DiskResultCache(self.test_dir)
+        self.assertEqual(cache.get("abc", 24, "geode"), 9)
+        self.assertIsNone(cache.get("abc", 32, "geode"))
+
+    def test_torn_line_is_skipped(self):
+        """Test that a torn record is ignored and does not corrupt the next one"""
+        DiskResultCache(self.test_dir).put("abc", 24, "geode", 9)
+        with open(os.path.join(self.test_dir, DiskResultCache.FILENAME), 'a', encoding='utf-8') as f:
+            f.write('{"key": "def:24:ge')
+        DiskResultCache(self.test_dir).put("ghi", 24, "geode", 4)
+
+        cache = DiskResultCache(self.test_dir)
+        self.assertEqual(cache.get("abc", 24, "geode"), 9)
+        self.assertEqual(cache.get("ghi", 24, "geode"), 4)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
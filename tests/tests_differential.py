@@ -0,0 +1,96 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from unittest.mock import patch
+
+import src.jit_kernel  # numba cannot be imported for the first time under a patched print
+from src.blueprint import Blueprint, DefaultBlueprintParser, RobotCost
+from src.differential import (
+    Mismatch, Variant, check_blueprint, default_variants, minimize, reference_max_final_resource, run_differential
+)
+from src.optimization_service import OptimizedRobotFactory
+from src.solver import solve_blueprint
+
+
+class TestDifferential(unittest.TestCase):
+
+    def setUp(self):
+        self.blueprint = Blueprint({
+            "ore": RobotCost({"ore": 2}),
+            "clay": RobotCost({"ore": 2}),
+            "obsidian": RobotCost({"ore": 3, "clay": 4}),
+            "geode": RobotCost({"ore": 2, "obsidian": 3})
+        })
+
+    def test_reference_matches_engine(self):
+        """Test that the exhaustive solver agrees with the search on short horizons"""
+        for time_limit in (0, 5, 10, 13):
+            self.assertEqual(reference_max_final_resource(self.blueprint, time_limit),
+                             solve_blueprint(self.blueprint, time_limit))
+        self.assertEqual(reference_max_final_resource(self.blueprint, 8, "clay"),
+                         solve_blueprint(self.blueprint, 8, "clay"))
+
+    def test_every_variant_agrees(self):
+        """Test that no engine or pruning option disagrees on generated blueprints"""
+        report = run_differential(count=3, resource_types=[2, 3, 4], time_limits=[6, 10], seed=3)
+        self.assertEqual(report.cases, 18)
+        self.assertTrue(report.ok, "\n".join(mismatch.describe() for mismatch in report.mismatches))
+
+    def test_default_variants(self):
+        """Test that the exact python variants and the bound are always checked"""
+        variants = {variant.name: variant for variant in default_variants()}
+        for name in ("python", "python_capped", "python_seen_limit", "python_seeded", "python_opening_book",
+                     "python_opening_book_capped_seen_limit", "python_endgame", "python_opening_book_endgame",
+                     "every_resource", "plan_replay", "decision"):
+            self.assertTrue(variants[name].exact)
+        self.assertFalse(variants["upper_bound"].exact)
+
+    def test_every_resource_checks_each_target(self):
+        """Test that a wrong target other than the maximized resource fails the multi-resource variant"""
+        variant = next(variant for variant in default_variants() if variant.name == "every_resource")
+        self.assertFalse(check_blueprint(self.blueprint, 10, "geode", [variant]))
+
+        real_search = OptimizedRobotFactory.max_final_resources
+
+        def wrong_clay(factory, *args, **kwargs):
+            results = real_search(factory, *args, **kwargs)
+            results["clay"] += 1
+            return results
+
+        with patch.object(OptimizedRobotFactory, 'max_final_resources', wrong_clay):
+            self.assertTrue(check_blueprint(self.blueprint, 10, "geode", [variant]))
+
+    def test_upper_bound_only_needs_to_bound(self):
+        """Test that an inexact variant only fails below the optimum"""
+        self.assertFalse(check_blueprint(self.blueprint, 10, "geode", [Variant("high", lambda bp, t, r: 99, exact=False)]))
+        self.assertTrue(check_blueprint(self.blueprint, 10, "geode", [Variant("low", lambda bp, t, r: -1, exact=False)]))
+
+    def test_failing_case_is_minimized(self):
+        """Test that a wrong prune is shrunk to a small reproducible blueprint line"""
+        # Loses one final resource whenever the clay robot costs more than one ore
+        broken = Variant("broken", lambda bp, t, r: solve_blueprint(bp, t, r)
+                         - (bp.robot_costs["clay"].resources["ore"] > 1 and solve_blueprint(bp, t, r) > 0))
+        report = run_differential(count=2, resource_types=[3], time_limits=[10], seed=2, variants=[broken])
+
+        self.assertFalse(report.ok)
+        mismatch = report.mismatches[0]
+        self.assertEqual(mismatch.expected - mismatch.actual, 1)
+        self.assertEqual(mismatch.blueprint.robot_costs["clay"].resources["ore"], 2)
+        self.assertLess(mismatch.time_limit, 10)
+        reparsed = DefaultBlueprintParser().parse(mismatch.blueprint_line())
+        self.assertTrue(check_blueprint(reparsed, mismatch.time_limit, mismatch.final_resource, [broken]))
+
+    def test_minimize_keeps_failing(self):
+        """Test that minimization stops at a case that still fails"""
+        broken = Variant("off_by_one", lambda bp, t, r: solve_blueprint(bp, t, r) + 1)
+        mismatch = Mismatch("off_by_one", self.blueprint, 12, "geode", 0, 0)
+        smallest = minimize(mismatch, broken)
+        self.assertEqual(smallest.time_limit, 1)
+        self.assertEqual(smallest.actual, smallest.expected + 1)
+        self.assertIn("Blueprint 1: Each ore robot costs 1 ore.", smallest.describe())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
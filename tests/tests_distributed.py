@@ -0,0 +1,195 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import src.jit_kernel  # numba must not be first imported under a patched print
+from src.blueprint import BlueprintLoader, DefaultBlueprintParser
+from src.distributed import (
+    Coordinator, Task, calculate_and_write_analysis_distributed, run_worker, solve_blueprints_distributed
+)
+from src.solver import ProductCalculator, SolverConfig, solve_blueprint
+from src.stats import SolveStats
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestDistributed(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.blueprint_file = os.path.join(self.test_dir, "blueprints.txt")
+        with open(self.blueprint_file, 'w', encoding='utf-8') as f:
+            for ore_cost in (4, 2, 3, 2, 3):
+                f.write(f"Blueprint: Each ore robot costs {ore_cost} ore. Each clay robot costs 2 ore. "
+                        "Each obsidian robot costs 3 ore and 4 clay. Each geode robot costs 2 ore and 3 obsidian.\n")
+        self.blueprints = BlueprintLoader(DefaultBlueprintParser()).load(self.blueprint_file)
+        self.config = SolverConfig(filename=self.blueprint_file, time_limit=14,
+                                   output_file=os.path.join(self.test_dir, "analysis.txt"))
+        self.expected = [solve_blueprint(blueprint, 14) for blueprint in self.blueprints]
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _start_workers(self, coordinator, count, **kwargs):
+        host, port = coordinator.address
+        threads = [threading.Thread(target=run_worker, args=(host, port, f"worker-{i}"), kwargs=kwargs, daemon=True)
+                   for i in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _fake_worker(self, coordinator, behaviour):
+        """Connects, takes one task, then misbehaves"""
+        sock = socket.create_connection(coordinator.address)
+        sock.sendall(b'{"type": "hello", "worker": "fake"}\n')
+        reader = sock.makefile('r')
+        task = json.loads(reader.readline())
+        behaviour(sock)
+        return task, sock
+
+    def test_workers_solve_every_blueprint(self):
+        """Test that several local workers give the same results as local solves"""
+        with Coordinator() as coordinator:
+            threads = self._start_workers(coordinator, 3)
+            stats = SolveStats()
+            results, blueprint_ids = solve_blueprints_distributed(self.config, coordinator, stats, timeout=60)
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(results, self.expected)
+        self.assertEqual(blueprint_ids, [1, 2, 3, 4, 5])
+        self.assertGreater(stats.total.nodes_expanded, 0)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+
+    def test_coordinator_reused_across_horizons(self):
+        """Test that a second run on the same coordinator does not get the first run's results"""
+        with Coordinator() as coordinator:
+            self._start_workers(coordinator, 2)
+            short, _ = solve_blueprints_distributed(SolverConfig(filename=self.blueprint_file, time_limit=10),
+                                                    coordinator, timeout=60)
+            results, _ = solve_blueprints_distributed(self.config, coordinator, timeout=60)
+
+        self.assertEqual(short, [solve_blueprint(blueprint, 10) for blueprint in self.blueprints])
+        self.assertNotEqual(short, self.expected)
+        self.assertEqual(results, self.expected)
+        self.assertEqual(coordinator.dispatches, 10)
+
+    def test_dead_worker_task_is_redispatched(self):
+        """Test that the task of a worker that disconnects goes to another worker"""
+        with Coordinator() as coordinator:
+            tasks = [Task(i, blueprint, 14, "geode") for i, blueprint in enumerate(self.blueprints, 1)]
+            solving = threading.Thread(target=lambda: self.results.update(coordinator.solve(tasks, timeout=60)))
+            self.results = {}
+            solving.start()
+            lost_task, sock = self._fake_worker(coordinator, lambda sock: sock.close())
+            self._start_workers(coordinator, 1)
+            solving.join(60)
+
+        self.assertEqual([self.results[i][0] for i in range(1, 6)], self.expected)
+        self.assertIn(lost_task["task_id"], self.results)
+        self.assertEqual(coordinator.dispatches, 6)
+
+    def test_silent_worker_times_out(self):
+        """Test that a worker sending no heartbeat loses its task after the timeout"""
+        with Coordinator(heartbeat_timeout=0.5) as coordinator:
+            self.results = {}
+            task = Task(1, self.blueprints[0], 14, "geode")
+            solving = threading.Thread(target=lambda: self.results.update(coordinator.solve([task], timeout=30)))
+            solving.start()
+            _, sock = self._fake_worker(coordinator, lambda sock: None)
+            self._start_workers(coordinator, 1)
+            solving.join(30)
+            sock.close()
+
+        self.assertEqual(self.results[1][0], self.expected[0])
+        self.assertEqual(coordinator.dispatches, 2)
+
+    def test_heartbeats_keep_slow_tasks(self):
+        """Test that a search longer than the timeout is not re-dispatched while heartbeats arrive"""
+        def slow_solve(*args, **kwargs):
+            time.sleep(1.0)
+            return 5
+
+        with patch('src.distributed.solve_blueprint', side_effect=slow_solve), \
+                Coordinator(heartbeat_timeout=0.4) as coordinator:
+            self._start_workers(coordinator, 1, heartbeat_interval=0.1)
+            results = coordinator.solve([Task(1, self.blueprints[0], 14, "geode")], timeout=30)
+        self.assertEqual(results[1][0], 5)
+        self.assertEqual(coordinator.dispatches, 1)
+
+    @unittest.skipUnless(src.jit_kernel.JIT_AVAILABLE, "numba is not installed")
+    def test_long_jit_task_is_not_redispatched(self):
+        """Test that a compiled search longer than the timeout lets the heartbeats through"""
+        blueprint = BlueprintLoader(DefaultBlueprintParser()).load(os.path.join(ROOT_DIR, "data", "blueprints.txt"))[0]
+        with Coordinator(heartbeat_timeout=0.5) as coordinator:
+            host, port = coordinator.address
+            worker = subprocess.Popen([sys.executable, "-m", "src.distributed", "worker", "--host", host,
+                                       "--port", str(port), "--heartbeat-interval", "0.1"], cwd=ROOT_DIR,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                # A short solve first, so that loading the compiled kernel is not timed
+                coordinator.solve([Task(1, blueprint, 5, "geode", "jit")], timeout=120)
+                started = time.perf_counter()
+                results = coordinator.solve([Task(1, blueprint, 28, "geode", "jit")], timeout=120)
+                elapsed = time.perf_counter() - started
+            except Exception:
+                worker.kill()
+                raise
+        self.assertEqual(worker.wait(10), 0)
+
+        self.assertGreater(elapsed, 0.5)
+        self.assertEqual(results[1][0], solve_blueprint(blueprint, 28, engine="jit"))
+        self.assertEqual(coordinator.dispatches, 2)
+
+    def test_failed_task_is_reported(self):
+        """Test that an error raised on a worker fails the solve"""
+        with Coordinator() as coordinator:
+            self._start_workers(coordinator, 1)
+            with self.assertRaises(RuntimeError) as context:
+                coordinator.solve([Task(1, self.blueprints[0], 14, "diamond")], timeout=30)
+        self.assertIn("Task 1 failed", str(context.exception))
+
+    def test_timeout_without_workers(self):
+        """Test that solve gives up after the timeout when nobody works"""
+        with Coordinator() as coordinator:
+            with self.assertRaises(TimeoutError):
+                coordinator.solve([Task(1, self.blueprints[0], 14, "geode")], timeout=0.3)
+
+    def test_analysis_output_with_worker_processes(self):
+        """Test the usual analysis file, with workers in separate processes"""
+        self.config.calculator = ProductCalculator()
+        self.config.max_blueprints = 3
+        with Coordinator() as coordinator:
+            host, port = coordinator.address
+            workers = [subprocess.Popen([sys.executable, "-m", "src.distributed", "worker", "--host", host,
+                                         "--port", str(port)], cwd=ROOT_DIR,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                       for _ in range(2)]
+            try:
+                result = calculate_and_write_analysis_distributed(self.config, coordinator, timeout=60)
+            except Exception:
+                for worker in workers:
+                    worker.kill()
+                raise
+        for worker in workers:
+            self.assertEqual(worker.wait(10), 0)
+
+        self.assertEqual(result, self.expected[0] * self.expected[1] * self.expected[2])
+        with open(self.config.output_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        for blueprint_id in (1, 2, 3):
+            self.assertIn(f"Blueprint {blueprint_id}: {self.expected[blueprint_id - 1] * blueprint_id}", content)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
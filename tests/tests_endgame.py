@@ -0,0 +1,95 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tempfile
+import unittest
+
+from src.blueprint import Blueprint, RobotCost
+from src.endgame import EndgameTable
+from src.optimization_service import OptimizedRobotFactory
+from src.solver import SolverConfig, solve_blueprint, solve_blueprints
+from src.stats import SearchStats
+
+
+class TestEndgameTable(unittest.TestCase):
+
+    def setUp(self):
+        self.blueprint = Blueprint({
+            "ore": RobotCost({"ore": 4}),
+            "clay": RobotCost({"ore": 2}),
+            "obsidian": RobotCost({"ore": 3, "clay": 5}),
+            "geode": RobotCost({"ore": 2, "obsidian": 4})
+        })
+        # Diamond robots cost geodes, so maximizing geodes may spend some
+        self.diamond_blueprint = Blueprint({
+            "ore": RobotCost({"ore": 2}),
+            "clay": RobotCost({"ore": 2}),
+            "obsidian": RobotCost({"ore": 2, "clay": 3}),
+            "geode": RobotCost({"ore": 2, "obsidian": 2}),
+            "diamond": RobotCost({"geode": 1, "obsidian": 2})
+        })
+
+    def test_search_with_table_keeps_optimum(self):
+        """Test that looking the last minutes up gives the optimum of the full search"""
+        for blueprint, final_resource in ((self.blueprint, "geode"), (self.diamond_blueprint, "geode"),
+                                          (self.diamond_blueprint, "diamond")):
+            factory = OptimizedRobotFactory(blueprint, final_resource=final_resource)
+            expected = factory.max_final_resource(15)
+            for minutes in (1, 3, 5):
+                plain, looked_up = SearchStats(), SearchStats()
+                factory.max_final_resource(15, stats=plain)
+                self.assertEqual(factory.max_final_resource(15, stats=looked_up,
+                                                            endgame=EndgameTable(factory, minutes)), expected)
+                self.assertLess(looked_up.nodes_expanded, plain.nodes_expanded)
+
+    def test_gain_of_the_initial_state_is_the_optimum(self):
+        """Test that a table covering the whole horizon solves it alone"""
+        factory = OptimizedRobotFactory(self.blueprint)
+        initial = factory._initial_state()
+        self.assertEqual(EndgameTable(factory, 14).gain(14, initial.resources, initial.robots),
+                         factory.max_final_resource(14))
+
+    def test_table_is_shared_by_horizons(self):
+        """Test that the table of a blueprint serves several time limits"""
+        factory = OptimizedRobotFactory(self.blueprint)
+        table = EndgameTable(factory, 4)
+        for time_limit in (14, 16):
+            self.assertEqual(factory.max_final_resource(time_limit, endgame=table),
+                             factory.max_final_resource(time_limit))
+        self.assertGreater(table.hits, 0)
+
+    def test_size_cap(self):
+        """Test that a full table stops growing and stays exact"""
+        factory = OptimizedRobotFactory(self.blueprint)
+        table = EndgameTable(factory, 5, max_entries=50)
+        self.assertEqual(factory.max_final_resource(16, endgame=table), factory.max_final_resource(16))
+        self.assertEqual(len(table), 50)
+
+    def test_plan_needs_full_search(self):
+        """Test that plans cannot be rebuilt through the table"""
+        factory = OptimizedRobotFactory(self.blueprint)
+        with self.assertRaises(ValueError):
+            factory.max_final_resource(12, plan=[], endgame=EndgameTable(factory))
+        # solve_blueprint expands every minute when a plan is requested
+        plan = []
+        self.assertEqual(solve_blueprint(self.blueprint, 14, plan=plan, endgame_minutes=4),
+                         factory.max_final_resource(14))
+        self.assertEqual(factory.replay_plan(plan, 14), factory.max_final_resource(14))
+
+    def test_solve_blueprints_with_endgame(self):
+        """Test a run with an endgame table per blueprint"""
+        with tempfile.NamedTemporaryFile('w', suffix=".txt", delete=False) as f:
+            for ore_cost in (2, 3, 4):
+                f.write(f"Blueprint: Each ore robot costs {ore_cost} ore. Each clay robot costs 2 ore. "
+                        "Each obsidian robot costs 3 ore and 5 clay. Each geode robot costs 2 ore and 4 obsidian.\n")
+        self.addCleanup(os.remove, f.name)
+
+        expected, _ = solve_blueprints(SolverConfig(filename=f.name, time_limit=15), on_event=lambda event: None)
+        results, _ = solve_blueprints(SolverConfig(filename=f.name, time_limit=15, endgame_minutes=4),
+                                      on_event=lambda event: None)
+        self.assertEqual(results, expected)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,99 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import src.jit_kernel  # numba cannot be imported for the first time under a patched print
+from src.blueprint import Blueprint, BlueprintLoader, DefaultBlueprintParser, RobotCost
+from src.engine_selection import CalibrationTable, blueprint_features, choose_engine, resolve_engine
+from src.solver import QualityCalculator, SolverConfig, solve_blueprint, solve_blueprints
+
+
+class TestEngineSelection(unittest.TestCase):
+
+    def setUp(self):
+        self.blueprint = Blueprint({
+            "ore": RobotCost({"ore": 2}),
+            "clay": RobotCost({"ore": 2}),
+            "obsidian": RobotCost({"ore": 3, "clay": 4}),
+            "geode": RobotCost({"ore": 2, "obsidian": 3})
+        })
+        features = blueprint_features(self.blueprint, 14, "geode")
+        self.table = CalibrationTable([
+            {"features": features, "times": {"python": 1.0, "python_capped": 0.4, "batch": 0.6},
+             "peak_seen": 5000},
+            {"features": dict(features, time_limit=32, upper_bound=80),
+             "times": {"python": 9.0, "jit": 0.5}, "peak_seen": 10 ** 7},
+        ])
+
+    def test_fastest_variant_of_nearest_entry(self):
+        """Test that the nearest entry's fastest variant is chosen, with its pruning rule"""
+        with patch('src.engine_selection.available_variants', return_value=["python", "python_capped", "batch"]):
+            choice = choose_engine(self.blueprint, 14, "geode", self.table)
+        self.assertEqual(choice.engine, "python")
+        self.assertTrue(choice.cap_resources)
+        self.assertIn("python_capped", choice.reason)
+
+    def test_unavailable_variants_are_skipped(self):
+        """Test that a variant whose dependency is missing is never chosen"""
+        with patch('src.engine_selection.available_variants', return_value=["python", "python_capped"]):
+            choice = choose_engine(self.blueprint, 32, "geode", self.table)
+        self.assertEqual(choice.engine, "python")
+        self.assertFalse(choice.cap_resources)
+
+    def test_memory_budget_limits_seen_set(self):
+        """Test that an expected seen set above the budget falls back to a bounded python search"""
+        with patch('src.engine_selection.available_variants', return_value=["python", "python_capped", "jit"]):
+            unbounded = choose_engine(self.blueprint, 32, "geode", self.table)
+            bounded = choose_engine(self.blueprint, 32, "geode", self.table, memory_budget=1000)
+        self.assertEqual(unbounded.engine, "jit")
+        self.assertEqual(bounded.engine, "python")
+        self.assertEqual(bounded.seen_limit, 1000)
+
+    def test_rules_without_calibration(self):
+        """Test the fixed rules used without a calibration table"""
+        with patch('src.engine_selection.available_variants', return_value=["python", "python_capped", "jit"]):
+            self.assertEqual(choose_engine(self.blueprint, 14, "geode").engine, "jit")
+        with patch('src.engine_selection.available_variants', return_value=["python", "python_capped"]):
+            choice = choose_engine(self.blueprint, 14, "geode")
+        self.assertEqual(choice.engine, "python")
+        self.assertTrue(choice.cap_resources)
+
+    def test_choice_is_logged(self):
+        """Test that the chosen engine and the reason are logged"""
+        with self.assertLogs('src.engine_selection', level='INFO') as logs:
+            choice = resolve_engine(self.blueprint, 14, "geode", self.table, blueprint_id=3)
+        self.assertIn("Blueprint 3", logs.output[0])
+        self.assertIn(choice.reason, logs.output[0])
+
+    def test_auto_engine_gives_exact_results(self):
+        """Test that solving with engine="auto" matches the python engine"""
+        test_dir = tempfile.mkdtemp()
+        try:
+            calibration_file = os.path.join(test_dir, "calibration.json")
+            self.table.save(calibration_file)
+            blueprint_file = os.path.join(test_dir, "blueprints.txt")
+            with open(blueprint_file, 'w', encoding='utf-8') as f:
+                for ore_cost in (4, 2):
+                    f.write(f"Blueprint: Each ore robot costs {ore_cost} ore. Each clay robot costs 2 ore. "
+                            "Each obsidian robot costs 3 ore and 4 clay. Each geode robot costs 2 ore and 3 obsidian.\n")
+            config = SolverConfig(filename=blueprint_file, time_limit=14, calculator=QualityCalculator(),
+                                  engine="auto", calibration_file=calibration_file, memory_budget=100)
+            with patch('builtins.print'), self.assertLogs('src.engine_selection', level='INFO'):
+                results, _ = solve_blueprints(config)
+                single = solve_blueprint(self.blueprint, 14, engine="auto")
+            expected = [solve_blueprint(blueprint, 14)
+                        for blueprint in BlueprintLoader(DefaultBlueprintParser()).load(blueprint_file)]
+        finally:
+            shutil.rmtree(test_dir)
+
+        self.assertEqual(results, expected)
+        self.assertEqual(single, solve_blueprint(self.blueprint, 14))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
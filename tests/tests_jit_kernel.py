@@ -0,0 +1,137 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from src.blueprint import Blueprint, RobotCost
+from src.cancellation import CancellationToken, SolveCancelled
+from src.optimization_service import OptimizedRobotFactory
+from src.solver import solve_blueprint
+from src.stats import SearchStats
+from src import jit_kernel
+
+
+def _counters(stats: SearchStats) -> dict:
+    counters = stats.to_dict()
+    counters.pop("phase_times", None)
+    return counters
+
+
+class TestJitKernel(unittest.TestCase):
+
+    def setUp(self):
+        self.cheap_blueprint = Blueprint({
+            "ore": RobotCost({"ore": 2}),
+            "clay": RobotCost({"ore": 2}),
+            "obsidian": RobotCost({"ore": 3, "clay": 4}),
+            "geode": RobotCost({"ore": 2, "obsidian": 3})
+        })
+        self.diamond_blueprint = Blueprint({
+            "ore": RobotCost({"ore": 2}),
+            "clay": RobotCost({"ore": 2}),
+            "obsidian": RobotCost({"ore": 2, "clay": 3}),
+            "geode": RobotCost({"ore": 2, "obsidian": 2}),
+            "diamond": RobotCost({"geode": 1, "clay": 2})
+        })
+
+    def _assert_same_as_python(self, blueprint, final_resource, time_limit, lower_bound=0):
+        python_stats, jit_stats = SearchStats(), SearchStats()
+        expected = OptimizedRobotFactory(blueprint, final_resource=final_resource).max_final_resource(
+            time_limit, stats=python_stats, lower_bound=lower_bound)
+        result = jit_kernel.jit_max_final_resource(
+            OptimizedRobotFactory(blueprint, final_resource=final_resource), time_limit,
+            stats=jit_stats, lower_bound=lower_bound)
+        self.assertEqual(result, expected)
+        self.assertIsInstance(result, int)
+        self.assertEqual(_counters(jit_stats), _counters(python_stats))
+
+    @unittest.skipUnless(jit_kernel.JIT_AVAILABLE, "numba is not installed")
+    def test_compiled_kernel_matches_python_engine(self):
+        """Test that the compiled kernel returns the Python engine's result and counters"""
+        for time_limit in (0, 1, 8, 14):
+            self._assert_same_as_python(self.cheap_blueprint, "geode", time_limit)
+        self._assert_same_as_python(self.diamond_blueprint, "diamond", 14)
+        self._assert_same_as_python(self.diamond_blueprint, "clay", 10)
+
+    @unittest.skipUnless(jit_kernel.JIT_AVAILABLE, "numba is not installed")
+    def test_compiled_kernel_with_lower_bound(self):
+        """Test that a seeded incumbent gives the same result as the Python engine"""
+        self._assert_same_as_python(self.cheap_blueprint, "geode", 14, lower_bound=2)
+
+    @unittest.skipUnless(jit_kernel.np is not None, "numpy is not installed")
+    def test_uncompiled_kernel_grows_visited_table(self):
+        """Test the kernel logic in plain Python, starting from a tiny visited table"""
+        factory = OptimizedRobotFactory(self.cheap_blueprint)
+        costs, max_spend = jit_kernel.compile_factory(factory)
+        best, nodes, _, _, _, seen_size = jit_kernel._search_kernel(
+            costs, max_spend, factory.final_index, 10, 0, 4, jit_kernel.np.zeros(1, dtype=jit_kernel.np.uint8))
+        stats = SearchStats()
+        self.assertEqual(best, factory.max_final_resource(10, stats=stats))
+        self.assertEqual(nodes, stats.nodes_expanded)
+        self.assertEqual(seen_size, stats.peak_seen_size)
+
+    def test_falls_back_to_python_engine(self):
+        """Test that the Python engine is used when the JIT is unavailable"""
+        factory = OptimizedRobotFactory(self.cheap_blueprint)
+        progress = []
+        with patch.object(jit_kernel, 'JIT_AVAILABLE', False), \
+                patch.object(factory, 'max_final_resource', wraps=factory.max_final_resource) as mock_search:
+            result = jit_kernel.jit_max_final_resource(factory, 12, on_progress=progress.append)
+        mock_search.assert_called_once()
+        self.assertEqual(result, OptimizedRobotFactory(self.cheap_blueprint).max_final_resource(12))
+        self.assertTrue(progress)
+
+    def test_cancelled_before_start(self):
+        """Test that an already cancelled token stops the solve"""
+        token = CancellationToken()
+        token.cancel()
+        with self.assertRaises(SolveCancelled):
+            jit_kernel.jit_max_final_resource(OptimizedRobotFactory(self.cheap_blueprint), 14, cancel_token=token)
+
+    @unittest.skipUnless(jit_kernel.JIT_AVAILABLE, "numba is not installed")
+    def test_cancelled_while_running(self):
+        """Test that cancelling the token stops a long compiled search"""
+        blueprint = Blueprint({
+            "ore": RobotCost({"ore": 4}),
+            "clay": RobotCost({"ore": 2}),
+            "obsidian": RobotCost({"ore": 3, "clay": 14}),
+            "geode": RobotCost({"ore": 2, "obsidian": 7})
+        })
+        jit_kernel.jit_max_final_resource(OptimizedRobotFactory(blueprint), 5)  # compile outside the timing
+        token = CancellationToken()
+        timer = threading.Timer(0.2, token.cancel)
+        timer.start()
+        started = time.perf_counter()
+        # Takes several seconds uncancelled
+        with self.assertRaises(SolveCancelled):
+            jit_kernel.jit_max_final_resource(OptimizedRobotFactory(blueprint), 32, cancel_token=token)
+        self.assertLess(time.perf_counter() - started, 2)
+        timer.join()
+
+    def test_on_cancel_callbacks(self):
+        """Test that callbacks run once on cancel, unless unregistered"""
+        token = CancellationToken()
+        calls = []
+        token.on_cancel(lambda: calls.append("kept"))
+        token.on_cancel(lambda: calls.append("removed"))()
+        token.cancel()
+        token.cancel()
+        token.on_cancel(lambda: calls.append("late"))
+        self.assertEqual(calls, ["kept", "late"])
+
+    def test_solve_blueprint_engine_option(self):
+        """Test that solve_blueprint gives the same result with either engine"""
+        self.assertEqual(
+            solve_blueprint(self.cheap_blueprint, 14, engine="jit"),
+            solve_blueprint(self.cheap_blueprint, 14, engine="python")
+        )
+        with self.assertRaises(ValueError):
+            solve_blueprint(self.cheap_blueprint, 14, engine="gpu")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
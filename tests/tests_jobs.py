@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import unittest
+from unittest.mock import patch
+
+from src.blueprint import Blueprint, RobotCost
+from src.jobs import JobStatus, JobStore
+from src.solver import ProductCalculator, QualityCalculator
+
+
+def wait_for(predicate, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestJobStore(unittest.TestCase):
+    """Tests for the JobStore worker pool"""
+
+    def setUp(self):
+        self.store = JobStore(max_workers=2)
+        self.blueprint = Blueprint({
+            "ore": RobotCost({"ore": 4}),
+            "clay": RobotCost({"ore": 2}),
+            "obsidian": RobotCost({"ore": 3, "clay": 14}),
+            "geode": RobotCost({"ore": 2, "obsidian": 7})
+        })
+
+    def tearDown(self):
+        self.store.shutdown()
+
+    def test_job_completes_with_results(self):
+        """Test that a submitted job runs to completion and keeps its results"""
+        job = self.store.submit([self.blueprint, self.blueprint], 12, "geode", QualityCalculator())
+
+        self.assertTrue(wait_for(lambda: job.status.finished))
+        self.assertEqual(job.status, JobStatus.DONE)
+        self.assertEqual(job.blueprints_done, 2)
+        self.assertEqual(job.blueprint_ids, [1, 2])
+        self.assertGreater(job.nodes_expanded, 0)
+        self.assertEqual(job.result, 3 * job.final_resource_results[0])
+        self.assertIs(self.store.get(job.id), job)
+
+    def test_cancel_stops_running_search(self):
+        """Test that cancelling a running job stops its search"""
+        job = self.store.submit([self.blueprint], 40, "geode", ProductCalculator())
+
+        self.assertTrue(wait_for(lambda: job.nodes_expanded > 0))
+        self.store.cancel(job.id)
+
+        self.assertTrue(wait_for(lambda: job.status.finished, timeout=5))
+        self.assertEqual(job.status, JobStatus.CANCELLED)
+        self.assertIsNone(job.result)
+
+    @patch('src.jobs.solve_blueprint')
+    def test_failed_job_reports_error(self, mock_solve):
+        """Test that a solver error marks the job as failed"""
+        mock_solve.side_effect = ValueError("boom")
+        job = self.store.submit([self.blueprint], 12, "geode", QualityCalculator())
+
+        self.assertTrue(wait_for(lambda: job.status.finished))
+        self.assertEqual(job.status, JobStatus.FAILED)
+        self.assertEqual(job.error, "boom")
+
+    def test_unknown_job(self):
+        """Test lookups of unknown job ids"""
+        self.assertIsNone(self.store.get("missing"))
+        self.assertIsNone(self.store.cancel("missing"))
+
+    def test_finished_jobs_are_evicted_beyond_limit(self):
+        """Test that only max_finished finished jobs are retained"""
+        self.store.max_finished = 1
+        first = self.store.submit([self.blueprint], 5, "geode", QualityCalculator())
+        self.assertTrue(wait_for(lambda: first.status.finished))
+        second = self.store.submit([self.blueprint], 5, "geode", QualityCalculator())
+        self.assertTrue(wait_for(lambda: second.status.finished))
+        self.store.submit([self.blueprint], 5, "geode", QualityCalculator())
+
+        self.assertIsNone(self.store.get(first.id))
+        self.assertIs(self.store.get(second.id), second)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
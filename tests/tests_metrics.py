@@ -0,0 +1,124 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import unittest
+
+from src.metrics import MetricsRegistry
+from src.result_cache import ResultCache
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def _samples(self):
+        samples = {}
+        for line in self.registry.render().splitlines():
+            if not line.startswith("#"):
+                name, value = line.rsplit(" ", 1)
+                samples[name] = value
+        return samples
+
+    def test_counter_and_gauge(self):
+        """Test the text format of counters and gauges, with and without labels"""
+        counter = self.registry.counter("solves_total", "Solves", ("engine",))
+        gauge = self.registry.gauge("busy", "Busy workers")
+        counter.labels("python").inc()
+        counter.labels("python").inc(2)
+        counter.labels("jit").inc()
+        gauge.inc(3)
+        gauge.dec()
+
+        text = self.registry.render()
+        self.assertIn("# HELP solves_total Solves\n# TYPE solves_total counter\n", text)
+        self.assertIn("# TYPE busy gauge\n", text)
+        self.assertEqual(self._samples(), {
+            'solves_total{engine="jit"}': "1",
+            'solves_total{engine="python"}': "3",
+            "busy": "2",
+        })
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that buckets count observations up to their bound, plus sum and count"""
+        histogram = self.registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+
+        self.assertEqual(self._samples(), {
+            'latency_seconds_bucket{le="0.1"}': "2",
+            'latency_seconds_bucket{le="1"}': "3",
+            'latency_seconds_bucket{le="+Inf"}': "4",
+            "latency_seconds_sum": "3.65",
+            "latency_seconds_count": "4",
+        })
+
+    def test_function_values(self):
+        """Test that function-backed metrics are read at scrape time"""
+        depth = [0]
+        self.registry.gauge("queue_depth", "Queue depth").set_function(lambda: depth[0])
+        depth[0] = 7
+        self.assertEqual(self._samples()["queue_depth"], "7")
+
+    def test_concurrent_recording(self):
+        """Test that per-thread shards add up to every recorded value"""
+        counter = self.registry.counter("events_total", "Events")
+        histogram = self.registry.histogram("sizes", "Sizes", buckets=(10,))
+
+        def record():
+            for i in range(10000):
+                counter.inc()
+                histogram.observe(i % 20)
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        samples = self._samples()
+        self.assertEqual(samples["events_total"], "40000")
+        self.assertEqual(samples['sizes_bucket{le="10"}'], "22000")
+        self.assertEqual(samples["sizes_count"], "40000")
+
+    def test_invalid_registrations(self):
+        """Test that duplicate names and wrong label counts are rejected"""
+        counter = self.registry.counter("a_total", "A", ("kind",))
+        with self.assertRaises(ValueError):
+            self.registry.gauge("a_total", "Again")
+        with self.assertRaises(ValueError):
+            counter.labels("x", "y")
+
+    def test_label_values_are_escaped(self):
+        """Test that quotes and backslashes in label values are escaped"""
+        self.registry.counter("paths_total", "Paths", ("path",)).labels('a"b\\c').inc()
+        self.assertIn('paths_total{path="a\\"b\\\\c"} 1', self.registry.render())
+
+
+class TestResultCache(unittest.TestCase):
+
+    def test_lru_eviction_and_counts(self):
+        """Test that the least recently used entry is evicted and lookups are counted"""
+        cache = ResultCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_disabled_cache(self):
+        """Test that a cache of size 0 stores nothing"""
+        cache = ResultCache(max_entries=0)
+        cache.put("a", 1)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,112 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.blueprint import Blueprint, RobotCost
+from src.opening_book import OpeningBook, expand_opening
+from src.optimization_service import OptimizedRobotFactory
+from src.solver import SolverConfig, solve_blueprint, solve_blueprints
+
+
+def _blueprint(ore=4, clay=2, obsidian=(3, 14), geode=(2, 7)):
+    return Blueprint({
+        "ore": RobotCost({"ore": ore}),
+        "clay": RobotCost({"ore": clay}),
+        "obsidian": RobotCost({"ore": obsidian[0], "clay": obsidian[1]}),
+        "geode": RobotCost({"ore": geode[0], "obsidian": geode[1]}),
+    })
+
+
+class TestOpeningBook(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_search_from_frontier_keeps_optimum(self):
+        """Test that searching from the opening frontier finds the same optimum"""
+        for blueprint in (_blueprint(ore=2, clay=2, obsidian=(2, 4), geode=(2, 3)),
+                          _blueprint(ore=3, clay=2, obsidian=(3, 5), geode=(2, 4))):
+            factory = OptimizedRobotFactory(blueprint)
+            for minutes in (3, 6, 9):
+                opening = expand_opening(factory, minutes)
+                start_states = [(minutes, resources, robots) for resources, robots in opening.frontier]
+                self.assertEqual(factory.max_final_resource(16, start_states=start_states),
+                                 factory.max_final_resource(16))
+
+    def test_frontier_is_deduplicated(self):
+        """Test that the frontier holds each state once"""
+        opening = expand_opening(OptimizedRobotFactory(_blueprint()), 8)
+        self.assertEqual(len(opening.frontier), len(set(opening.frontier)))
+        self.assertGreater(len(opening.frontier), 1)
+
+    def test_blueprints_with_same_early_costs_share_the_opening(self):
+        """Test that late-game costs the opening never reaches do not matter"""
+        book = OpeningBook(minutes=6)
+        first = book.opening(OptimizedRobotFactory(_blueprint()))
+        self.assertIs(book.opening(OptimizedRobotFactory(_blueprint(obsidian=(3, 9), geode=(3, 12)))), first)
+        self.assertEqual((book.hits, book.misses), (1, 1))
+
+    def test_different_early_costs_get_their_own_opening(self):
+        """Test that the opening is not reused when an early decision may change"""
+        book = OpeningBook(self.test_dir, minutes=6)
+        book.opening(OptimizedRobotFactory(_blueprint()))
+        for blueprint in (_blueprint(clay=3), _blueprint(ore=3), _blueprint(obsidian=(3, 2))):
+            self.assertIsNone(book.lookup(OptimizedRobotFactory(blueprint)))
+        # Nor is an opening of another length
+        self.assertIsNone(OpeningBook(self.test_dir, minutes=5).lookup(OptimizedRobotFactory(_blueprint())))
+
+    def test_reused_opening_keeps_optimum(self):
+        """Test that a blueprint solved with another blueprint's opening keeps its optimum"""
+        book = OpeningBook(minutes=8)
+        blueprints = [_blueprint(obsidian=(3, 4), geode=(2, 6)), _blueprint(obsidian=(3, 4), geode=(3, 9))]
+        results = [solve_blueprint(blueprint, 17, opening_book=book) for blueprint in blueprints]
+        self.assertEqual(book.hits, 1)
+        self.assertEqual(results, [solve_blueprint(blueprint, 17) for blueprint in blueprints])
+
+    def test_book_persists_across_runs(self):
+        """Test that openings are reloaded from the directory, skipping torn and outdated lines"""
+        factory = OptimizedRobotFactory(_blueprint())
+        expected = OpeningBook(self.test_dir, minutes=6).opening(factory)
+
+        path = os.path.join(self.test_dir, OpeningBook.FILENAME)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"version": 0, "opening": expected.to_dict()}) + "\n")
+            f.write('{"version": 1, "open')
+
+        reloaded = OpeningBook(self.test_dir, minutes=6)
+        self.assertEqual(len(reloaded), 1)
+        with patch('src.opening_book.expand_opening') as mock_expand:
+            self.assertEqual(reloaded.opening(factory), expected)
+        mock_expand.assert_not_called()
+
+        reloaded.opening(OptimizedRobotFactory(_blueprint(clay=3)))
+        self.assertEqual(len(OpeningBook(self.test_dir, minutes=6)), 2)
+
+    def test_solve_blueprints_with_opening_book(self):
+        """Test that a run sharing an opening book gives the usual results"""
+        blueprint_file = os.path.join(self.test_dir, "blueprints.txt")
+        with open(blueprint_file, 'w', encoding='utf-8') as f:
+            for geode_cost in (6, 8, 9):
+                f.write("Blueprint: Each ore robot costs 4 ore. Each clay robot costs 2 ore. Each obsidian robot "
+                        f"costs 3 ore and 4 clay. Each geode robot costs 2 ore and {geode_cost} obsidian.\n")
+        book_dir = os.path.join(self.test_dir, "book")
+
+        expected, _ = solve_blueprints(SolverConfig(filename=blueprint_file, time_limit=16),
+                                       on_event=lambda event: None)
+        results, _ = solve_blueprints(SolverConfig(filename=blueprint_file, time_limit=16, opening_book=book_dir),
+                                      on_event=lambda event: None)
+        self.assertEqual(results, expected)
+        self.assertEqual(len(OpeningBook(book_dir)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
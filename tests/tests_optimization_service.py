@@ -4,7 +4,9 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import unittest
 from src.blueprint import Blueprint, RobotCost
-from src.optimization_service import OptimizedRobotFactory
+from src.cancellation import CancellationToken, SolveCancelled
+from src.optimization_service import CHECK_INTERVAL, OptimizedRobotFactory
+from src.stats import SearchStats
 
 
 class TestOptimizedRobotFactory(unittest.TestCase):
@@ -73,6 +75,140 @@ class TestOptimizedRobotFactory(unittest.TestCase):
         self.assertLess(time.time() - start, 5)
         self.assertIsInstance(result, int)
 
+    def test_progress_reports_expanded_nodes(self):
+        factory = OptimizedRobotFactory(self.simple_blueprint)
+        reported = []
+        factory.max_final_resource(16, on_progress=reported.append)
+        self.assertGreater(reported[-1], CHECK_INTERVAL)
+        self.assertEqual(reported, sorted(reported))
+
+    def test_search_stats(self):
+        factory = OptimizedRobotFactory(self.simple_blueprint)
+        stats = SearchStats()
+        result = factory.max_final_resource(14, stats=stats)
+        self.assertEqual(result, factory.max_final_resource(14))
+        self.assertGreater(stats.nodes_expanded, 0)
+        self.assertGreater(stats.pruned_by_bound + stats.pruned_by_seen, 0)
+        self.assertEqual(stats.peak_seen_size, stats.nodes_expanded)
+        self.assertGreater(stats.max_stack_depth, 1)
+        self.assertEqual(set(stats.phase_times), {"setup", "search"})
+
+    def test_lower_bound_seeds_the_search(self):
+        factory = OptimizedRobotFactory(Blueprint({
+            "ore": RobotCost({"ore": 2}),
+            "clay": RobotCost({"ore": 2}),
+            "obsidian": RobotCost({"ore": 3, "clay": 4}),
+            "geode": RobotCost({"ore": 2, "obsidian": 3})
+        }))
+        expected = factory.max_final_resource(14)
+        self.assertGreater(expected, 0)
+        plain, seeded = SearchStats(), SearchStats()
+        factory.max_final_resource(14, stats=plain)
+        self.assertEqual(factory.max_final_resource(14, stats=seeded, lower_bound=expected), expected)
+        self.assertLess(seeded.nodes_expanded, plain.nodes_expanded)
+
+    def test_upper_bound_dominates_optimum(self):
+        for blueprint in (self.simple_blueprint, self.complex_blueprint):
+            factory = OptimizedRobotFactory(blueprint)
+            for time_limit in (0, 8, 14):
+                self.assertGreaterEqual(factory.upper_bound(time_limit), factory.max_final_resource(time_limit))
+        self.assertEqual(OptimizedRobotFactory(self.simple_blueprint).upper_bound(5), 0)
+
+    def test_can_reach_matches_optimum(self):
+        factory = OptimizedRobotFactory(Blueprint({
+            "ore": RobotCost({"ore": 2}),
+            "clay": RobotCost({"ore": 2}),
+            "obsidian": RobotCost({"ore": 3, "clay": 4}),
+            "geode": RobotCost({"ore": 2, "obsidian": 3})
+        }))
+        optimum = factory.max_final_resource(14)
+        self.assertTrue(factory.can_reach(0, 14))
+        self.assertTrue(factory.can_reach(optimum, 14))
+        self.assertFalse(factory.can_reach(optimum + 1, 14))
+
+    def test_can_reach_stops_at_first_witness(self):
+        factory = OptimizedRobotFactory(self.simple_blueprint)
+        witness, exhaustive = SearchStats(), SearchStats()
+        factory.can_reach(1, 20, stats=witness)
+        factory.max_final_resource(20, stats=exhaustive)
+        self.assertLess(witness.nodes_expanded, exhaustive.nodes_expanded)
+
+    def test_max_by_decision_equals_max(self):
+        for blueprint in (self.simple_blueprint, self.complex_blueprint):
+            factory = OptimizedRobotFactory(blueprint)
+            for time_limit in (0, 10, 18):
+                self.assertEqual(factory.max_final_resource_by_decision(time_limit),
+                                 factory.max_final_resource(time_limit))
+
+    def test_plan_replays_to_optimum(self):
+        cheap_blueprint = Blueprint({
+            "ore": RobotCost({"ore": 2}),
+            "clay": RobotCost({"ore": 2}),
+            "obsidian": RobotCost({"ore": 3, "clay": 4}),
+            "geode": RobotCost({"ore": 2, "obsidian": 3})
+        })
+        for final_resource, time_limit in (("geode", 14), ("obsidian", 12)):
+            factory = OptimizedRobotFactory(cheap_blueprint, final_resource=final_resource)
+            plan = []
+            result = factory.max_final_resource(time_limit, plan=plan)
+            self.assertGreater(result, 0)
+            self.assertEqual(factory.replay_plan(plan, time_limit), result)
+            self.assertEqual([minute for minute, _ in plan], sorted({minute for minute, _ in plan}))
+
+    def test_plan_of_zero_result_is_empty(self):
+        plan = [(1, "ore")]
+        self.assertEqual(OptimizedRobotFactory(self.simple_blueprint).max_final_resource(5, plan=plan), 0)
+        self.assertEqual(plan, [])
+
+    def test_plan_needs_unseeded_search(self):
+        with self.assertRaises(ValueError):
+            OptimizedRobotFactory(self.simple_blueprint).max_final_resource(10, lower_bound=1, plan=[])
+
+    def test_replay_rejects_unaffordable_robot(self):
+        with self.assertRaises(ValueError):
+            OptimizedRobotFactory(self.simple_blueprint).replay_plan([(1, "geode")], 10)
+
+    def test_capping_and_seen_limit_keep_optimum(self):
+        factory = OptimizedRobotFactory(self.simple_blueprint)
+        plain, capped = SearchStats(), SearchStats()
+        expected = factory.max_final_resource(16, stats=plain)
+        self.assertEqual(factory.max_final_resource(16, stats=capped, cap_resources=True), expected)
+        self.assertLess(capped.nodes_expanded, plain.nodes_expanded)
+        limited = SearchStats()
+        self.assertEqual(factory.max_final_resource(16, stats=limited, seen_limit=1000), expected)
+        self.assertEqual(limited.peak_seen_size, 1000)
+
+    def test_cancelled_search_raises(self):
+        factory = OptimizedRobotFactory(self.simple_blueprint)
+        token = CancellationToken()
+        token.cancel()
+        with self.assertRaises(SolveCancelled):
+            factory.max_final_resource(16, cancel_token=token)
+
+    def test_max_final_resources_matches_separate_searches(self):
+        cheap_diamonds = Blueprint({
+            "ore": RobotCost({"ore": 2}),
+            "clay": RobotCost({"ore": 2}),
+            "obsidian": RobotCost({"ore": 2, "clay": 3}),
+            "geode": RobotCost({"ore": 2, "obsidian": 2}),
+            "diamond": RobotCost({"geode": 1, "obsidian": 2})
+        })
+        stats = SearchStats()
+        results = OptimizedRobotFactory(cheap_diamonds).max_final_resources(
+            ["geode", "diamond", "obsidian"], 15, stats=stats)
+        expected = {resource: OptimizedRobotFactory(cheap_diamonds, final_resource=resource).max_final_resource(15)
+                    for resource in ("geode", "diamond", "obsidian")}
+        self.assertEqual(results, expected)
+        self.assertGreater(results["diamond"], 0)
+        self.assertGreater(stats.nodes_expanded, 0)
+
+        single = OptimizedRobotFactory(self.simple_blueprint).max_final_resources(["geode"], 16)
+        self.assertEqual(single, {"geode": OptimizedRobotFactory(self.simple_blueprint).max_final_resource(16)})
+
+    def test_max_final_resources_needs_a_resource(self):
+        with self.assertRaises(ValueError):
+            OptimizedRobotFactory(self.simple_blueprint).max_final_resources([], 10)
+
 
 class TestOptimizedRobotFactoryIntegration(unittest.TestCase):
 
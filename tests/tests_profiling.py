@@ -0,0 +1,81 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pstats
+import shutil
+import tempfile
+import unittest
+
+from src.profiling import BlueprintProfiler, ProfileConfig, profile_paths
+from src.solver import SolverConfig, solve_blueprints
+
+
+class TestBlueprintProfiler(unittest.TestCase):
+    """Tests for the per-blueprint profiling hooks"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.output_file = os.path.join(self.test_dir, "analysis.txt")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_profile_paths_next_to_output(self):
+        """Test that profile files are named after the analysis output"""
+        prof_path, alloc_path = profile_paths(self.output_file, 3)
+        self.assertEqual(prof_path, os.path.join(self.test_dir, "analysis_blueprint3.prof"))
+        self.assertEqual(alloc_path, os.path.join(self.test_dir, "analysis_blueprint3_alloc.txt"))
+
+    def test_every_nth_blueprint(self):
+        """Test the every-Nth sampling"""
+        profiler = BlueprintProfiler(ProfileConfig(every=2), self.output_file)
+        self.assertEqual([profiler.should_profile(i) for i in range(1, 6)], [True, False, True, False, True])
+
+    def test_cprofile_and_tracemalloc_dumps(self):
+        """Test that both profilers write their reports"""
+        profiler = BlueprintProfiler(ProfileConfig(tracemalloc=True, top_allocations=3), self.output_file)
+        result = profiler.run(1, lambda: sum(range(1000)))
+
+        self.assertEqual(result, 499500)
+        prof_path, alloc_path = profile_paths(self.output_file, 1)
+        self.assertGreater(pstats.Stats(prof_path).total_calls, 0)
+        with open(alloc_path, encoding='utf-8') as f:
+            self.assertTrue(f.readline().startswith("Peak traced memory:"))
+
+    def test_threshold_skips_fast_blueprints(self):
+        """Test that blueprints under the threshold are not profiled"""
+        calls = []
+        profiler = BlueprintProfiler(ProfileConfig(threshold=60.0), self.output_file)
+        profiler.run(1, lambda: calls.append(1))
+
+        self.assertEqual(calls, [1])
+        self.assertFalse(os.path.exists(profile_paths(self.output_file, 1)[0]))
+
+    def test_threshold_reprofiles_slow_blueprints(self):
+        """Test that blueprints over the threshold are re-solved under the profiler"""
+        calls = []
+        profiler = BlueprintProfiler(ProfileConfig(threshold=0.0), self.output_file)
+        profiler.run(1, lambda: calls.append(1))
+
+        self.assertEqual(calls, [1, 1])
+        self.assertTrue(os.path.exists(profile_paths(self.output_file, 1)[0]))
+
+    def test_solve_blueprints_with_profile(self):
+        """Test that SolverConfig.profile dumps one profile per sampled blueprint"""
+        blueprint_file = os.path.join(self.test_dir, "blueprints.txt")
+        with open(blueprint_file, 'w', encoding='utf-8') as f:
+            line = ("Blueprint {}: Each ore robot costs 4 ore. Each clay robot costs 2 ore. "
+                    "Each obsidian robot costs 3 ore and 14 clay. Each geode robot costs 2 ore and 7 obsidian.\n")
+            f.write(line.format(1) + line.format(2))
+
+        config = SolverConfig(filename=blueprint_file, time_limit=8, output_file=self.output_file,
+                              profile=ProfileConfig(every=2))
+        solve_blueprints(config)
+
+        self.assertTrue(os.path.exists(profile_paths(self.output_file, 1)[0]))
+        self.assertFalse(os.path.exists(profile_paths(self.output_file, 2)[0]))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
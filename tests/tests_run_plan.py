@@ -0,0 +1,100 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src import solver
+from src.run_plan import plan_chains, run_plan
+from src.solver import ProductCalculator, QualityCalculator, SolverConfig, calculate_and_write_analysis
+
+
+class TestRunPlan(unittest.TestCase):
+    """Tests for multi-config run plans"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.blueprint_file = os.path.join(self.test_dir, "blueprints.txt")
+        with open(self.blueprint_file, 'w', encoding='utf-8') as f:
+            for ore_cost in (4, 2, 4):
+                f.write(f"Blueprint: Each ore robot costs {ore_cost} ore. Each clay robot costs 2 ore. "
+                        "Each obsidian robot costs 3 ore and 4 clay. Each geode robot costs 2 ore and 3 obsidian.\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _configs(self):
+        return [
+            SolverConfig(filename=self.blueprint_file, time_limit=10, calculator=QualityCalculator(),
+                         output_file=os.path.join(self.test_dir, "part1.txt")),
+            SolverConfig(filename=self.blueprint_file, time_limit=13, calculator=ProductCalculator(),
+                         max_blueprints=2, output_file=os.path.join(self.test_dir, "part2.txt")),
+        ]
+
+    def test_plan_groups_by_blueprint_and_resource(self):
+        """Test that files are parsed once and duplicate solves are merged"""
+        with patch('src.run_plan.BlueprintLoader') as mock_loader_class:
+            from src.blueprint import BlueprintLoader, DefaultBlueprintParser
+            blueprints = BlueprintLoader(DefaultBlueprintParser()).load(self.blueprint_file)
+            mock_loader_class.return_value.load.return_value = blueprints
+            _, chains = plan_chains(self._configs())
+
+        mock_loader_class.return_value.load.assert_called_once_with(self.blueprint_file)
+        # Blueprints 1 and 3 are identical
+        self.assertEqual(len(chains), 2)
+        self.assertEqual(sorted(chain.time_limits for chain in chains.values()), [[10, 13], [10, 13]])
+
+    def test_run_plan_matches_separate_runs(self):
+        """Test that plan results and analysis files match independent runs"""
+        expected = []
+        expected_files = []
+        for config in self._configs():
+            with patch('builtins.print'):
+                expected.append(calculate_and_write_analysis(config))
+            with open(config.output_file, encoding='utf-8') as f:
+                expected_files.append(f.read())
+
+        configs = self._configs()
+        with patch('src.run_plan.solve_blueprint', wraps=solver.solve_blueprint) as mock_solve:
+            results = run_plan(configs)
+
+        self.assertEqual(results, expected)
+        # 2 distinct blueprints x 2 horizons
+        self.assertEqual(mock_solve.call_count, 4)
+        for config, expected_file in zip(configs, expected_files):
+            with open(config.output_file, encoding='utf-8') as f:
+                self.assertEqual(f.read(), expected_file)
+
+    def test_run_plan_applies_every_option(self):
+        """Test that a config with options the chains do not apply gets them from its own run"""
+        configs = self._configs()
+        configs[1].include_plans = True
+        configs[1].endgame_minutes = 3
+        expected = []
+        for config in self._configs()[:1] + configs[1:]:
+            with patch('builtins.print'):
+                expected.append(calculate_and_write_analysis(config))
+        with open(configs[1].output_file, encoding='utf-8') as f:
+            expected_file = f.read()
+
+        with patch('src.run_plan.calculate_and_write_analysis', wraps=calculate_and_write_analysis) as mock_run, \
+                patch('builtins.print'):
+            results = run_plan(configs)
+
+        self.assertEqual(results, expected)
+        mock_run.assert_called_once_with(configs[1])
+        with open(configs[1].output_file, encoding='utf-8') as f:
+            content = f.read()
+        self.assertEqual(content, expected_file)
+        self.assertIn("\nBuild plans:\n", content)
+
+    def test_run_plan_with_worker_pool(self):
+        """Test the plan scheduled across worker processes"""
+        self.assertEqual(run_plan(self._configs(), max_workers=2), run_plan(self._configs()))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
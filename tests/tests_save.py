@@ -8,7 +8,8 @@ from typing import List
 import tempfile
 
 
-from src.save import _write_analysis_file
+from src.save import AnalysisCheckpoint, _write_analysis_file
+from src.stats import SearchStats, SolveStats
 
 class TestWriteAnalysisFile(unittest.TestCase):
     """Tests for the _write_analysis_file function"""
@@ -240,6 +241,126 @@ class TestWriteAnalysisFileIntegration(unittest.TestCase):
         
         self.assertEqual(content, expected_content)
 
+    def test_real_file_writing_with_stats(self):
+        """Integration test with the optional search statistics section"""
+        test_file = os.path.join(self.test_dir, "stats_test.txt")
+        stats = SolveStats({
+            1: SearchStats(nodes_expanded=10, pruned_by_bound=4, pruned_by_seen=2,
+                           max_stack_depth=7, peak_seen_size=10, phase_times={"search": 0.5}),
+            2: SearchStats(nodes_expanded=20, pruned_by_bound=6, pruned_by_seen=1,
+                           max_stack_depth=9, peak_seen_size=20, phase_times={"search": 0.25}),
+        })
+
+        _write_analysis_file(test_file, [1, 2], [3, 1], stats=stats)
+
+        with open(test_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        expected_content = (
+            "Blueprint 1: 3\n"
+            "Blueprint 2: 2\n"
+            "\nBest blueprint is the blueprint 1.\n"
+            "\nSearch statistics:\n"
+            "Blueprint 1: 10 nodes, 4 pruned by bound, 2 pruned by seen, max depth 7, peak seen 10, 0.500s\n"
+            "Blueprint 2: 20 nodes, 6 pruned by bound, 1 pruned by seen, max depth 9, peak seen 20, 0.250s\n"
+            "Total: 30 nodes, 10 pruned by bound, 3 pruned by seen, max depth 9, peak seen 20, 0.750s\n"
+        )
+        self.assertEqual(content, expected_content)
+
+    def test_real_file_writing_with_plans(self):
+        """Integration test with the optional build plans section"""
+        test_file = os.path.join(self.test_dir, "plans_test.txt")
+
+        _write_analysis_file(test_file, [1, 2], [1, 0], plans={1: [(3, "clay"), (5, "geode")], 2: []})
+
+        with open(test_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        expected_content = (
+            "Blueprint 1: 1\n"
+            "Blueprint 2: 0\n"
+            "\nBest blueprint is the blueprint 1.\n"
+            "\nBuild plans:\n"
+            "Blueprint 1: minute 3 clay, minute 5 geode\n"
+            "Blueprint 2: no robot needed\n"
+        )
+        self.assertEqual(content, expected_content)
+
+
+class TestAnalysisCheckpoint(unittest.TestCase):
+    """Tests for the append-only analysis checkpoint"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "analysis.txt.partial")
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.test_dir)
+
+    def test_records_survive_reopen(self):
+        """Test that recorded blueprints are found again on resume"""
+        checkpoint = AnalysisCheckpoint(self.path, 24, "geode")
+        checkpoint.open()
+        checkpoint.record(1, "abc", 9)
+        checkpoint.close()
+
+        resumed = AnalysisCheckpoint(self.path, 24, "geode")
+        resumed.open(resume=True)
+        self.assertEqual(resumed.lookup(1, "abc"), 9)
+        self.assertIsNone(resumed.lookup(1, "other"))
+        self.assertIsNone(resumed.lookup(2, "abc"))
+        resumed.discard()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_plans_survive_reopen(self):
+        """Test that the build plan recorded with a result is restored with it"""
+        checkpoint = AnalysisCheckpoint(self.path, 24, "geode")
+        checkpoint.open()
+        checkpoint.record(1, "abc", 9)
+        checkpoint.record(2, "def", 4, [(3, "clay"), (7, "obsidian")])
+        checkpoint.close()
+
+        for _ in range(2):  # the second reopen reads the records rewritten by the first
+            resumed = AnalysisCheckpoint(self.path, 24, "geode")
+            resumed.open(resume=True)
+            self.assertEqual(resumed.lookup(2, "def"), 4)
+            self.assertEqual(resumed.lookup_plan(2, "def"), [(3, "clay"), (7, "obsidian")])
+            self.assertIsNone(resumed.lookup_plan(2, "other"))
+            self.assertIsNone(resumed.lookup_plan(1, "abc"))
+            resumed.close()
+
+    def test_different_parameters_start_over(self):
+        """Test that records of another horizon are not reused"""
+        checkpoint = AnalysisCheckpoint(self.path, 24, "geode")
+        checkpoint.open()
+        checkpoint.record(1, "abc", 9)
+        checkpoint.close()
+
+        resumed = AnalysisCheckpoint(self.path, 32, "geode")
+        resumed.open(resume=True)
+        self.assertIsNone(resumed.lookup(1, "abc"))
+        resumed.close()
+
+    def test_torn_last_record_is_ignored(self):
+        """Test that a partially written record does not break the resume"""
+        checkpoint = AnalysisCheckpoint(self.path, 24, "geode")
+        checkpoint.open()
+        checkpoint.record(1, "abc", 9)
+        checkpoint.close()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"id": 2, "finger')
+
+        resumed = AnalysisCheckpoint(self.path, 24, "geode")
+        resumed.open(resume=True)
+        resumed.record(2, "def", 4)
+        resumed.close()
+
+        with open(self.path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn('"id": 2', lines[2])
+
 
 if __name__ == '__main__':
     # Run tests with higher verbosity
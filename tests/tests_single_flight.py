@@ -0,0 +1,89 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Tests for the SingleFlight deduplicator"""
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.flights = SingleFlight()
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+
+    def test_identical_keys_share_one_call(self):
+        """Test that concurrent submissions with the same key run once"""
+        release = threading.Event()
+        calls = []
+
+        def work(value):
+            calls.append(value)
+            release.wait(5)
+            return value * 2
+
+        first = self.flights.submit(self.executor, "key", work, 21)
+        second = self.flights.submit(self.executor, "key", work, 21)
+        self.assertIs(first, second)
+        self.assertEqual(self.flights.in_flight(), 1)
+
+        release.set()
+        self.assertEqual(first.result(5), 42)
+        self.assertEqual(calls, [21])
+
+    def test_completed_call_is_forgotten(self):
+        """Test that a new call is made once the previous one finished"""
+        first = self.flights.submit(self.executor, "key", lambda: 1)
+        self.assertEqual(first.result(5), 1)
+        second = self.flights.submit(self.executor, "key", lambda: 2)
+        self.assertEqual(second.result(5), 2)
+        self.assertEqual(self.flights.in_flight(), 0)
+
+    def test_distinct_keys_run_separately(self):
+        """Test that different keys do not share futures"""
+        first = self.flights.submit(self.executor, "a", lambda: "a")
+        second = self.flights.submit(self.executor, "b", lambda: "b")
+        self.assertEqual((first.result(5), second.result(5)), ("a", "b"))
+
+    def test_last_release_cancels_running_flight(self):
+        """Test that a flight is cancelled only once every caller released it"""
+        started = threading.Event()
+
+        def work(cancel_token):
+            started.set()
+            while not cancel_token.cancelled:
+                threading.Event().wait(0.01)
+            return "cancelled"
+
+        first = self.flights.submit(self.executor, "key", work, with_token=True)
+        second = self.flights.submit(self.executor, "key", work, with_token=True)
+        self.assertTrue(started.wait(5))
+
+        self.flights.release("key", first)
+        self.assertFalse(first.done())
+        self.flights.release("key", second)
+        self.assertEqual(first.result(5), "cancelled")
+        self.assertEqual(self.flights.in_flight(), 0)
+
+    def test_stale_release_is_ignored(self):
+        """Test that releasing a finished future does not touch a newer flight"""
+        release = threading.Event()
+        old = self.flights.submit(self.executor, "key", lambda: 1)
+        old.result(5)
+        new = self.flights.submit(self.executor, "key", release.wait, 5)
+
+        self.flights.release("key", old)
+        self.assertEqual(self.flights.in_flight(), 1)
+        release.set()
+        self.assertTrue(new.result(5))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
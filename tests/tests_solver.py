@@ -14,8 +14,15 @@ from src.solver import (
     ProductCalculator, 
     SolverConfig, 
     solve_blueprints, 
-    calculate_and_write_analysis
+    calculate_and_write_analysis,
+    rank_blueprints,
+    solve_blueprint
 )
+from src.blueprint import Blueprint, BlueprintLoader, DefaultBlueprintParser, RobotCost
+from src.optimization_service import OptimizedRobotFactory
+from src.stats import SearchStats, SolveStats
+from src.cancellation import CancellationToken, SolveCancelled
+from src.events import BlueprintFinished, BlueprintStarted, EtaEstimator
 
 
 class TestResultCalculators(unittest.TestCase):
@@ -47,6 +54,13 @@ class TestResultCalculators(unittest.TestCase):
         result = self.product_calculator.calculate(self.final_resources, self.blueprint_ids)
         self.assertEqual(result, expected_result)
         
+    def test_product_calculator_zero_factor(self):
+        """Test that a zero factor short-circuits the product"""
+        self.assertEqual(self.product_calculator.calculate([3, 0, 5], [1, 2, 3]), 0)
+        self.assertEqual(self.product_calculator.proven_result([4, 0], [1, 2]), 0)
+        self.assertIsNone(self.product_calculator.proven_result([4, 1], [1, 2]))
+        self.assertIsNone(self.quality_calculator.proven_result([0, 0], [1, 2]))
+
     def test_product_calculator_empty_list(self):
         """Test ProductCalculator with empty list"""
         result = self.product_calculator.calculate([], [1, 2, 3])
@@ -84,6 +98,64 @@ class TestSolveBlueprints(unittest.TestCase):
         # Verify factory was created with correct final_resource
         mock_factory_class.assert_called_once_with(self.mock_blueprint1, final_resource="obsidian")
 
+    @patch('src.solver.BlueprintLoader')
+    @patch('src.solver.OptimizedRobotFactory')
+    def test_solve_blueprints_collects_stats(self, mock_factory_class, mock_loader_class):
+        """Test that solve_blueprints records one SearchStats per blueprint"""
+        mock_loader = Mock()
+        mock_loader.load.return_value = self.mock_blueprints
+        mock_loader_class.return_value = mock_loader
+        mock_factory_class.return_value.max_final_resource.return_value = 2
+
+        stats = SolveStats()
+        solve_blueprints(SolverConfig(filename="test.txt"), stats=stats)
+
+        self.assertEqual(list(stats.blueprints), [1, 2, 3])
+        for blueprint_stats in stats.blueprints.values():
+            self.assertIsInstance(blueprint_stats, SearchStats)
+        passed_stats = [call.kwargs["stats"] for call in mock_factory_class.return_value.max_final_resource.call_args_list]
+        self.assertEqual(passed_stats, list(stats.blueprints.values()))
+
+
+    @patch('src.solver.BlueprintLoader')
+    @patch('src.solver.OptimizedRobotFactory')
+    def test_solve_blueprints_emits_events(self, mock_factory_class, mock_loader_class):
+        """Test that started/finished events are reported for every blueprint"""
+        mock_loader = Mock()
+        mock_loader.load.return_value = [self.mock_blueprint1, self.mock_blueprint2]
+        mock_loader_class.return_value = mock_loader
+        mock_factory_class.return_value.max_final_resource.return_value = 4
+
+        events = []
+        solve_blueprints(SolverConfig(filename="test.txt"), on_event=events.append)
+
+        self.assertEqual([type(event) for event in events],
+                         [BlueprintStarted, BlueprintFinished, BlueprintStarted, BlueprintFinished])
+        self.assertEqual(events[1].final_resource_count, 4)
+        self.assertEqual(events[0].total, 2)
+        self.assertEqual(events[3].eta, 0.0)
+
+    def test_solve_blueprints_cancellation(self):
+        """Test that a cancelled token stops solve_blueprints"""
+        with tempfile.NamedTemporaryFile('w', suffix=".txt", delete=False) as f:
+            f.write("Blueprint 1: Each ore robot costs 4 ore. Each clay robot costs 2 ore. "
+                    "Each obsidian robot costs 3 ore and 14 clay. Each geode robot costs 2 ore and 7 obsidian.\n")
+        self.addCleanup(os.remove, f.name)
+
+        token = CancellationToken()
+        token.cancel()
+        with self.assertRaises(SolveCancelled):
+            solve_blueprints(SolverConfig(filename=f.name, time_limit=18),
+                             on_event=lambda event: None, cancel_token=token)
+
+    def test_eta_estimator(self):
+        """Test the remaining time estimate"""
+        estimator = EtaEstimator(4)
+        self.assertIsNone(estimator.eta())
+        estimator.finish(2.0)
+        self.assertEqual(estimator.eta(), 6.0)
+        self.assertEqual(estimator.eta(1.0), 5.0)
+
 
 class TestCalculateAndWriteAnalysis(unittest.TestCase):
     """Tests for the calculate_and_write_analysis function"""
@@ -113,6 +185,82 @@ class TestCalculateAndWriteAnalysis(unittest.TestCase):
         expected_result = 44
         self.assertEqual(result, expected_result)
 
+    @patch('src.solver.solve_blueprints')
+    @patch('src.solver._write_analysis_file')
+    def test_calculate_and_write_analysis_with_stats(self, mock_write_file, mock_solve):
+        """Test that include_stats passes the collected stats to the analysis file"""
+        mock_solve.return_value = ([10], [1])
+        config = SolverConfig(filename="test.txt", calculator=QualityCalculator(),
+                              output_file="analysis.txt", include_stats=True)
+
+        calculate_and_write_analysis(config)
+
+        stats = mock_solve.call_args.kwargs["stats"]
+        self.assertIsInstance(stats, SolveStats)
+        mock_write_file.assert_called_once_with("analysis.txt", [1], [10], stats=stats)
+
+
+class TestMultipleFinalResources(unittest.TestCase):
+    """Tests for the maxima of several final resources from one search"""
+
+    def setUp(self):
+        with tempfile.NamedTemporaryFile('w', suffix=".txt", delete=False) as f:
+            for ore_cost in (2, 3):
+                f.write(f"Blueprint: Each ore robot costs {ore_cost} ore. Each clay robot costs 2 ore. "
+                        "Each obsidian robot costs 2 ore and 3 clay. Each geode robot costs 2 ore and 2 obsidian. "
+                        "Each diamond robot costs 1 geode and 2 obsidian.\n")
+        self.addCleanup(os.remove, f.name)
+        self.filename = f.name
+        self.blueprints = BlueprintLoader(DefaultBlueprintParser()).load(f.name)
+
+    def test_solve_blueprints_fills_resource_table(self):
+        """Test that each resource gets the optimum of its own search"""
+        config = SolverConfig(filename=self.filename, time_limit=14, final_resource="diamond",
+                              final_resources=["geode"])
+        table = {}
+        stats = SolveStats()
+        with patch('src.solver.OptimizedRobotFactory', wraps=OptimizedRobotFactory) as factory_class:
+            results, blueprint_ids = solve_blueprints(config, stats=stats, on_event=lambda event: None,
+                                                      resource_table=table)
+
+        self.assertEqual(factory_class.call_count, 2)
+        self.assertEqual(list(table), ["diamond", "geode"])
+        for resource in ("diamond", "geode"):
+            self.assertEqual(table[resource], [solve_blueprint(blueprint, 14, resource) for blueprint in self.blueprints])
+        self.assertEqual(results, table["diamond"])
+        self.assertEqual(blueprint_ids, [1, 2])
+        self.assertEqual(list(stats.blueprints), [1, 2])
+
+    def test_resource_table_of_a_single_resource(self):
+        """Test that without final_resources the table only holds final_resource"""
+        table = {}
+        results, _ = solve_blueprints(SolverConfig(filename=self.filename, time_limit=12),
+                                      on_event=lambda event: None, resource_table=table)
+        self.assertEqual(table, {"geode": results})
+
+    def test_other_engines_are_rejected(self):
+        """Test that final_resources is refused where the single search is not available"""
+        config = SolverConfig(filename=self.filename, final_resources=["geode"], engine="batch")
+        with self.assertRaises(ValueError):
+            solve_blueprints(config, on_event=lambda event: None)
+
+    def test_analysis_lists_every_final_resource(self):
+        """Test the final resources section of the analysis file"""
+        output_file = self.filename + ".analysis"
+        self.addCleanup(os.remove, output_file)
+        config = SolverConfig(filename=self.filename, time_limit=14, final_resource="diamond",
+                              final_resources=["geode"], output_file=output_file)
+        with patch('builtins.print'):
+            calculate_and_write_analysis(config)
+
+        with open(output_file, encoding='utf-8') as f:
+            content = f.read()
+        diamonds = [solve_blueprint(blueprint, 14, "diamond") for blueprint in self.blueprints]
+        geodes = [solve_blueprint(blueprint, 14, "geode") for blueprint in self.blueprints]
+        self.assertIn(f"Blueprint 1: {diamonds[0]}\n", content)
+        self.assertIn(f"\nFinal resources:\nBlueprint 1: {diamonds[0]} diamond, {geodes[0]} geode\n"
+                      f"Blueprint 2: {diamonds[1]} diamond, {geodes[1]} geode\n", content)
+
 
 class TestIntegration(unittest.TestCase):
     """Integration tests for the solver module"""
@@ -167,6 +315,193 @@ class TestIntegration(unittest.TestCase):
         self.assertEqual(content, expected_content)
 
 
+class TestTopK(unittest.TestCase):
+    """Tests for the top-K ranking and result-only modes"""
+
+    def setUp(self):
+        self.blueprints = [
+            Blueprint({
+                "ore": RobotCost({"ore": ore_cost}),
+                "clay": RobotCost({"ore": 2}),
+                "obsidian": RobotCost({"ore": 3, "clay": clay_cost}),
+                "geode": RobotCost({"ore": 2, "obsidian": 3})
+            })
+            for ore_cost, clay_cost in ((2, 4), (4, 9), (3, 4), (2, 5), (4, 4))
+        ]
+        self.time_limit = 14
+
+    def test_rank_blueprints_matches_exhaustive_ranking(self):
+        """Test that pruned top-K equals the ranking of exact solves"""
+        exact = [solve_blueprint(blueprint, self.time_limit) * blueprint_id
+                 for blueprint_id, blueprint in enumerate(self.blueprints, 1)]
+        expected = sorted(range(1, len(exact) + 1), key=lambda blueprint_id: (-exact[blueprint_id - 1], blueprint_id))
+
+        for top_k in (1, 2, 3):
+            stats = SolveStats()
+            ranked = rank_blueprints(self.blueprints, self.time_limit, top_k=top_k, stats=stats)
+            self.assertEqual([entry.blueprint_id for entry in ranked], expected[:top_k])
+            self.assertEqual([entry.quality for entry in ranked], [exact[i - 1] for i in expected[:top_k]])
+
+    def test_rank_blueprints_skips_hopeless_blueprints(self):
+        """Test that top-1 does not solve every blueprint"""
+        stats = SolveStats()
+        rank_blueprints(self.blueprints, self.time_limit, top_k=1, stats=stats)
+        self.assertLess(len(stats.blueprints), len(self.blueprints))
+
+    @patch('src.solver._load_blueprints')
+    def test_result_only_stops_after_zero_factor(self, mock_load):
+        """Test that no blueprint is searched once a product factor is zero"""
+        mock_load.return_value = self.blueprints
+        config = SolverConfig(filename="test.txt", time_limit=self.time_limit,
+                              calculator=ProductCalculator(), result_only=True)
+        with patch.object(OptimizedRobotFactory, 'max_final_resource', autospec=True, return_value=0) as mock_search:
+            results, blueprint_ids = solve_blueprints(config, on_event=lambda event: None)
+        mock_search.assert_called_once()
+        self.assertEqual(results, [0])
+        self.assertEqual(config.calculator.calculate(results, blueprint_ids), 0)
+
+    @patch('src.solver._load_blueprints')
+    def test_result_only_skips_blueprints_bounded_by_zero(self, mock_load):
+        """Test that a factor bounded by zero proves the product without any search"""
+        mock_load.return_value = self.blueprints
+        config = SolverConfig(filename="test.txt", time_limit=5, calculator=ProductCalculator(), result_only=True)
+        with patch.object(OptimizedRobotFactory, 'max_final_resource', autospec=True) as mock_search:
+            results, blueprint_ids = solve_blueprints(config, on_event=lambda event: None)
+        mock_search.assert_not_called()
+        self.assertEqual((results, blueprint_ids), ([0], [1]))
+
+    @patch('src.solver._load_blueprints')
+    def test_result_only_matches_full_calculation(self, mock_load):
+        """Test that the result-only mode agrees with the exact results"""
+        mock_load.return_value = self.blueprints
+        exact = [solve_blueprint(blueprint, self.time_limit) for blueprint in self.blueprints]
+        for calculator in (ProductCalculator(), QualityCalculator()):
+            config = SolverConfig(filename="test.txt", time_limit=self.time_limit,
+                                  calculator=calculator, result_only=True)
+            results, blueprint_ids = solve_blueprints(config, on_event=lambda event: None)
+            self.assertEqual(calculator.calculate(results, blueprint_ids), calculator.calculate(exact, [1, 2, 3, 4, 5]))
+        self.assertEqual((results, blueprint_ids), (exact, [1, 2, 3, 4, 5]))
+
+
+class TestCheckpointResume(unittest.TestCase):
+    """Tests for incremental analysis writing and resume"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.blueprint_file = os.path.join(self.test_dir, "blueprints.txt")
+        with open(self.blueprint_file, 'w', encoding='utf-8') as f:
+            for ore_cost in (4, 2, 3):
+                f.write(f"Blueprint: Each ore robot costs {ore_cost} ore. Each clay robot costs 2 ore. "
+                        "Each obsidian robot costs 3 ore and 4 clay. Each geode robot costs 2 ore and 3 obsidian.\n")
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.test_dir)
+
+    def _config(self, output_name, **kwargs):
+        return SolverConfig(filename=self.blueprint_file, time_limit=12, calculator=QualityCalculator(),
+                            output_file=os.path.join(self.test_dir, output_name), **kwargs)
+
+    def _read(self, path):
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    def test_analysis_with_build_plans(self):
+        """Test that include_plans writes a replayable optimal plan per blueprint"""
+        config = self._config("analysis.txt", include_plans=True)
+        with patch('builtins.print'):
+            plans = {}
+            results, _ = solve_blueprints(config, plans=plans)
+            calculate_and_write_analysis(config)
+
+        blueprints = BlueprintLoader(DefaultBlueprintParser()).load(self.blueprint_file)
+        for blueprint_id, blueprint in enumerate(blueprints, 1):
+            factory = OptimizedRobotFactory(blueprint)
+            self.assertEqual(factory.replay_plan(plans[blueprint_id], config.time_limit), results[blueprint_id - 1])
+        self.assertIn("\nBuild plans:\n", self._read(config.output_file))
+
+    def test_resume_skips_solved_blueprints_and_matches_full_run(self):
+        """Test that a resumed run only solves the missing blueprints"""
+        reference = self._config("reference.txt")
+        with patch('builtins.print'):
+            expected_result = calculate_and_write_analysis(reference)
+
+        from src import solver
+        real_solve = solver.solve_blueprint
+        solved = []
+
+        def crash_on_third(blueprint, *args, **kwargs):
+            if len(solved) == 2:
+                raise RuntimeError("crash")
+            solved.append(blueprint)
+            return real_solve(blueprint, *args, **kwargs)
+
+        interrupted = self._config("analysis.txt", checkpoint=True)
+        with patch('src.solver.solve_blueprint', side_effect=crash_on_third), patch('builtins.print'):
+            with self.assertRaises(RuntimeError):
+                calculate_and_write_analysis(interrupted)
+        self.assertTrue(os.path.exists(interrupted.output_file + ".partial"))
+
+        solved.clear()
+        resumed = self._config("analysis.txt", resume=True)
+        with patch('src.solver.solve_blueprint', side_effect=real_solve) as mock_solve, patch('builtins.print'):
+            result = calculate_and_write_analysis(resumed)
+
+        self.assertEqual(mock_solve.call_count, 1)
+        self.assertEqual(result, expected_result)
+        self.assertEqual(self._read(resumed.output_file), self._read(reference.output_file))
+        self.assertFalse(os.path.exists(resumed.output_file + ".partial"))
+
+    def test_resume_keeps_build_plans(self):
+        """Test that a resumed run with include_plans writes the plans of the restored blueprints"""
+        reference = self._config("reference.txt", include_plans=True)
+        with patch('builtins.print'):
+            calculate_and_write_analysis(reference)
+
+        from src import solver
+        real_solve = solver.solve_blueprint
+        solved = []
+
+        def crash_on_third(blueprint, *args, **kwargs):
+            if len(solved) == 2:
+                raise RuntimeError("crash")
+            solved.append(blueprint)
+            return real_solve(blueprint, *args, **kwargs)
+
+        interrupted = self._config("analysis.txt", checkpoint=True, include_plans=True)
+        with patch('src.solver.solve_blueprint', side_effect=crash_on_third), patch('builtins.print'):
+            with self.assertRaises(RuntimeError):
+                calculate_and_write_analysis(interrupted)
+
+        resumed = self._config("analysis.txt", resume=True, include_plans=True)
+        with patch('src.solver.solve_blueprint', side_effect=real_solve) as mock_solve, patch('builtins.print'):
+            calculate_and_write_analysis(resumed)
+
+        self.assertEqual(mock_solve.call_count, 1)
+        self.assertEqual(self._read(resumed.output_file), self._read(reference.output_file))
+
+    def test_resume_with_plans_solves_blueprints_recorded_without(self):
+        """Test that blueprints checkpointed without a plan are solved again when plans are requested"""
+        reference = self._config("reference.txt", include_plans=True)
+        with patch('builtins.print'):
+            calculate_and_write_analysis(reference)
+
+        # Every blueprint is checkpointed, then the run dies before writing the analysis
+        interrupted = self._config("analysis.txt", checkpoint=True)
+        with patch('src.solver._write_analysis_file', side_effect=RuntimeError("crash")), patch('builtins.print'):
+            with self.assertRaises(RuntimeError):
+                calculate_and_write_analysis(interrupted)
+
+        from src import solver
+        real_solve = solver.solve_blueprint
+        resumed = self._config("analysis.txt", resume=True, include_plans=True)
+        with patch('src.solver.solve_blueprint', side_effect=real_solve) as mock_solve, patch('builtins.print'):
+            calculate_and_write_analysis(resumed)
+
+        self.assertEqual(mock_solve.call_count, 3)
+        self.assertEqual(self._read(resumed.output_file), self._read(reference.output_file))
+
+
 class TestCustomResultCalculator(unittest.TestCase):
     """Tests for custom ResultCalculator implementations"""
     
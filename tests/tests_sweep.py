@@ -0,0 +1,69 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+
+from src.blueprint import Blueprint, RobotCost
+from src.solver import solve_blueprint
+from src.sweep import sweep_costs, with_costs
+
+
+class TestSweepCosts(unittest.TestCase):
+
+    def setUp(self):
+        self.blueprint = Blueprint({
+            "ore": RobotCost({"ore": 2}),
+            "clay": RobotCost({"ore": 2}),
+            "obsidian": RobotCost({"ore": 3, "clay": 4}),
+            "geode": RobotCost({"ore": 2, "obsidian": 3})
+        })
+        self.ranges = {("obsidian", "clay"): range(3, 7), ("geode", "obsidian"): [2, 3, 4]}
+
+    def test_matches_cold_solves(self):
+        """Test that every variant gets the optimum of an independent solve"""
+        result = sweep_costs(self.blueprint, self.ranges, time_limit=13)
+
+        self.assertEqual(len(result.rows), 12)
+        for row in result.rows:
+            variant = with_costs(self.blueprint, dict(zip(result.axes, row.costs)))
+            self.assertEqual(row.final_resource_count, solve_blueprint(variant, 13))
+
+    def test_flat_region_is_inferred(self):
+        """Test that equal corners settle the variants between them without searching"""
+        result = sweep_costs(self.blueprint, {("ore", "ore"): range(2, 10)}, time_limit=10, final_resource="clay")
+
+        self.assertLess(result.solves, len(result.rows))
+        counts = [row.final_resource_count for row in result.rows]
+        self.assertEqual(counts, sorted(counts, reverse=True))
+
+    def test_parallel_sweep(self):
+        """Test that worker processes give the same table"""
+        self.assertEqual(
+            sweep_costs(self.blueprint, self.ranges, time_limit=12, max_workers=2).rows,
+            sweep_costs(self.blueprint, self.ranges, time_limit=12).rows
+        )
+
+    def test_table_output(self):
+        """Test the text table of a sweep"""
+        table = sweep_costs(self.blueprint, {("geode", "obsidian"): [3, 50]}, time_limit=12).to_table()
+        lines = table.splitlines()
+        self.assertEqual(lines[0].split(), ["geode.obsidian", "geode", "solved"])
+        self.assertEqual(lines[2].split()[:2], ["50", "0"])
+
+    def test_with_costs_copies(self):
+        """Test that variants never modify the reference blueprint"""
+        variant = with_costs(self.blueprint, {("obsidian", "clay"): 9})
+        self.assertEqual(variant.robot_costs["obsidian"].resources, {"ore": 3, "clay": 9})
+        self.assertEqual(self.blueprint.robot_costs["obsidian"].resources["clay"], 4)
+
+    def test_invalid_axis(self):
+        """Test that unknown costs and empty ranges are rejected"""
+        with self.assertRaises(ValueError):
+            sweep_costs(self.blueprint, {("diamond", "ore"): [1, 2]})
+        with self.assertRaises(ValueError):
+            sweep_costs(self.blueprint, {("ore", "ore"): []})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)